@@ -1,6 +1,8 @@
+import time
+_run_started_at = time.perf_counter()
+
 import streamlit as st
-from app_pages import data_overview, eda_analysis, prediction_model, training_results
-from utils.helper_functions import load_data
+from utils.startup_timing import import_page, page_import_times, record_page_render
 
 st.set_page_config(
     page_title="Halfmarathon Wrocław Analysis",
@@ -8,14 +10,55 @@ st.set_page_config(
     layout="wide"
 )
 
-wroclaw_2023_df, wroclaw_2024_df = load_data()
 
+def _race_data(columns=None):
+    # Dane (i boto3) ładowane są dopiero przy otwarciu strony, która ich potrzebuje
+    from utils.helper_functions import load_data
+    return load_data(columns)
+
+
+def _show_data_overview():
+    data_overview = import_page("app_pages.data_overview")
+    data_overview.show(*_race_data())
+
+
+def _show_eda_analysis():
+    eda_analysis = import_page("app_pages.eda_analysis")
+    from utils.data_schema import EDA_COLUMNS
+    # Analizy na projekcji EDA_COLUMNS, sekcja Data Quality na pełnych danych
+    # (projekcja współdzieli kolumny z pełnymi danymi, więc nie zajmuje dodatkowej pamięci)
+    eda_analysis.show(*_race_data(tuple(EDA_COLUMNS)), full_frames=_race_data())
+
+
+def _show_prediction_model():
+    prediction_model = import_page("app_pages.prediction_model")
+    prediction_model.show()
+
+
+# Rejestr stron - moduł strony i jego ciężkie zależności importowane są
+# dopiero przy pierwszym wyborze strony
 menu = {
-    "Data Overview": lambda: data_overview.show(wroclaw_2023_df, wroclaw_2024_df),
-    "EDA Analysis": lambda: eda_analysis.show(wroclaw_2023_df, wroclaw_2024_df),
-    "Prediction Model": prediction_model.show,
+    "Data Overview": _show_data_overview,
+    "EDA Analysis": _show_eda_analysis,
+    "Prediction Model": _show_prediction_model,
 }
 
+# Link bezpośrednio do strony: ?page=Prediction Model
+pages = list(menu.keys())
+requested_page = st.query_params.get("page")
+default_index = pages.index(requested_page) if requested_page in pages else 0
+
 st.sidebar.title("Menu")
-choice = st.sidebar.radio("Choose section:", list(menu.keys()))
-menu[choice]()
\ No newline at end of file
+choice = st.sidebar.radio("Choose section:", pages, index=default_index)
+menu[choice]()
+
+timing = record_page_render(choice, _run_started_at)
+st.sidebar.caption(
+    f"⏱️ Pierwsze renderowanie: {timing['first_render_s'] * 1000:.0f} ms · "
+    f"ten rerun: {timing['render_s'] * 1000:.0f} ms"
+)
+import_times = page_import_times()
+if import_times:
+    with st.sidebar.expander("📦 Import stron (pierwszy w procesie)"):
+        for module_name, import_s in import_times.items():
+            st.caption(f"{module_name}: {import_s * 1000:.0f} ms")
@@ -1,11 +1,98 @@
+import math
+
+import pandas as pd
 import streamlit as st
-from itables.streamlit import interactive_table
+
+from utils.data_cache import dataset_fingerprint
+from utils.data_schema import TIME_COLUMNS, format_seconds
+from utils.runner_search import RunnerSearchIndex, format_search_results
+from utils.table_index import TableIndex
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _table_index_cached(fingerprint: str, _df: pd.DataFrame) -> TableIndex:
+    # Kody filtrów i porządki sortowania liczone raz dla danej zawartości danych
+    return TableIndex(_df)
+
+
+def table_index_cached(df: pd.DataFrame) -> TableIndex:
+    """Indeks tabeli do stronicowania, filtrów i sortowania"""
+    return _table_index_cached(dataset_fingerprint(df), df)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _search_index_cached(fingerprint_2023: str, fingerprint_2024: str, _df_2023: pd.DataFrame,
+                         _df_2024: pd.DataFrame) -> RunnerSearchIndex:
+    return RunnerSearchIndex({2023: _df_2023, 2024: _df_2024})
+
+
+def search_index_cached(df_2023: pd.DataFrame, df_2024: pd.DataFrame) -> RunnerSearchIndex:
+    """Indeks wyszukiwania biegaczy z obu lat, budowany raz dla danej zawartości danych"""
+    return _search_index_cached(dataset_fingerprint(df_2023), dataset_fingerprint(df_2024), df_2023, df_2024)
+
 
 def show(wroclaw_2023_df, wroclaw_2024_df):
     st.title("Data Overview")
 
-    st.subheader("Data 2023")
-    interactive_table(wroclaw_2023_df)
+    # Wyszukiwarka biegaczy (oba lata)
+    query = st.text_input("🔎 Szukaj biegacza:", placeholder="imię, nazwisko, numer startowy lub drużyna, np. Lukasz Now")
+    if query.strip():
+        search_index = search_index_cached(wroclaw_2023_df, wroclaw_2024_df)
+        matches = len(search_index.match(query))
+        if matches:
+            results = format_search_results(search_index.search(query))
+            st.dataframe(results.set_index('Rok'), use_container_width=True)
+            st.caption(f"Znaleziono: {matches} (pokazano najwyżej {len(results)}) · "
+                       "Percentyl - odsetek ukończonych biegaczy z gorszym miejscem w danym roku")
+        else:
+            st.info("Nie znaleziono biegacza pasującego do zapytania")
+    st.markdown("---")
+
+    year = st.radio("Wybierz rok:", [2023, 2024], horizontal=True)
+    df = wroclaw_2023_df if year == 2023 else wroclaw_2024_df
+    index = table_index_cached(df)
+
+    # Filtry
+    filter_cols = st.columns(len(index.filter_columns))
+    filters = {}
+    for col, column in zip(filter_cols, index.filter_columns):
+        with col:
+            filters[column] = st.multiselect(column, index.options(column), key=f"overview_filter_{year}_{column}")
+
+    # Kolumny, sortowanie i rozmiar strony
+    col1, col2, col3, col4 = st.columns([4, 2, 1, 1])
+    with col1:
+        columns = st.multiselect("Kolumny:", list(df.columns), default=list(df.columns), key=f"overview_columns_{year}")
+    with col2:
+        sort_by = st.selectbox("Sortuj według:", [None] + index.sort_columns,
+                               format_func=lambda col: "(kolejność danych)" if col is None else col)
+    with col3:
+        ascending = st.radio("Kierunek:", ["rosnąco", "malejąco"]) == "rosnąco"
+    with col4:
+        page_size = st.selectbox("Wierszy na stronie:", PAGE_SIZES, index=1)
+
+    # Liczba wierszy po filtrach jest znana dopiero po zapytaniu - numer strony przycinany do zakresu
+    # (bez max_value w number_input: zmiana parametrów widżetu zerowałaby jego stan)
+    page_key = f"overview_page_{year}"
+    page = st.session_state.get(page_key, 1)
+    page_df, total = index.query(filters, sort_by, ascending, page, page_size, columns or None)
+    pages = max(math.ceil(total / page_size), 1)
+    if page > pages:
+        page = st.session_state[page_key] = pages
+        page_df, total = index.query(filters, sort_by, ascending, page, page_size, columns or None)
+
+    # Do przeglądarki trafia tylko bieżąca strona
+    page_df = page_df.copy()
+    for column in TIME_COLUMNS:
+        if column in page_df.columns:
+            page_df[column] = format_seconds(page_df[column])
+    st.dataframe(page_df, use_container_width=True)
 
-    st.subheader("Data 2024")
-    interactive_table(wroclaw_2024_df)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.number_input("Strona:", min_value=1, step=1, key=page_key)
+    with col2:
+        first = (page - 1) * page_size + 1 if total else 0
+        st.caption(f"Strona {page} z {pages} · wiersze {first}–{min(page * page_size, total)} z {total} (wszystkich: {len(df)})")
@@ -1,14 +1,67 @@
 import streamlit as st
 from utils import eda_utils
+from utils.aggregate_cube import (
+    build_aggregate_cube, cube_age_groups, cube_gender_counts, cube_gender_distribution, cube_years_summary
+)
+from utils.data_cache import dataset_fingerprint
+from utils.data_schema import format_seconds
+from utils.helper_functions import prepare_cached, ranking_cached
+from utils.outliers import OUTLIER_COLUMNS, OutlierScan
 import pandas as pd
 
-def show(wroclaw_2023_df, wroclaw_2024_df):
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _cube_cached(fingerprint_2023: str, fingerprint_2024: str, _df_2023: pd.DataFrame, _df_2024: pd.DataFrame) -> pd.DataFrame:
+    # Kilkadziesiąt wierszy zamiast pełnych danych - tabele i metryki liczone są z niej w stałym czasie
+    return build_aggregate_cube({2023: prepare_cached(_df_2023), 2024: prepare_cached(_df_2024)})
+
+
+def aggregate_cube_cached(df_2023: pd.DataFrame, df_2024: pd.DataFrame) -> pd.DataFrame:
+    """Kostka agregatów dla sekcji Overview i Demographics, budowana raz dla danej zawartości"""
+    return _cube_cached(dataset_fingerprint(df_2023), dataset_fingerprint(df_2024), df_2023, df_2024)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _outlier_scan_cached(fingerprint: str, year: int, _df_prep: pd.DataFrame) -> OutlierScan:
+    # Granice i maski dla wszystkich zmiennych naraz - zmiana zmiennej w selectboxie nic nie przelicza
+    return OutlierScan(_df_prep, OUTLIER_COLUMNS)
+
+
+def outlier_scan_cached(df: pd.DataFrame, year: int) -> OutlierScan:
+    """Outliery IQR wszystkich analizowanych zmiennych, liczone raz dla danego roku i zawartości"""
+    return _outlier_scan_cached(dataset_fingerprint(df), year, prepare_cached(df))
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _quality_cached(fingerprint: str, _df: pd.DataFrame) -> dict:
+    # Przygotowana pełna ramka potrzebna tylko tutaj - nie trafia do cache prepare_cached
+    return eda_utils.data_quality_summary(_df, eda_utils.prepare_data_for_analysis(_df))
+
+
+def quality_summary_cached(df: pd.DataFrame) -> dict:
+    """Statystyki jakości pełnych danych (wszystkie kolumny), liczone raz dla danej zawartości"""
+    return _quality_cached(dataset_fingerprint(df), df)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _plot_cached(fingerprint: str, year: int, plot: str, _df_prep: pd.DataFrame) -> bytes:
+    return eda_utils.render_plot(plot, _df_prep, year)
+
+
+def plot_cached(df: pd.DataFrame, year: int, plot: str) -> bytes:
+    """Wykres jako PNG, rysowany raz dla danej zawartości danych, roku i typu wykresu"""
+    return _plot_cached(dataset_fingerprint(df), year, plot, prepare_cached(df))
+
+
+def show(wroclaw_2023_df, wroclaw_2024_df, full_frames=None):
+    # full_frames - dane ze wszystkimi kolumnami dla sekcji Data Quality (pozostałe sekcje: projekcja EDA)
     st.title("🔍 Exploratory Data Analysis (EDA)")
     st.markdown("---")
     
-    # Przygotowanie danych
-    df_2023_prep = eda_utils.prepare_data_for_analysis(wroclaw_2023_df)
-    df_2024_prep = eda_utils.prepare_data_for_analysis(wroclaw_2024_df)
+    # Przygotowanie danych (cache między rerunami i sesjami)
+    df_2023_prep = prepare_cached(wroclaw_2023_df)
+    df_2024_prep = prepare_cached(wroclaw_2024_df)
+    cube = aggregate_cube_cached(wroclaw_2023_df, wroclaw_2024_df)
     
     # Menu główne EDA
     eda_section = st.selectbox(
@@ -21,7 +74,7 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         st.header("📊 Overview & Comparison")
         st.markdown("Porównanie podstawowych statystyk między rokiem 2023 i 2024")
         
-        comparison = eda_utils.compare_years_summary(df_2023_prep, df_2024_prep)
+        comparison = cube_years_summary(cube)
         
         # Wyświetlenie w ładnej tabeli
         st.dataframe(comparison.set_index('Year'), use_container_width=True)
@@ -62,6 +115,9 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
     # ========== DATA QUALITY ==========
     elif eda_section == "🔢 Data Quality":
         st.header("🔢 Data Quality Analysis")
+        full_2023_df, full_2024_df = full_frames or (wroclaw_2023_df, wroclaw_2024_df)
+        quality_2023 = quality_summary_cached(full_2023_df)
+        quality_2024 = quality_summary_cached(full_2024_df)
         
         tabs = st.tabs(["2023", "2024"])
         
@@ -72,20 +128,19 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
             
             with col1:
                 st.markdown("**Podstawowe informacje:**")
-                st.write(f"- **Liczba uczestników:** {len(df_2023_prep)}")
-                st.write(f"- **Ukończonych biegów:** {df_2023_prep['Finished'].sum()}")
-                st.write(f"- **Wskaźnik ukończenia:** {(df_2023_prep['Finished'].sum() / len(df_2023_prep) * 100):.2f}%")
-                st.write(f"- **Liczba kolumn:** {len(df_2023_prep.columns)}")
+                st.write(f"- **Liczba uczestników:** {quality_2023['rows']}")
+                st.write(f"- **Ukończonych biegów:** {quality_2023['finished']}")
+                st.write(f"- **Wskaźnik ukończenia:** {quality_2023['finish_rate']:.2f}%")
+                st.write(f"- **Liczba kolumn:** {quality_2023['columns']}")
             
             with col2:
                 st.markdown("**Typy danych:**")
-                type_counts = df_2023_prep.dtypes.value_counts()
-                for dtype, count in type_counts.items():
+                for dtype, count in quality_2023['dtypes'].items():
                     st.write(f"- **{dtype}:** {count} kolumn")
             
             st.markdown("---")
             st.markdown("**Brakujące wartości:**")
-            missing_2023 = eda_utils.analyze_missing_values(wroclaw_2023_df)
+            missing_2023 = quality_2023['missing']
             
             if missing_2023.empty:
                 st.success("✅ Brak brakujących wartości!")
@@ -104,20 +159,19 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
             
             with col1:
                 st.markdown("**Podstawowe informacje:**")
-                st.write(f"- **Liczba uczestników:** {len(df_2024_prep)}")
-                st.write(f"- **Ukończonych biegów:** {df_2024_prep['Finished'].sum()}")
-                st.write(f"- **Wskaźnik ukończenia:** {(df_2024_prep['Finished'].sum() / len(df_2024_prep) * 100):.2f}%")
-                st.write(f"- **Liczba kolumn:** {len(df_2024_prep.columns)}")
+                st.write(f"- **Liczba uczestników:** {quality_2024['rows']}")
+                st.write(f"- **Ukończonych biegów:** {quality_2024['finished']}")
+                st.write(f"- **Wskaźnik ukończenia:** {quality_2024['finish_rate']:.2f}%")
+                st.write(f"- **Liczba kolumn:** {quality_2024['columns']}")
             
             with col2:
                 st.markdown("**Typy danych:**")
-                type_counts = df_2024_prep.dtypes.value_counts()
-                for dtype, count in type_counts.items():
+                for dtype, count in quality_2024['dtypes'].items():
                     st.write(f"- **{dtype}:** {count} kolumn")
             
             st.markdown("---")
             st.markdown("**Brakujące wartości:**")
-            missing_2024 = eda_utils.analyze_missing_values(wroclaw_2024_df)
+            missing_2024 = quality_2024['missing']
             
             if missing_2024.empty:
                 st.success("✅ Brak brakujących wartości!")
@@ -136,6 +190,7 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         year_choice = st.radio("Wybierz rok:", ["2023", "2024"], horizontal=True)
         
         df = df_2023_prep if year_choice == "2023" else df_2024_prep
+        raw_df = wroclaw_2023_df if year_choice == "2023" else wroclaw_2024_df
         year = 2023 if year_choice == "2023" else 2024
         
         # Wybór typu rozkładu
@@ -146,8 +201,7 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         
         if dist_type == "Tempo/Czas ukończenia":
             st.subheader(f"Rozkład tempa - {year}")
-            fig = eda_utils.plot_time_distribution(df, year)
-            st.pyplot(fig)
+            st.image(plot_cached(raw_df, year, "time_distribution"), use_container_width=True)
             
             # Statystyki
             col1, col2, col3, col4 = st.columns(4)
@@ -163,8 +217,7 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         
         elif dist_type == "Wiek uczestników":
             st.subheader(f"Rozkład wieku - {year}")
-            fig = eda_utils.plot_age_distribution(df, year)
-            st.pyplot(fig)
+            st.image(plot_cached(raw_df, year, "age_distribution"), use_container_width=True)
             
             # Statystyki
             col1, col2, col3, col4 = st.columns(4)
@@ -180,8 +233,7 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         
         elif dist_type == "Stabilność tempa":
             st.subheader(f"Stabilność tempa - {year}")
-            fig = eda_utils.plot_pace_stability(df, year)
-            st.pyplot(fig)
+            st.image(plot_cached(raw_df, year, "pace_stability"), use_container_width=True)
             
             st.info("💡 **Tempo Stabilność** - niższa wartość oznacza bardziej równomierne tempo przez cały bieg")
             
@@ -197,8 +249,7 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         
         elif dist_type == "Czasy na odcinkach":
             st.subheader(f"Tempo na poszczególnych odcinkach - {year}")
-            fig = eda_utils.plot_split_times(df, year)
-            st.pyplot(fig)
+            st.image(plot_cached(raw_df, year, "split_times"), use_container_width=True)
             
             st.info("💡 Wykres pokazuje jak tempo zmienia się na kolejnych odcinkach 5km, 10km, 15km, 20km i na mecie")
     
@@ -209,19 +260,18 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         year_choice = st.radio("Wybierz rok:", ["2023", "2024", "Porównanie"], horizontal=True)
         
         if year_choice in ["2023", "2024"]:
-            df = df_2023_prep if year_choice == "2023" else df_2024_prep
             year = 2023 if year_choice == "2023" else 2024
             
             # Analiza płci
             st.subheader(f"Rozkład według płci - {year}")
-            gender_stats = eda_utils.analyze_gender_distribution(df)
+            gender_stats = cube_gender_distribution(cube, year)
             st.dataframe(gender_stats, use_container_width=True)
             
             # Wykres kołowy
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("**Udział płci w zawodach:**")
-                gender_counts = df['Płeć'].value_counts()
+                gender_counts = cube_gender_counts(cube, year)
                 st.bar_chart(gender_counts)
             
             with col2:
@@ -233,7 +283,7 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
             
             # Analiza grup wiekowych
             st.subheader(f"Rozkład według grup wiekowych - {year}")
-            age_stats = eda_utils.analyze_age_groups(df)
+            age_stats = cube_age_groups(cube, year)
             st.dataframe(age_stats, use_container_width=True)
             
             # Wykresy
@@ -253,12 +303,12 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
             
             with col1:
                 st.markdown("**2023 - Płeć:**")
-                gender_2023 = eda_utils.analyze_gender_distribution(df_2023_prep)
+                gender_2023 = cube_gender_distribution(cube, 2023)
                 st.dataframe(gender_2023, use_container_width=True)
             
             with col2:
                 st.markdown("**2024 - Płeć:**")
-                gender_2024 = eda_utils.analyze_gender_distribution(df_2024_prep)
+                gender_2024 = cube_gender_distribution(cube, 2024)
                 st.dataframe(gender_2024, use_container_width=True)
             
             st.markdown("---")
@@ -267,12 +317,12 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
             
             with col1:
                 st.markdown("**2023 - Grupy wiekowe:**")
-                age_2023 = eda_utils.analyze_age_groups(df_2023_prep)
+                age_2023 = cube_age_groups(cube, 2023)
                 st.dataframe(age_2023, use_container_width=True)
             
             with col2:
                 st.markdown("**2024 - Grupy wiekowe:**")
-                age_2024 = eda_utils.analyze_age_groups(df_2024_prep)
+                age_2024 = cube_age_groups(cube, 2024)
                 st.dataframe(age_2024, use_container_width=True)
     
     # ========== PERFORMANCE ANALYSIS ==========
@@ -294,14 +344,40 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         
         st.markdown("---")
         
-        # Top 10 najszybszych
+        # Top 10 najszybszych (z gotowego rankingu: cały bieg, płeć lub kategoria wiekowa)
         st.subheader("🏆 Top 10 najszybszych uczestników")
+        ranking = ranking_cached(wroclaw_2023_df, wroclaw_2024_df)
         
-        top_10 = df_finished.nsmallest(10, 'Tempo')[['Imię', 'Nazwisko', 'Płeć', 'Wiek', 'Czas', 'Tempo', 'Tempo Stabilność']]
-        top_10 = top_10.reset_index(drop=True)
-        top_10.index = top_10.index + 1
+        col1, col2 = st.columns(2)
+        with col1:
+            gender_choice = st.selectbox("Płeć:", ["Wszyscy", "M", "K"], key="ranking_gender")
+        ranking_gender = None if gender_choice == "Wszyscy" else gender_choice
+        with col2:
+            category_choice = st.selectbox("Kategoria wiekowa:", ["Wszystkie"] + ranking.categories(year, ranking_gender),
+                                           key="ranking_category")
+        ranking_category = None if category_choice == "Wszystkie" else category_choice
+        
+        top_10 = ranking.top(year, ranking_gender, ranking_category, n=10)
+        top_10['Czas'] = format_seconds(top_10['Czas'])
         st.dataframe(top_10, use_container_width=True)
         
+        # Miejsce dla dowolnego czasu w wybranej grupie
+        finish_time = st.text_input("Gdzie w tej grupie byłby czas (HH:MM:SS)?", placeholder="np. 01:45:00",
+                                    key="ranking_time")
+        if finish_time.strip():
+            seconds = eda_utils.convert_time_to_seconds(finish_time.strip())
+            if pd.isna(seconds) or seconds <= 0:
+                st.warning("⚠️ Podaj czas w formacie HH:MM:SS")
+            else:
+                placement = ranking.place(seconds / 60 / 21.0975, year, ranking_gender, ranking_category)
+                if placement is not None:
+                    st.metric(
+                        f"Miejsce w grupie (na {placement['field']}, wliczając ten czas)",
+                        placement['place'],
+                        f"szybciej niż {placement['percentile']}% biegaczy",
+                        delta_color="off"
+                    )
+        
         st.markdown("---")
         
         # Analiza korelacji między wiekiem a tempem
@@ -349,25 +425,30 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
         
         df = df_2023_prep if year_choice == "2023" else df_2024_prep
         year = 2023 if year_choice == "2023" else 2024
+        scan = outlier_scan_cached(wroclaw_2023_df if year == 2023 else wroclaw_2024_df, year)
         
         st.markdown("Wykrywanie outlierów metodą **IQR (Interquartile Range)**")
         st.info("💡 Outliery to wartości odstające, które mogą wskazywać na błędy w danych lub wyjątkowe przypadki")
         
+        with st.expander("📋 Podsumowanie wszystkich zmiennych"):
+            st.dataframe(scan.summary(), use_container_width=True)
+        
         # Wybór zmiennej do analizy
         variable = st.selectbox(
             "Wybierz zmienną do analizy:",
-            ["Tempo", "Tempo Stabilność", "Wiek", "5 km Tempo", "10 km Tempo", "15 km Tempo", "20 km Tempo"]
+            OUTLIER_COLUMNS
         )
         
-        if variable in df.columns:
-            outliers, count = eda_utils.detect_outliers_iqr(df, variable)
+        if variable in scan.columns:
+            outliers = df[scan.mask(variable)]
+            count = len(outliers)
             
             col1, col2, col3 = st.columns(3)
             
             with col1:
                 st.metric("Liczba outlierów", count)
             with col2:
-                total = df[variable].notna().sum()
+                total = scan.total(variable)
                 st.metric("% outlierów", f"{(count/total*100):.2f}%")
             with col3:
                 st.metric("Całkowita liczba obserwacji", total)
@@ -379,7 +460,8 @@ def show(wroclaw_2023_df, wroclaw_2024_df):
                 
                 # Wyświetl top 20 outlierów
                 outliers_display = outliers.nsmallest(20, variable) if variable == 'Tempo' else outliers.nlargest(20, variable)
-                outliers_display = outliers_display[['Imię', 'Nazwisko', 'Płeć', 'Wiek', variable, 'Czas']]
+                outliers_display = outliers_display[['Imię', 'Nazwisko', 'Płeć', 'Wiek', variable, 'Czas']].copy()
+                outliers_display['Czas'] = format_seconds(outliers_display['Czas'])
                 
                 st.dataframe(outliers_display.reset_index(drop=True), use_container_width=True)
                 
@@ -4,92 +4,127 @@ import numpy as np
 import joblib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import boto3
+from pathlib import Path
 from dotenv import load_dotenv
-from utils.llm_integration import (
-    extract_runner_data_with_gemini,
-    validate_extracted_data,
-    convert_to_model_input,
-    log_prediction_to_langfuse
-)
+from utils.artifact_cache import ArtifactCache
+from utils.data_cache import LocalStorage, S3Storage
+from utils.fast_predictor import compile_predictor
+from utils.model_registry import ModelRegistry
 
 # Załadowanie zmiennych środowiskowych
 load_dotenv()
 
 BUCKET_NAME = "dane-modul9"
 
+# Co ile sekund sprawdzać, czy w źródle pojawiła się nowa wersja modelu
+MODEL_CHECK_INTERVAL = float(os.getenv("MODEL_CHECK_INTERVAL", "60"))
+
+MODEL_INFO_KEY = 'models/model_info.json'
+SCALER_KEY = 'models/scaler.pkl'
+
+def _spaces_client():
+    """Klient S3 dla DigitalOcean Spaces"""
+    import boto3
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        endpoint_url=os.getenv("AWS_ENDPOINT_URL_S3")
+    )
+
+@st.cache_resource
+def get_model_storage():
+    """Źródło modelu: lokalny katalog (MODEL_LOCAL_DIR, np. do testów) lub DigitalOcean Spaces"""
+    local_dir = os.getenv("MODEL_LOCAL_DIR")
+    if local_dir:
+        return LocalStorage(local_dir)
+    return S3Storage(_spaces_client(), BUCKET_NAME)
+
+@st.cache_resource
+def get_artifact_cache() -> ArtifactCache:
+    """Lokalny cache artefaktów modelu (adresowany zawartością)"""
+    return ArtifactCache()
+
+def _is_model_key(key):
+    return 'halfmarathon_model' in key and key.endswith('.pkl')
+
+# Funkcje ładujące wywoływane są także z wątku przeładowania ModelRegistry (bez kontekstu
+# Streamlit) - błędy zgłaszają wyjątkiem, a komunikat pokazuje strona (registry.last_error)
 def load_model_from_local():
     """Ładuje model z lokalnego katalogu"""
-    try:
-        model_files = [f for f in os.listdir('models') if f.endswith('.pkl') and 'model' in f]
-        if not model_files:
-            return None, None, None
+    model_files = [f for f in os.listdir('models') if f.endswith('.pkl') and 'model' in f]
+    if not model_files:
+        return None, None, None
 
-        model_path = f'models/{model_files[0]}'
-        scaler_path = 'models/scaler.pkl'
-        info_path = 'models/model_info.json'
+    model_path = f'models/{model_files[0]}'
+    scaler_path = 'models/scaler.pkl'
+    info_path = 'models/model_info.json'
 
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else None
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else None
 
-        with open(info_path, 'r') as f:
-            model_info = json.load(f)
+    with open(info_path, 'r') as f:
+        model_info = json.load(f)
 
-        return model, scaler, model_info
-    except Exception as e:
-        st.error(f"Błąd ładowania modelu lokalnie: {e}")
-        return None, None, None
+    return model, scaler, model_info
 
 def load_model_from_digitalocean():
-    """Ładuje model z DigitalOcean Spaces"""
-    try:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            endpoint_url=os.getenv("AWS_ENDPOINT_URL_S3")
-        )
+    """Ładuje model z DigitalOcean Spaces (przez lokalny cache artefaktów)"""
+    storage = get_model_storage()
+    cache = get_artifact_cache()
 
-        response = s3_client.list_objects_v2(Bucket=BUCKET_NAME, Prefix='models/')
-        model_file = None
-        for obj in response.get('Contents', []):
-            if 'halfmarathon_model' in obj['Key'] and obj['Key'].endswith('.pkl'):
-                model_file = obj['Key']
-                break
+    # Listowanie i warunkowe pobrania artefaktów idą równolegle (jedna runda zapytań).
+    # Nazwa pliku modelu z poprzedniego pobrania pozwala nie czekać na listowanie.
+    known_model_key = next((k for k in cache.cached_keys('models/') if _is_model_key(k)), None)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        listing = pool.submit(storage.list, 'models/')
+        info_path = pool.submit(cache.fetch, storage, MODEL_INFO_KEY)
+        scaler_path = pool.submit(cache.fetch, storage, SCALER_KEY)
+        known_model_path = pool.submit(cache.fetch, storage, known_model_key) if known_model_key else None
 
-        if not model_file:
+        model_key = next((k for k in listing.result() if _is_model_key(k)), None)
+        if not model_key:
             return None, None, None
 
-        os.makedirs('temp_models', exist_ok=True)
-        s3_client.download_file(BUCKET_NAME, model_file, 'temp_models/model.pkl')
-        s3_client.download_file(BUCKET_NAME, 'models/scaler.pkl', 'temp_models/scaler.pkl')
-        s3_client.download_file(BUCKET_NAME, 'models/model_info.json', 'temp_models/model_info.json')
-
-        model = joblib.load('temp_models/model.pkl')
-        scaler = joblib.load('temp_models/scaler.pkl')
+        if model_key == known_model_key:
+            model_path = known_model_path.result()
+        else:
+            model_path = cache.fetch(storage, model_key)
 
-        with open('temp_models/model_info.json', 'r') as f:
+        model = joblib.load(model_path)
+        scaler = joblib.load(scaler_path.result())
+        with open(info_path.result(), 'r') as f:
             model_info = json.load(f)
 
-        return model, scaler, model_info
-    except Exception as e:
-        st.error(f"Błąd ładowania modelu z DigitalOcean: {e}")
-        return None, None, None
+    # Stare wersje usuwane dopiero po zakończeniu wszystkich pobrań i wczytaniu modelu
+    cache.collect_garbage(live_keys=listing.result(), prefix='models/')
+    return model, scaler, model_info
 
-def predict_race_time(model, scaler, input_data, model_info):
-    """Wykonuje predykcję czasu biegu"""
-    try:
-        feature_order = model_info['features']
-        input_df = pd.DataFrame([input_data])[feature_order]
+def local_model_version():
+    """Wersja lokalnego modelu: training_date z model_info.json + czas modyfikacji pliku"""
+    info_path = 'models/model_info.json'
+    with open(info_path, 'r') as f:
+        training_date = json.load(f).get('training_date')
+    return f"{training_date}:{os.stat(info_path).st_mtime_ns}"
 
-        if model_info['model_name'] in ['Linear Regression', 'Ridge Regression'] and scaler:
-            input_scaled = scaler.transform(input_df)
-            prediction = model.predict(input_scaled)[0]
-        else:
-            prediction = model.predict(input_df)[0]
+def digitalocean_model_version():
+    """Wersja modelu w Spaces: ETag pliku model_info.json (jedno zapytanie HEAD)"""
+    return get_model_storage().version(MODEL_INFO_KEY)
+
+@st.cache_resource
+def get_model_registry(model_source: str) -> ModelRegistry:
+    """Rejestr modelu współdzielony przez wszystkie sesje w procesie"""
+    if model_source == "Lokalny katalog":
+        return ModelRegistry(load_model_from_local, local_model_version, MODEL_CHECK_INTERVAL, compile_predictor)
+    return ModelRegistry(load_model_from_digitalocean, digitalocean_model_version, MODEL_CHECK_INTERVAL, compile_predictor)
 
-        return prediction
+def predict_race_time(predictor, input_data):
+    """Wykonuje predykcję czasu biegu (predyktor z utils.fast_predictor)"""
+    try:
+        return predictor.predict_one(input_data)
     except Exception as e:
         st.error(f"Błąd predykcji: {e}")
         return None
@@ -106,6 +141,20 @@ def calculate_5km_tempo(time_5km_minutes):
     """Oblicza tempo na 5km w min/km"""
     return time_5km_minutes / 5.0
 
+def show_placements(predicted_tempo, gender, age):
+    """Miejsca, jakie przewidywane tempo dałoby w poprzednich edycjach"""
+    try:
+        # Ten sam ranking (przygotowane dane EDA) co na stronie EDA
+        from utils.helper_functions import load_ranking_index
+        placements = load_ranking_index().placements(predicted_tempo, gender, age)
+    except Exception as e:
+        st.caption(f"Rankingi z poprzednich edycji niedostępne: {e}")
+        return
+    if not placements.empty:
+        st.markdown("**🏅 Miejsce z tym tempem w poprzednich edycjach:**")
+        st.dataframe(placements.set_index(['Rok', 'Ranking']), use_container_width=True)
+
+
 def show():
     st.title("🎯 Model Predykcyjny")
     st.markdown("Przewidywanie czasu ukończenia Półmaratonu Wrocławskiego")
@@ -115,19 +164,20 @@ def show():
     model_source = st.radio("Źródło modelu:", ["Lokalny katalog", "DigitalOcean Spaces"], horizontal=True)
 
     with st.spinner("Ładowanie modelu..."):
-        if model_source == "Lokalny katalog":
-            model, scaler, model_info = load_model_from_local()
-        else:
-            model, scaler, model_info = load_model_from_digitalocean()
+        registry = get_model_registry(model_source)
+        predictor = registry.get_predictor()
 
-    if model is None or model_info is None:
+    if predictor is None:
+        if registry.last_error is not None:
+            st.error(f"❌ Błąd ładowania modelu ({model_source}): {registry.last_error}")
         st.error("❌ Nie można załadować modelu. Upewnij się, że model został wytrenowany i zapisany.")
         return
 
+    model_info = predictor.model_info
     st.success(f"✅ Model załadowany: **{model_info['model_name']}**")
 
     # Tab: Manual Input
-    input_tabs = st.tabs(["📝 Użyj formularza", "💬 Opisz siebie AI", "📊 Wyniki trenowania modelu"])
+    input_tabs = st.tabs(["📝 Użyj formularza", "💬 Opisz siebie AI", "📋 Predykcja zbiorcza", "📊 Wyniki trenowania modelu"])
     with input_tabs[0]:
         st.subheader("Wprowadź dane zawodnika")
         col1, col2 = st.columns(2)
@@ -146,13 +196,14 @@ def show():
                 '5 km Tempo': tempo_5km,
                 'Tempo Stabilność': pace_stability
             }
-            predicted_tempo = predict_race_time(model, scaler, input_data, model_info)
+            predicted_tempo = predict_race_time(predictor, input_data)
             if predicted_tempo:
                 finish_time = tempo_to_finish_time(predicted_tempo)
                 col1, col2, col3 = st.columns(3)
                 col1.metric("Przewidywane tempo", f"{predicted_tempo:.2f} min/km")
                 col2.metric("Przewidywany czas ukończenia", finish_time)
                 col3.metric("Dystans", f"{21.0975:.2f} km")
+                show_placements(predicted_tempo, 'M' if gender == "Mężczyzna" else 'K', age)
 
     # Tab: LLM Input
     with input_tabs[1]:
@@ -162,43 +213,141 @@ def show():
             if not user_text.strip():
                 st.warning("⚠️ Proszę wpisać opis!")
             else:
-                if not os.getenv("GOOGLE_API_KEY") or not os.getenv("LANGFUSE_PUBLIC_KEY"):
-                    st.error("❌ Brak konfiguracji API")
-                else:
-                    try:
-                        with st.spinner("🤖 Analizuję tekst za pomocą Google Gemini..."):
-                            extraction_result = extract_runner_data_with_gemini(user_text)
-                        extracted_data = extraction_result.get('output')
-                        if not extracted_data:
-                            st.error("❌ Błąd ekstrakcji danych")
+                api_configured = (
+                    os.getenv("LLM_BACKEND") == "stub"
+                    or bool(os.getenv("GOOGLE_API_KEY") and os.getenv("LANGFUSE_PUBLIC_KEY"))
+                )
+                try:
+                    # Klienci Gemini i Langfuse powstają dopiero, gdy są potrzebni (utils.llm_integration)
+                    from utils.llm_integration import (
+                        extract_runner_data,
+                        validate_extracted_data,
+                        convert_to_model_input,
+                        log_prediction_to_langfuse
+                    )
+                    from utils.local_extractor import extraction_stats
+                    from utils.extraction_cache import get_extraction_cache
+                    from utils.resilient_llm import TIMEOUT_ERRORS, CircuitOpenError
+
+                    # Proste opisy obsługuje lokalny ekstraktor - Gemini tylko gdy on nie wystarczy
+                    with st.spinner("🤖 Analizuję tekst..."):
+                        extraction_result = extract_runner_data(user_text, allow_llm=api_configured)
+                    extracted_data = extraction_result.get('output')
+                    is_local = extraction_result['metadata']['provider'] == 'local'
+                    if is_local:
+                        source = 'reguły lokalne'
+                    elif extraction_result['metadata'].get('cache', 'miss') != 'miss':
+                        source = 'Google Gemini (z cache)'
+                    else:
+                        source = 'Google Gemini'
+                    st.caption(
+                        f"Źródło ekstrakcji: {source} · "
+                        f"trafienia lokalne: {extraction_stats.hit_rate:.0%} z {extraction_stats.total}"
+                    )
+                    cache_stats = get_extraction_cache().stats()
+                    st.caption(
+                        f"Cache ekstrakcji Gemini: trafienia {cache_stats['hit_rate']:.0%} "
+                        f"(pamięć {cache_stats['memory_hits']}, dysk {cache_stats['disk_hits']}, "
+                        f"scalone {cache_stats['coalesced']}, chybienia {cache_stats['misses']}, "
+                        f"usunięte {cache_stats['memory_evictions']}/{cache_stats['disk_evictions']})"
+                    )
+                    if not extracted_data:
+                        st.error("❌ Błąd ekstrakcji danych")
+                    else:
+                        validation = validate_extracted_data(extracted_data)
+                        if not validation['is_valid']:
+                            if is_local and not api_configured:
+                                st.error("❌ Brak konfiguracji API - opis wymaga analizy przez Google Gemini")
+                            st.warning(validation['message'])
                         else:
                             st.success("✅ Dane wyekstrahowane!")
-                            validation = validate_extracted_data(extracted_data)
-                            if not validation['is_valid']:
-                                st.warning(validation['message'])
-                            else:
-                                st.success(validation['message'])
-                                model_input = convert_to_model_input(extracted_data)
-                                model_input['Tempo Stabilność'] = 0.06
-                                predicted_tempo = predict_race_time(model, scaler, model_input, model_info)
-                                if predicted_tempo:
-                                    finish_time = tempo_to_finish_time(predicted_tempo)
-                                    log_prediction_to_langfuse(
-                                        user_text=user_text,
-                                        extracted_data=extracted_data,
-                                        prediction=predicted_tempo,
-                                        model_name=model_info['model_name'],
-                                        success=True
-                                    )
-                                    col1, col2, col3 = st.columns(3)
-                                    col1.metric("Przewidywane tempo", f"{predicted_tempo:.2f} min/km")
-                                    col2.metric("Przewidywany czas ukończenia", finish_time)
-                                    col3.metric("Dystans", f"{21.0975:.2f} km")
-                    except Exception as e:
-                        st.error(f"❌ Nieoczekiwany błąd: {e}")
+                            st.success(validation['message'])
+                            model_input = convert_to_model_input(extracted_data)
+                            model_input['Tempo Stabilność'] = 0.06
+                            predicted_tempo = predict_race_time(predictor, model_input)
+                            if predicted_tempo:
+                                finish_time = tempo_to_finish_time(predicted_tempo)
+                                log_prediction_to_langfuse(
+                                    user_text=user_text,
+                                    extracted_data=extracted_data,
+                                    prediction=predicted_tempo,
+                                    model_name=model_info['model_name'],
+                                    success=True
+                                )
+                                col1, col2, col3 = st.columns(3)
+                                col1.metric("Przewidywane tempo", f"{predicted_tempo:.2f} min/km")
+                                col2.metric("Przewidywany czas ukończenia", finish_time)
+                                col3.metric("Dystans", f"{21.0975:.2f} km")
+                                show_placements(predicted_tempo, extracted_data['gender'], extracted_data['age'])
+                except (CircuitOpenError, *TIMEOUT_ERRORS) as e:
+                    st.warning(f"⏳ {e}. Skorzystaj z zakładki **📝 Użyj formularza** - działa bez AI.")
+                except Exception as e:
+                    st.error(f"❌ Nieoczekiwany błąd: {e}")
 
-    # Tab: Wyniki trenowania
+        from utils.llm_integration import gemini_call_stats
+        llm_stats = gemini_call_stats()
+        if llm_stats is not None:
+            with st.expander("📈 Opóźnienia i niezawodność Gemini"):
+                latency = llm_stats.pop('latency')
+                st.bar_chart(pd.Series(latency.pop('buckets_ms'), name="Liczba odpowiedzi"))
+                st.json({**llm_stats, **latency})
+
+                from utils.llm_metrics import llm_metrics
+                st.markdown("**Tokeny i czasy wg wariantu promptu** (ostatnie wywołania):")
+                st.dataframe(pd.DataFrame(llm_metrics.summary()).T, use_container_width=True)
+
+        from utils.telemetry import telemetry_stats
+        queue_stats = telemetry_stats()
+        if queue_stats is not None:
+            with st.expander("📡 Telemetria Langfuse"):
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Wysłane", f"{queue_stats['sent']:,}")
+                col2.metric("W kolejce", f"{queue_stats['pending']:,}")
+                col3.metric("Zapisane na dysk", f"{queue_stats['spilled']:,}", f"odtworzone {queue_stats['replayed']:,}",
+                            delta_color="off")
+                col4.metric("Utracone", f"{queue_stats['dropped']:,}")
+                if queue_stats['dropped']:
+                    st.warning(f"⚠️ Utracono {queue_stats['dropped']:,} zdarzeń telemetrii (pełna kolejka lub plik)")
+
+    # Tab: Predykcja zbiorcza
     with input_tabs[2]:
+        st.subheader("📋 Predykcja dla listy zawodników")
+        st.markdown(
+            "Wgraj plik CSV lub Excel z kolumnami: **Płeć** (M/K), **Wiek**, **Czas 5km** "
+            "(minuty lub MM:SS) i opcjonalnie **Stabilność**."
+        )
+        roster_file = st.file_uploader("Lista zawodników:", type=["csv", "xlsx"], key="roster_file")
+        if roster_file is not None and st.button("🚀 Przewiduj dla wszystkich", key="predict_batch"):
+            import tempfile
+            from utils.batch_prediction import predict_roster, read_roster_chunks
+
+            # Wyniki trafiają porcjami do pliku tymczasowego (usuwanego po zamknięciu), nie do pamięci
+            with tempfile.TemporaryFile() as result_file:
+                try:
+                    with st.spinner("Przetwarzanie listy zawodników..."):
+                        stats = predict_roster(predictor, read_roster_chunks(roster_file, roster_file.name), result_file)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    col1, col2, col3, col4 = st.columns(4)
+                    col1.metric("Wierszy", f"{stats['rows']:,}")
+                    col2.metric("Przewidziano", f"{stats['predicted']:,}")
+                    col3.metric("Błędne wiersze", f"{stats['invalid']:,}")
+                    col4.metric("Przepustowość", f"{stats['rows_per_sec']:,.0f} wierszy/s")
+
+                    st.markdown("**Podgląd wyników:**")
+                    result_file.seek(0)
+                    st.dataframe(pd.read_csv(result_file, sep=';', nrows=20, encoding='utf-8-sig'), use_container_width=True)
+                    result_file.seek(0)
+                    st.download_button(
+                        "⬇️ Pobierz wyniki (CSV)",
+                        data=result_file,
+                        file_name=f"predykcje_{Path(roster_file.name).stem}.csv",
+                        mime="text/csv"
+                    )
+
+    # Tab: Wyniki trenowania
+    with input_tabs[3]:
         from app_pages import training_results
         training_results.show()
 
@@ -1,7 +1,6 @@
 import streamlit as st
 import json
 from pathlib import Path
-from PIL import Image
 
 # -------------------------------------------------------
 # 🔧 Pomocnicze funkcje
@@ -49,6 +48,8 @@ def show():
         """)
         return
 
+    from PIL import Image
+
     st.success(f"✅ Znaleziono {len(manifest['plots'])} wykresów")
     st.caption(f"Wygenerowane: {manifest['created']}")
     st.markdown("---")
@@ -0,0 +1,72 @@
+"""
+Benchmark sekcji EDA Overview + Demographics ("Porównanie"): pełne dane vs kostka agregatów
+
+Dane syntetyczne (10k / 100k / 1M biegaczy na rok). Mierzy czas jednego rerunu
+(porównanie lat + płeć i grupy wiekowe dla obu lat) oraz jednorazowy koszt budowy kostki.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.aggregate_cube
+"""
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils import eda_utils
+from utils.aggregate_cube import build_aggregate_cube, cube_age_groups, cube_gender_distribution, cube_years_summary
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_prepared(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    finished = rng.random(n) < 0.85
+    tempo = rng.normal(5.8, 0.9, n).astype(np.float32)
+    return pd.DataFrame({
+        'Miejsce': np.where(finished, np.arange(1, n + 1), np.nan).astype(np.float32),
+        'Numer startowy': pd.array(np.arange(1, n + 1), dtype='Int32'),
+        'Płeć': pd.Categorical(rng.choice(['M', 'K'], n, p=[0.7, 0.3])),
+        'Wiek': rng.integers(16, 80, n).astype(np.float64),
+        'Tempo': np.where(finished, tempo, np.nan).astype(np.float32),
+        'Tempo Stabilność': np.where(finished, rng.uniform(0, 0.2, n), np.nan).astype(np.float32),
+    })
+
+
+def rerun_full(df_2023, df_2024):
+    eda_utils.compare_years_summary(df_2023, df_2024)
+    for df in (df_2023, df_2024):
+        eda_utils.analyze_gender_distribution(df)
+        eda_utils.analyze_age_groups(df)
+
+
+def rerun_cube(cube):
+    cube_years_summary(cube)
+    for year in (2023, 2024):
+        cube_gender_distribution(cube, year)
+        cube_age_groups(cube, year)
+
+
+def _best_time(func, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run():
+    warnings.filterwarnings("ignore", category=FutureWarning)  # observed= w groupby starych funkcji
+    for n in SIZES:
+        df_2023, df_2024 = make_prepared(n, 0), make_prepared(n, 1)
+        build_s = _best_time(lambda: build_aggregate_cube({2023: df_2023, 2024: df_2024}), repeats=1)
+        cube = build_aggregate_cube({2023: df_2023, 2024: df_2024})
+        full_ms = _best_time(lambda: rerun_full(df_2023, df_2024)) * 1000
+        cube_ms = _best_time(lambda: rerun_cube(cube)) * 1000
+        print(f"{n:>9,} wierszy/rok: pełne dane {full_ms:8.1f} ms/rerun, kostka ({len(cube)} wierszy) "
+              f"{cube_ms:6.1f} ms/rerun, budowa kostki {build_s * 1000:7.1f} ms (raz)")
+
+
+if __name__ == "__main__":
+    run()
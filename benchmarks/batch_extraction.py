@@ -0,0 +1,72 @@
+"""
+Przepustowość ekstrakcji wielu opisów: pojedyncze wywołania vs paczki wysyłane równolegle
+
+Zamiast Gemini używany jest StubLLM (opóźnienie na zapytanie + na każdy opis),
+więc skrypt działa offline i bez klucza API.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.batch_extraction
+"""
+import asyncio
+import random
+import time
+
+import utils.llm_integration as llm
+from utils.batch_extraction import RateLimiter, extract_runners_batch
+from utils.local_extractor import extract_runner_data_locally
+from utils.stub_llm import StubLLM
+
+DESCRIPTIONS = 500
+SEQUENTIAL_SAMPLE = 20
+REQUESTS_PER_MINUTE = 600
+CONFIGS = [(1, 4), (10, 4), (20, 4), (20, 8)]  # (opisów w paczce, równoległych zapytań)
+
+
+def make_descriptions(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    templates = [
+        "Jestem {gender_pl}, mam {age} lat, 5 km biegam w {time} minut",
+        "I'm a {age} year old {gender_en}, my 5k time is {time} min",
+        "{gender_pl_cap}, {age} lat, parkrun {time} min",
+    ]
+    descriptions = []
+    for i in range(n):
+        is_male = rng.random() < 0.6
+        descriptions.append(rng.choice(templates).format(
+            gender_pl="mężczyzną" if is_male else "kobietą",
+            gender_pl_cap="Mężczyzna" if is_male else "Kobieta",
+            gender_en="male" if is_male else "female",
+            age=rng.randint(18, 70),
+            time=rng.randint(18, 40),
+        ) + f" (zgłoszenie {i})")
+    return descriptions
+
+
+def run():
+    # Atrapa: 300 ms na zapytanie + 10 ms na każdy opis w paczce
+    llm._gemini_model = StubLLM(delay_s=0.3, jitter_s=0.05, item_delay_s=0.01, seed=0)
+    descriptions = make_descriptions(DESCRIPTIONS)
+
+    start = time.perf_counter()
+    for text in descriptions[:SEQUENTIAL_SAMPLE]:
+        llm.extract_runner_data_with_gemini(text)
+    sequential_rate = SEQUENTIAL_SAMPLE / (time.perf_counter() - start)
+    print(f"Pojedyncze wywołania (jedno po drugim):  {sequential_rate:7.1f} opisów/s")
+
+    for batch_size, concurrency in CONFIGS:
+        limiter = RateLimiter(requests_per_minute=REQUESTS_PER_MINUTE, max_concurrency=concurrency)
+        start = time.perf_counter()
+        # use_local=False - mierzymy samą ścieżkę LLM
+        results = asyncio.run(extract_runners_batch(descriptions, batch_size=batch_size, limiter=limiter, use_local=False))
+        elapsed = time.perf_counter() - start
+
+        in_order = all(
+            result['input'] == text and result['output'] == extract_runner_data_locally(text)
+            for text, result in zip(descriptions, results)
+        )
+        print(f"Paczki po {batch_size:>2}, {concurrency} równolegle, {REQUESTS_PER_MINUTE} zapytań/min: "
+              f"{len(results) / elapsed:7.1f} opisów/s ({elapsed:5.1f} s), kolejność i wyniki zgodne: {in_order}")
+
+
+if __name__ == "__main__":
+    run()
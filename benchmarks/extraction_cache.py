@@ -0,0 +1,58 @@
+"""
+Cache ekstrakcji: powtarzające się opisy (wielkość liter, spacje, interpunkcja) przy wolnym LLM
+
+Zamiast Gemini używana jest funkcja z opóźnieniem, a cache zapisuje do
+tymczasowej bazy SQLite, więc skrypt działa offline.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.extraction_cache
+"""
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from utils.extraction_cache import ExtractionCache
+
+LLM_LATENCY_S = 0.05
+UNIQUE_DESCRIPTIONS = 50
+REQUESTS = 500
+WORKERS = 8
+
+
+def make_requests(seed: int = 0) -> list:
+    """Opisy z powtórzeniami różniącymi się zapisem (trafiają w ten sam wpis cache)"""
+    rng = random.Random(seed)
+    base = [f"Mam {20 + i % 40} lat, 5 km biegam w {20 + i % 15}:{i % 60:02d}" for i in range(UNIQUE_DESCRIPTIONS)]
+    variants = [str.lower, str.upper, lambda t: f"  {t}!! ", lambda t: t.replace(", ", " ,  ")]
+    return [rng.choice(variants)(rng.choice(base)) for _ in range(REQUESTS)]
+
+
+def slow_llm(text: str) -> dict:
+    time.sleep(LLM_LATENCY_S)
+    return {'output': {'text_length': len(text)}}
+
+
+def run():
+    requests = make_requests()
+    print(f"{REQUESTS} zapytań, {UNIQUE_DESCRIPTIONS} różnych opisów, LLM {LLM_LATENCY_S * 1000:.0f} ms, {WORKERS} wątków")
+    print(f"Bez cache (szacunek):    {REQUESTS * LLM_LATENCY_S / WORKERS:6.2f} s")
+
+    db_path = Path(tempfile.mkdtemp()) / "extractions.sqlite"
+    cache = ExtractionCache(db_path=db_path)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        list(pool.map(lambda text: cache.get_or_compute(text, slow_llm), requests))
+    print(f"Zimny cache:             {time.perf_counter() - start:6.2f} s | {cache.stats()}")
+
+    # Nowy proces (pusta pamięć) - wyniki z SQLite
+    cache = ExtractionCache(db_path=db_path)
+    start = time.perf_counter()
+    for text in requests:
+        cache.get_or_compute(text, slow_llm)
+    print(f"Po restarcie (dysk):     {time.perf_counter() - start:6.2f} s | {cache.stats()}")
+
+
+if __name__ == "__main__":
+    run()
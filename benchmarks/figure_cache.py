@@ -0,0 +1,110 @@
+"""
+Wykresy EDA w 1000 symulowanych rerunach: czas i pamięć (RSS) procesu
+
+Warianty:
+    bez cache, bez zamykania - dotychczasowa ścieżka (plot_* + zapis PNG jak w st.pyplot)
+    bez cache, z zamykaniem  - render_plot (figura zamykana po zapisie)
+    cache bajtów PNG         - render_plot raz na (odcisk danych, rok, wykres), potem odczyt
+
+Każdy rerun rysuje jeden z czterech wykresów rozkładów dla jednego z dwóch lat (po kolei).
+Dane syntetyczne; wariant bez cache domyślnie liczy mniej rerunów (--uncached-reruns),
+bo pojedynczy wykres to setki ms.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.figure_cache
+    python -m benchmarks.figure_cache --uncached-reruns 1000
+"""
+import argparse
+import io
+import itertools
+import os
+import time
+import warnings
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from utils import eda_utils
+from utils.data_cache import dataset_fingerprint
+
+
+def make_prepared(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    tempo = rng.normal(5.8, 0.9, n)
+    df = pd.DataFrame({
+        'Płeć': rng.choice(['M', 'K'], n, p=[0.7, 0.3]),
+        'Wiek': rng.integers(16, 80, n).astype(np.float64),
+        'Tempo': tempo,
+        'Tempo Stabilność': rng.uniform(0, 0.2, n),
+    })
+    for i, split in enumerate(['5 km Tempo', '10 km Tempo', '15 km Tempo', '20 km Tempo']):
+        df[split] = tempo + rng.normal(0, 0.2, n) + 0.05 * i
+    return df
+
+
+def rss_mb() -> float:
+    """Bieżący RSS procesu (Linux: /proc; gdzie indziej - szczyt z getrusage)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        import resource  # tylko Unix
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def render_unclosed(plot: str, df: pd.DataFrame, year: int) -> bytes:
+    """Poprzednia ścieżka: figura zapisana (jak st.pyplot), ale nigdy nie zamknięta"""
+    fig = eda_utils.PLOT_FUNCTIONS[plot](df, year)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def simulate(name: str, render, frames: dict, reruns: int) -> None:
+    requests = itertools.cycle(itertools.product(eda_utils.PLOT_FUNCTIONS, frames))
+    rss_before = rss_mb()
+    timings = []
+    start = time.perf_counter()
+    for _ in range(reruns):
+        plot, year = next(requests)
+        rerun_started_at = time.perf_counter()
+        render(plot, frames[year], year)
+        timings.append((time.perf_counter() - rerun_started_at) * 1000)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<26} {reruns:>5} rerunów: {elapsed:7.1f} s, p50 {np.percentile(timings, 50):8.3f} ms, "
+          f"p99 {np.percentile(timings, 99):8.3f} ms, RSS {rss_before:6.0f} -> {rss_mb():6.0f} MB, "
+          f"otwarte figury: {len(plt.get_fignums())}")
+
+
+def run(rows: int, reruns: int, uncached_reruns: int):
+    warnings.filterwarnings("ignore")  # "More than 20 figures have been opened" w wariancie bez zamykania
+    frames = {2023: make_prepared(rows, 0), 2024: make_prepared(rows, 1)}
+    fingerprints = {year: dataset_fingerprint(df) for year, df in frames.items()}
+    print(f"Dane: {rows:,} wierszy na rok, 4 wykresy × 2 lata\n")
+
+    cache = {}
+
+    def render_cached(plot, df, year):
+        key = (fingerprints[year], year, plot)
+        if key not in cache:
+            cache[key] = eda_utils.render_plot(plot, df, year)
+        return cache[key]
+
+    simulate("cache bajtów PNG", render_cached, frames, reruns)
+    print(f"{'':<26} rozmiar cache: {len(cache)} obrazów, {sum(map(len, cache.values())) / 1024 ** 2:.1f} MB")
+    simulate("bez cache, z zamykaniem", eda_utils.render_plot, frames, uncached_reruns)
+    simulate("bez cache, bez zamykania", render_unclosed, frames, uncached_reruns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--uncached-reruns", type=int, default=100)
+    args = parser.parse_args()
+    run(args.rows, args.reruns, args.uncached_reruns)
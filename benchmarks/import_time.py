@@ -0,0 +1,69 @@
+"""
+Raport czasu importu: ile kosztuje zimny import każdej strony i jej zależności
+
+Każdy moduł importowany jest w osobnym procesie z `python -X importtime`,
+a czasy własne (self) sumowane są według pakietu najwyższego poziomu.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time app_pages.eda_analysis utils.llm_integration
+"""
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+DEFAULT_MODULES = [
+    "streamlit",
+    "app_pages.data_overview",
+    "app_pages.eda_analysis",
+    "app_pages.prediction_model",
+    "app_pages.training_results",
+    "utils.helper_functions",
+    "utils.eda_utils",
+    "utils.llm_integration",
+]
+
+TOP_PACKAGES = 8
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module: str) -> dict:
+    """Importuje moduł w czystym procesie i zwraca czasy (ms) z -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+
+    by_package = defaultdict(float)
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        by_package[name.split(".")[0]] += int(self_us) / 1000
+        if name == module:
+            total_ms = int(cumulative_us) / 1000
+
+    return {
+        "module": module,
+        "total_ms": total_ms,
+        "ok": result.returncode == 0,
+        "by_package": dict(sorted(by_package.items(), key=lambda item: -item[1]))
+    }
+
+
+def run(modules: list):
+    for module in modules:
+        report = measure_import(module)
+        status = "" if report["ok"] else "  (błąd importu)"
+        print(f"\n{report['module']}: {report['total_ms']:.0f} ms{status}")
+        for package, ms in list(report["by_package"].items())[:TOP_PACKAGES]:
+            print(f"    {package:<28} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:] or DEFAULT_MODULES)
@@ -0,0 +1,46 @@
+"""
+Koszt klientów Gemini / Langfuse: czas importu utils.llm_integration i pierwszego użycia klientów
+
+Klienci tworzeni są bez zapytań sieciowych, więc skrypt działa także bez kluczy API.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.llm_clients
+"""
+import threading
+import time
+
+from benchmarks.import_time import measure_import
+
+THREADS = 8
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run():
+    report = measure_import("utils.llm_integration")
+    print(f"Zimny import utils.llm_integration: {report['total_ms']:.0f} ms")
+
+    import utils.llm_integration as llm
+
+    for name, getter in [("Gemini", llm.get_gemini_model), ("Langfuse", llm.get_langfuse_client)]:
+        first_ms = _timed(getter)
+        second_ms = _timed(getter)
+        print(f"{name:<9} pierwsze użycie: {first_ms:8.1f} ms | kolejne: {second_ms * 1000:6.1f} µs")
+
+    # Równoczesne pierwsze użycie z wielu wątków daje jedną instancję
+    llm._gemini_model = None
+    instances = []
+    threads = [threading.Thread(target=lambda: instances.append(id(llm.get_gemini_model()))) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"{THREADS} wątków naraz -> {len(set(instances))} instancja klienta Gemini")
+
+
+if __name__ == "__main__":
+    run()
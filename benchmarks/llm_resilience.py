@@ -0,0 +1,117 @@
+"""
+Odporność wywołań LLM: limit czasu, ponowienia, hedge i wyłącznik obwodu na lokalnej atrapie
+
+Zamiast Gemini używany jest StubLLM z wstrzykiwanymi opóźnieniami i błędami,
+więc skrypt działa offline i bez klucza API.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.llm_resilience
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.llm_integration import create_extraction_prompt
+from utils.resilient_llm import CircuitBreaker, CircuitOpenError, ResilientCaller
+from utils.stub_llm import StubLLM
+
+CALLS = 300
+CONCURRENCY = 8
+PROMPT = create_extraction_prompt("Jestem kobietą, mam 28 lat, biegam 5km w około 30 minut")
+
+
+def _caller(stub: StubLLM, **kwargs) -> ResilientCaller:
+    return ResilientCaller(lambda prompt, timeout: stub.generate_content(prompt, request_options={'timeout': timeout}),
+                           **kwargs)
+
+
+def _run_calls(caller: ResilientCaller, calls: int = CALLS) -> dict:
+    def one(_):
+        start = time.perf_counter()
+        try:
+            caller.call(PROMPT)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, type(e).__name__
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(one, range(calls)))
+
+    latencies_ms = np.array([latency for latency, error in results if error is None]) * 1000
+    errors = [error for _, error in results if error is not None]
+    return {
+        'ok': len(latencies_ms),
+        'errors': len(errors),
+        'p50_ms': np.percentile(latencies_ms, 50) if len(latencies_ms) else float('nan'),
+        'p95_ms': np.percentile(latencies_ms, 95) if len(latencies_ms) else float('nan'),
+        'p99_ms': np.percentile(latencies_ms, 99) if len(latencies_ms) else float('nan'),
+    }
+
+
+def _print(label: str, result: dict, caller: ResilientCaller):
+    stats = caller.stats()
+    print(f"{label:<28} OK {result['ok']:>4} | błędy {result['errors']:>3} | "
+          f"p50 {result['p50_ms']:7.1f} ms | p95 {result['p95_ms']:7.1f} ms | p99 {result['p99_ms']:7.1f} ms | "
+          f"ponowienia {stats['retries']:>3} | hedge {stats['hedges']:>3} (wygrane {stats['hedge_wins']})")
+
+
+def run():
+    # Ogon opóźnień: 5% odpowiedzi trwa 1 s
+    tail = dict(delay_s=0.05, jitter_s=0.02, slow_rate=0.05, slow_delay_s=1.0)
+    for hedge in (False, True):
+        caller = _caller(StubLLM(**tail, seed=1), hedge=hedge, timeout_s=5.0)
+        _run_calls(caller, 50)  # rozgrzewka - p95 do opóźnienia hedge
+        _print(f"Ogon 5% x 1 s, hedge={hedge}", _run_calls(caller), caller)
+    print(f"    histogram (hedge): {caller.stats()['latency']['buckets_ms']}")
+
+    # Błędy przejściowe: 20% zapytań kończy się wyjątkiem
+    for retries in (0, 2):
+        caller = _caller(StubLLM(error_rate=0.2, seed=2), retries=retries, backoff_base_s=0.05,
+                         breaker=CircuitBreaker(failure_threshold=0.9))
+        _print(f"Błędy 20%, ponowienia={retries}", _run_calls(caller), caller)
+
+    # Tylko błędy przejściowe są ponawiane: 400 od razu, DeadlineExceeded (timeout) i 503 - tak
+    from google.api_core.exceptions import DeadlineExceeded, InvalidArgument, ServiceUnavailable
+    for error in (InvalidArgument("zły prompt"), DeadlineExceeded("deadline"), ServiceUnavailable("503")):
+        attempts = []
+
+        def failing(prompt, timeout, error=error):
+            attempts.append(prompt)
+            raise error
+
+        caller = ResilientCaller(failing, retries=2, backoff_base_s=0.01)
+        try:
+            caller.call(PROMPT)
+        except type(error):
+            pass
+        stats = caller.stats()
+        print(f"{type(error).__name__:<28} prób {len(attempts)} | timeouty {stats['timeouts']} | błędy {stats['errors']}")
+        assert len(attempts) == (1 if isinstance(error, InvalidArgument) else 3)
+        assert stats['timeouts'] == (3 if isinstance(error, DeadlineExceeded) else 0)
+
+    # Zawieszona usługa: limit czasu zamiast nieskończonego spinnera
+    caller = _caller(StubLLM(slow_rate=1.0, slow_delay_s=30.0), timeout_s=0.3, retries=1, backoff_base_s=0.05)
+    start = time.perf_counter()
+    try:
+        caller.call(PROMPT)
+    except TimeoutError as e:
+        print(f"\nZawieszona usługa: {e} po {time.perf_counter() - start:.2f} s (limit 0.3 s, 1 ponowienie)")
+
+    # Awaria: wyłącznik otwiera się i kolejne zapytania są odrzucane od razu
+    stub = StubLLM(error_rate=1.0)
+    caller = _caller(stub, retries=0, breaker=CircuitBreaker(window=10, min_calls=5, cooldown_s=60))
+    for _ in range(20):
+        start = time.perf_counter()
+        try:
+            caller.call(PROMPT)
+        except CircuitOpenError:
+            rejected_us = (time.perf_counter() - start) * 1e6
+        except ConnectionError:
+            pass
+    print(f"Awaria: wyłącznik {caller.breaker.state}, wysłano {stub.calls} z 20 zapytań, "
+          f"odrzucenie trwa {rejected_us:.0f} µs")
+
+
+if __name__ == "__main__":
+    run()
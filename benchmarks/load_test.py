@@ -0,0 +1,71 @@
+"""
+Test obciążeniowy serwisu predykcji (prediction_service.py)
+
+Uruchomienie (serwis musi działać na localhost):
+    python prediction_service.py &
+    python -m benchmarks.load_test --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import aiohttp
+import numpy as np
+
+
+def make_payload(rng: random.Random) -> dict:
+    return {
+        'gender': rng.choice(['M', 'K']),
+        'age': rng.randint(18, 75),
+        'time_5km_minutes': round(rng.uniform(17.0, 40.0), 1),
+    }
+
+
+async def _worker(session, url: str, counter: list, latencies: list, errors: list, seed: int):
+    rng = random.Random(seed)
+    while counter[0] > 0:
+        counter[0] -= 1
+        start = time.perf_counter()
+        try:
+            async with session.post(url, json=make_payload(rng)) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+        except aiohttp.ClientError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url: str, concurrency: int, total: int):
+    counter = [total]
+    latencies, errors = [], []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started_at = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(session, f"{base_url}/predict", counter, latencies, errors, seed)
+            for seed in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started_at
+
+        async with session.get(f"{base_url}/metrics") as response:
+            server_metrics = await response.json()
+
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    print(f"Zapytań: {len(latencies)} OK, {len(errors)} błędów, równoległość {concurrency}")
+    print(f"Czas: {elapsed:.2f} s -> {len(latencies) / elapsed:,.0f} QPS")
+    print(f"Klient:  p50 {np.percentile(latencies_ms, 50):7.2f} ms | p99 {np.percentile(latencies_ms, 99):7.2f} ms")
+    print(f"Serwer:  p50 {server_metrics['p50_ms']:7.2f} ms | p99 {server_metrics['p99_ms']:7.2f} ms | "
+          f"średnia porcja {server_metrics['avg_batch_size']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.requests))
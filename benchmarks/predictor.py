@@ -0,0 +1,84 @@
+"""
+Benchmark predykcji: CompiledPredictor (NumPy) vs dotychczasowa ścieżka pandas + sklearn
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.predictor
+"""
+import json
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.fast_predictor import SCALED_MODELS, compile_predictor
+
+MODEL_PATH = 'models/halfmarathon_model_linear_regression.pkl'
+SCALER_PATH = 'models/scaler.pkl'
+INFO_PATH = 'models/model_info.json'
+
+SINGLE_REPEATS = 2_000
+BATCH_SIZES = [1_000, 100_000]
+
+
+def predict_sklearn(model, scaler, input_data, model_info):
+    """Poprzednia implementacja predict_race_time - punkt odniesienia"""
+    input_df = pd.DataFrame([input_data])[model_info['features']]
+    if model_info['model_name'] in SCALED_MODELS and scaler:
+        return model.predict(scaler.transform(input_df))[0]
+    return model.predict(input_df)[0]
+
+
+def make_inputs(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Gender_Numeric': rng.integers(0, 2, n),
+        'Wiek': rng.integers(18, 75, n),
+        '5 km Tempo': rng.uniform(3.5, 8.0, n),
+        'Tempo Stabilność': rng.uniform(0.0, 0.2, n),
+    })
+
+
+def _best_time(func, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run():
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    with open(INFO_PATH, 'r') as f:
+        model_info = json.load(f)
+    predictor = compile_predictor(model, scaler, model_info)
+    print(f"Model: {model_info['model_name']}, szybka ścieżka NumPy: {predictor.is_fast}")
+
+    # Zgodność wyników
+    inputs = make_inputs(SINGLE_REPEATS)
+    records = inputs.to_dict('records')
+    expected = np.array([predict_sklearn(model, scaler, r, model_info) for r in records[:200]])
+    fast = np.array([predictor.predict_one(r) for r in records[:200]])
+    np.testing.assert_allclose(fast, expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(predictor.predict_batch(inputs[:200]), expected, rtol=1e-9, atol=1e-9)
+
+    # Pojedyncze predykcje
+    sklearn_s = _best_time(lambda: [predict_sklearn(model, scaler, r, model_info) for r in records[:200]]) / 200
+    fast_s = _best_time(lambda: [predictor.predict_one(r) for r in records]) / len(records)
+    print(f"\nPojedyncza predykcja:")
+    print(f"    pandas + sklearn: {sklearn_s * 1e6:10.1f} µs")
+    print(f"    CompiledPredictor: {fast_s * 1e6:9.1f} µs  ({sklearn_s / fast_s:.0f}x)")
+
+    # Predykcje wsadowe
+    print(f"\nPredykcja wsadowa:")
+    for n in BATCH_SIZES:
+        batch = make_inputs(n, seed=n)
+        sklearn_batch = _best_time(lambda: model.predict(scaler.transform(batch[model_info['features']])))
+        fast_batch = _best_time(lambda: predictor.predict_batch(batch))
+        print(f"    {n:>7} wierszy: sklearn {sklearn_batch * 1e3:8.2f} ms | NumPy {fast_batch * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    run()
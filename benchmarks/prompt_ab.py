@@ -0,0 +1,77 @@
+"""
+Porównanie A/B promptów ekstrakcji: pełny (z przykładami) vs kompaktowy
+
+Dla każdego wariantu raportuje średnie tokeny promptu / odpowiedzi (z usage_metadata),
+czasy p50 / p95, czas parsowania i trafność względem znanych wartości.
+Domyślnie używa lokalnej atrapy (tokeny przybliżone: ok. 4 znaki na token);
+z --live wywołuje prawdziwe Gemini (wymaga GOOGLE_API_KEY).
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.prompt_ab
+    python -m benchmarks.prompt_ab --live --samples 20
+"""
+import argparse
+import random
+
+import pandas as pd
+
+import utils.llm_integration as llm
+from utils.llm_metrics import LLMMetrics
+from utils.stub_llm import StubLLM
+
+
+def make_samples(n: int, seed: int = 0) -> list:
+    """Opisy z opisowym (trudniejszym dla reguł) wiekiem i czasem oraz znane poprawne wartości"""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        gender = rng.choice(["M", "K"])
+        age = rng.randint(20, 65)
+        minutes = rng.randint(19, 38)
+        text = rng.choice([
+            "Jestem {g}, w tym roku kończę {a} lat, a piątkę robię zwykle w {m} minut",
+            "{G} po treningach, wiek {a}, ostatnio 5 kilometrów zajęło mi {m} minut",
+        ]).format(g="mężczyzną" if gender == "M" else "kobietą",
+                  G="Facet" if gender == "M" else "Kobieta", a=age, m=minutes)
+        samples.append((text, {"gender": gender, "age": age, "time_5km_minutes": float(minutes)}))
+    return samples
+
+
+def _matches(output: dict, expected: dict) -> bool:
+    try:
+        return (output.get("gender") == expected["gender"] and int(output.get("age")) == expected["age"]
+                and abs(float(output.get("time_5km_minutes")) - expected["time_5km_minutes"]) < 0.5)
+    except (TypeError, ValueError):
+        return False
+
+
+def run(samples: int, live: bool):
+    if not live:
+        llm._gemini_model = StubLLM(delay_s=0.05, jitter_s=0.02, seed=0)
+    llm.llm_metrics = LLMMetrics()  # osobne metryki dla tego porównania
+
+    accuracy = {}
+    for variant in llm.PROMPT_VARIANTS:
+        correct = 0
+        for text, expected in make_samples(samples):
+            try:
+                result = llm.extract_runner_data_with_gemini(text, prompt_variant=variant)
+                correct += _matches(result["output"], expected)
+            except Exception as e:
+                print(f"    {variant}: błąd - {e}")
+        accuracy[variant] = correct / samples
+
+    summary = pd.DataFrame(llm.llm_metrics.summary()).T
+    summary["accuracy"] = pd.Series(accuracy)
+    columns = ["calls", "models", "prompt_tokens_mean", "response_tokens_mean", "total_tokens_sum",
+               "wall_p50_ms", "wall_p95_ms", "parse_mean_ms", "error_rate", "accuracy"]
+    print(f"Backend: {'Gemini' if live else 'atrapa (StubLLM)'}, {samples} opisów na wariant\n")
+    print(summary[columns].to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+    run(args.samples, args.live)
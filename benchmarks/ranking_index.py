@@ -0,0 +1,66 @@
+"""
+Rankingi Top-N i miejsce dla czasu: RankingIndex vs filtrowanie + nsmallest na pełnych danych
+
+Dane syntetyczne (płeć, kategoria wiekowa, tempo), dwa lata.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.ranking_index
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.ranking_index import RankingIndex
+
+SIZES = [10_000, 100_000, 500_000]
+CATEGORIES = ['20', '30', '40', '50', '60', '70']
+
+
+def make_results(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    gender = rng.choice(['M', 'K'], n)
+    return pd.DataFrame({
+        'Miejsce': np.arange(1, n + 1, dtype=np.float32),
+        'Płeć': pd.Categorical(gender),
+        'Kategoria wiekowa': pd.Categorical(np.char.add(gender, rng.choice(CATEGORIES, n))),
+        'Czas': rng.integers(3800, 10000, n),
+        'Tempo': rng.normal(5.5, 0.8, n).astype(np.float32),
+    })
+
+
+def scan_top(df: pd.DataFrame, gender: str, category: str) -> pd.DataFrame:
+    """Punkt odniesienia: filtr grupy i nsmallest przy każdym zapytaniu"""
+    group = df[df['Miejsce'].notna() & (df['Płeć'] == gender) & (df['Kategoria wiekowa'] == category)]
+    return group.nsmallest(10, 'Tempo')
+
+
+def scan_place(df: pd.DataFrame, tempo: float, gender: str) -> int:
+    group = df[df['Miejsce'].notna() & (df['Płeć'] == gender)]
+    return int((group['Tempo'] < tempo).sum()) + 1
+
+
+def timed_ms(func, repeat: int = 50) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def run():
+    for n in SIZES:
+        frames = {2023: make_results(n, 0), 2024: make_results(n, 1)}
+        start = time.perf_counter()
+        index = RankingIndex(frames)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        top_ms = timed_ms(lambda: index.top(2024, 'K', 'K30', 10))
+        place_ms = timed_ms(lambda: index.place(5.2, 2024, 'M'))
+        scan_top_ms = timed_ms(lambda: scan_top(frames[2024], 'K', 'K30'), repeat=5)
+        scan_place_ms = timed_ms(lambda: scan_place(frames[2024], 5.2, 'M'), repeat=5)
+        print(f"{n:>9,} wyników/rok: budowa {build_ms:6.0f} ms (raz) | Top-10 {top_ms:.3f} ms "
+              f"vs nsmallest {scan_top_ms:7.2f} ms | miejsce {place_ms:.4f} ms vs skan {scan_place_ms:7.2f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+"""
+Wyszukiwanie biegaczy: RunnerSearchIndex vs filtrowanie pełnych danych (str.contains)
+
+Dane syntetyczne (polskie imiona, nazwiska i drużyny z ogonkami), dwa lata.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.runner_search
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.runner_search import RunnerSearchIndex
+
+SIZES = [10_000, 100_000, 500_000]
+QUERIES = ['lukasz', 'Łukasz Wiś', 'kow', '12345', 'ks sle', 'lecka', 'nieznany']
+FIRST_NAMES = ['Łukasz', 'Paweł', 'Piotr', 'Anna', 'Małgorzata', 'Józef', 'Zofia', 'Michał', 'Ewa', 'Grzegorz']
+LAST_NAMES = ['Kowalski', 'Wiśniewski', 'Wójcik', 'Nowak', 'Żak', 'Kamiński', 'Lewandowska', 'Zieliński', 'Szymańska',
+              'Kowalska-Łęcka']
+TEAMS = ['KS Ślęża', 'Run Team', 'KB Wrocław', 'Biegam Bo Lubię', None, None]
+
+
+def make_runners(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Numer startowy': np.arange(1, n + 1),
+        'Imię': rng.choice(FIRST_NAMES, n),
+        'Nazwisko': rng.choice(LAST_NAMES, n),
+        'Drużyna': rng.choice(np.array(TEAMS, dtype=object), n),
+        'Miejsce': np.arange(1, n + 1, dtype=np.float64),
+        'Czas': rng.integers(3800, 10000, n),
+    })
+
+
+def scan(df: pd.DataFrame, query: str) -> pd.DataFrame:
+    """Punkt odniesienia: każde słowo zapytania szukane w połączonym tekście wiersza"""
+    text = (df['Imię'] + ' ' + df['Nazwisko'] + ' ' + df['Numer startowy'].astype(str) + ' '
+            + df['Drużyna'].fillna('')).str.lower()
+    mask = np.ones(len(df), dtype=bool)
+    for term in query.lower().split():
+        mask &= text.str.contains(term, regex=False).to_numpy()
+    return df[mask].head(20)
+
+
+def run():
+    for n in SIZES:
+        frames = {2023: make_runners(n, 0), 2024: make_runners(n, 1)}
+        start = time.perf_counter()
+        index = RunnerSearchIndex(frames)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        timings = []
+        for query in QUERIES:
+            for _ in range(50):
+                start = time.perf_counter()
+                index.search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        for df in frames.values():
+            scan(df, QUERIES[0])
+        scan_ms = (time.perf_counter() - start) * 1000
+        # Drugi człon nazwiska dwuczłonowego też jest osobnym słowem
+        assert (index.search('lecka', limit=5)['Nazwisko'] == 'Kowalska-Łęcka').all()
+        assert len(index.search('kowalska-lecka', limit=5)) == 5
+        print(f"{n:>9,} biegaczy/rok: budowa indeksu {build_ms:7.0f} ms (raz), wyszukiwanie "
+              f"p50 {np.percentile(timings, 50):.3f} ms / p99 {np.percentile(timings, 99):.3f} ms, "
+              f"str.contains po pełnych danych {scan_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,60 @@
+"""
+Czas rysowania wykresów z rozrzutem (plot_age_distribution, plot_pace_stability):
+punkty vs histogram 2D, dla rosnącej liczby biegaczy
+
+Czas obejmuje zapis do PNG (render_plot), bo to on dominuje przy wielu punktach.
+Wariant "punkty" wymusza stare zachowanie przez podniesienie progu binowania.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.scatter_binning
+"""
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+from utils import eda_utils
+
+SIZES = [2_000, 20_000, 200_000, 1_000_000]
+PLOTS = ['age_distribution', 'pace_stability']
+
+
+def make_prepared(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    age = rng.integers(16, 80, n).astype(np.float64)
+    return pd.DataFrame({
+        'Wiek': age,
+        'Tempo': 5.0 + 0.0005 * (age - 40) ** 2 + rng.normal(0, 0.8, n),
+        'Tempo Stabilność': rng.gamma(2.0, 0.03, n),
+    })
+
+
+def _render_time(plot: str, df: pd.DataFrame, threshold: int) -> float:
+    default_threshold = eda_utils.SCATTER_BINNING_THRESHOLD
+    eda_utils.SCATTER_BINNING_THRESHOLD = threshold
+    try:
+        start = time.perf_counter()
+        eda_utils.render_plot(plot, df, 2024)
+        return time.perf_counter() - start
+    finally:
+        eda_utils.SCATTER_BINNING_THRESHOLD = default_threshold
+
+
+def run():
+    eda_utils.render_plot(PLOTS[0], make_prepared(1_000), 2024)  # rozgrzewka (style, fonty)
+    print(f"Próg binowania: {eda_utils.SCATTER_BINNING_THRESHOLD:,} punktów\n")
+    for n in SIZES:
+        df = make_prepared(n)
+        for plot in PLOTS:
+            binned_s = _render_time(plot, df, 0)
+            # Punktów dla 1M wierszy nie rysujemy (bardzo wolne)
+            scatter = f"{_render_time(plot, df, n) * 1000:8.0f} ms" if n <= 200_000 else "       -   "
+            print(f"{n:>9,} biegaczy, {plot:<17}: punkty {scatter}, histogram 2D {binned_s * 1000:6.0f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,96 @@
+"""
+Benchmark telemetrii: koszt emit() na ścieżce zapytania przy wolnym / niedostępnym backendzie
+
+Zamiast Langfuse używany jest lokalny FakeCollector, więc skrypt działa offline.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.telemetry
+"""
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from utils.telemetry import FakeCollector, TelemetryQueue
+
+EVENTS = 2_000
+BACKEND_LATENCY_S = 0.2
+
+
+def make_event(i: int) -> dict:
+    return {'type': 'generation', 'name': 'benchmark', 'input': f"opis {i}", 'output': {'age': 30}}
+
+
+def run():
+    spill_path = Path(tempfile.mkdtemp()) / "telemetry_spill.jsonl"
+
+    # Wywołanie synchroniczne (jak wcześniej @observe + flush) - każde zdarzenie czeka na backend
+    collector = FakeCollector(latency_s=BACKEND_LATENCY_S)
+    start = time.perf_counter()
+    for i in range(5):
+        collector([make_event(i)])
+    sync_ms = (time.perf_counter() - start) / 5 * 1000
+    print(f"Synchronicznie (backend {BACKEND_LATENCY_S * 1000:.0f} ms): {sync_ms:8.2f} ms / zdarzenie")
+
+    # Kolejka w tle: emit() tylko wkłada zdarzenie do kolejki
+    telemetry = TelemetryQueue(collector, max_queue=10_000, batch_size=100, flush_interval=0.5, spill_path=spill_path)
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        telemetry.emit(make_event(i))
+    emit_us = (time.perf_counter() - start) / EVENTS * 1e6
+    print(f"Kolejka w tle:                  {emit_us:8.2f} µs / zdarzenie")
+    telemetry.flush(timeout=30)
+    print(f"    po flush: {telemetry.stats()} (paczek: {len(collector.batches) - 5})")
+
+    # Backend niedostępny: zdarzenia lądują na dysku, po powrocie są wysyłane ponownie
+    collector.down = True
+    collector.latency_s = 0.0
+    for i in range(500):
+        telemetry.emit(make_event(i))
+    telemetry.flush(timeout=30)
+    print(f"\nBackend niedostępny: {telemetry.stats()}")
+    print(f"    plik spill: {spill_path.stat().st_size if spill_path.exists() else 0} B")
+
+    collector.down = False
+    telemetry.emit(make_event(-1))
+    telemetry.flush(timeout=30)
+    print(f"Backend znów działa:  {telemetry.stats()}")
+
+    # Częściowo nieudany eksport: na dysk trafiają tylko odrzucone zdarzenia, a ponowna
+    # nieudana wysyłka z pliku nie zwiększa licznika 'spilled'
+    attempts = Counter()
+
+    def reject_twice(event):
+        attempts[event['input']] += 1
+        return event['input'].endswith("7") and attempts[event['input']] <= 2
+
+    partial_path = Path(tempfile.mkdtemp()) / "telemetry_spill.jsonl"
+    flaky = FakeCollector(reject=reject_twice)
+    partial = TelemetryQueue(flaky, batch_size=10, flush_interval=0.1, spill_path=partial_path)
+    for i in range(100):
+        partial.emit(make_event(i))
+    partial.flush(timeout=30)
+    print(f"\nCzęściowy eksport:          {partial.stats()}")
+    for i in (-1, -2):
+        partial.emit(make_event(i))
+        partial.flush(timeout=30)
+        print(f"Ponowna wysyłka z pliku:    {partial.stats()}")
+    stats = partial.stats()
+    duplicates = len(flaky.events) - len({event['input'] for event in flaky.events})
+    print(f"    duplikaty u odbiorcy: {duplicates}")
+    assert stats['spilled'] == 10 and stats['replayed'] == 10 and duplicates == 0
+    partial.close()
+
+    # Mała kolejka i zablokowany backend: nadmiar jest porzucany, emit() nadal nie czeka
+    slow = FakeCollector(latency_s=1.0)
+    small = TelemetryQueue(slow, max_queue=100, batch_size=10, flush_interval=0.1, spill_path=None)
+    start = time.perf_counter()
+    for i in range(1_000):
+        small.emit(make_event(i))
+    print(f"\nPełna kolejka: 1000 emit() w {(time.perf_counter() - start) * 1000:.1f} ms, {small.stats()}")
+    small.close(timeout=0.1)
+    telemetry.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,83 @@
+"""
+Benchmark parsera czasów: wektorowy convert_times_to_seconds vs dawny Series.apply
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.time_parser
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data_preprocessing import convert_times_to_seconds
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _convert_time_to_seconds_per_row(time_str) -> float:
+    """Poprzednia implementacja (wiersz po wierszu) - punkt odniesienia"""
+    try:
+        if pd.isna(time_str):
+            return np.nan
+        parts = str(time_str).split(':')
+        if len(parts) == 3:
+            h, m, s = parts
+            return int(h) * 3600 + int(m) * 60 + int(s)
+        elif len(parts) == 2:
+            m, s = parts
+            return int(m) * 60 + int(s)
+        else:
+            return np.nan
+    except:
+        return np.nan
+
+
+def make_times(n: int, seed: int = 0) -> pd.Series:
+    """Generuje kolumnę czasów HH:MM:SS / MM:SS z brakami, błędnymi wpisami i spacjami"""
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(900, 4 * 3600, n)
+    times = [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds]
+    series = pd.Series(times, dtype=object)
+    series[::10] = series[::10].str[3:]  # MM:SS
+    series[::13] = np.nan
+    series[::997] = "DNF"
+    # Spacje: wokół pól są dozwolone, wewnątrz liczby - nie
+    series[5::1009] = " 01:02:03 "
+    series[6::1009] = "01: 02 :03"
+    series[7::1009] = "51:0:54 7"
+    series[8::1009] = "1 0:00"
+    return series
+
+
+def _rows_per_sec(func, times: pd.Series, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(times)
+        best = min(best, time.perf_counter() - start)
+    return len(times) / best
+
+
+def run():
+    rows = []
+    for n in SIZES:
+        times = make_times(n)
+
+        expected = times.apply(_convert_time_to_seconds_per_row)
+        actual = convert_times_to_seconds(times)
+        pd.testing.assert_series_equal(actual, expected.astype('float64'), check_names=False)
+
+        vectorized = _rows_per_sec(convert_times_to_seconds, times)
+        per_row = _rows_per_sec(lambda t: t.apply(_convert_time_to_seconds_per_row), times)
+        rows.append({
+            'rows': n,
+            'apply (rows/s)': f"{per_row:,.0f}",
+            'vectorized (rows/s)': f"{vectorized:,.0f}",
+            'speedup': f"{vectorized / per_row:.1f}x"
+        })
+
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,120 @@
+"""
+Serwis HTTP do predykcji czasu półmaratonu
+
+Model ładowany jest raz przy starcie i trzymany w pamięci. Równoległe zapytania
+łączone są w małe porcje (utils.micro_batcher) i liczone jednym iloczynem
+macierzowym.
+
+Uruchomienie:
+    python prediction_service.py              # http://localhost:8080
+
+Endpointy:
+    POST /predict   {"gender": "M", "age": 32, "time_5km_minutes": 24.0}
+    GET  /metrics   p50 / p99 opóźnienia, QPS, średni rozmiar porcji
+    GET  /health
+"""
+import json
+import os
+from functools import partial
+
+import joblib
+from aiohttp import web
+
+from utils.fast_predictor import compile_predictor
+from utils.llm_integration import convert_to_model_input, validate_extracted_data
+from utils.micro_batcher import LatencyStats, MicroBatcher
+
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("MAX_WAIT_MS", "2"))
+
+HALF_MARATHON_KM = 21.0975
+
+# Odpowiedzi z polskimi znakami bez escapowania
+json_response = partial(web.json_response, dumps=partial(json.dumps, ensure_ascii=False))
+
+predictor_key = web.AppKey("predictor")
+batcher_key = web.AppKey("batcher")
+stats_key = web.AppKey("stats")
+
+
+def load_predictor(model_dir: str = MODEL_DIR):
+    """Ładuje model, scaler i model_info z katalogu (jak load_model_from_local w aplikacji)"""
+    model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl') and 'model' in f]
+    if not model_files:
+        raise FileNotFoundError(f"Brak pliku modelu w katalogu {model_dir}")
+
+    model = joblib.load(os.path.join(model_dir, model_files[0]))
+    scaler_path = os.path.join(model_dir, 'scaler.pkl')
+    scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else None
+    with open(os.path.join(model_dir, 'model_info.json'), 'r') as f:
+        model_info = json.load(f)
+
+    return compile_predictor(model, scaler, model_info)
+
+
+def tempo_to_finish_time(tempo_min_per_km: float) -> str:
+    """Tempo (min/km) -> czas ukończenia półmaratonu HH:MM:SS"""
+    total_seconds = int(tempo_min_per_km * HALF_MARATHON_KM * 60)
+    return f"{total_seconds // 3600:02d}:{total_seconds % 3600 // 60:02d}:{total_seconds % 60:02d}"
+
+
+async def predict(request: web.Request) -> web.Response:
+    started_at = request.loop.time()
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        return json_response({'error': 'Niepoprawny JSON'}, status=400)
+    if not isinstance(data, dict):
+        return json_response({'error': 'Oczekiwano obiektu JSON'}, status=400)
+
+    validation = validate_extracted_data(data)
+    if not validation['is_valid']:
+        return json_response({
+            'error': 'Niepoprawne dane',
+            'missing_fields': validation['missing_fields'],
+            'invalid_fields': validation['invalid_fields'],
+        }, status=400)
+
+    predictor = request.app[predictor_key]
+    model_input = convert_to_model_input(data)
+    tempo = await request.app[batcher_key].predict([model_input[f] for f in predictor.features])
+
+    request.app[stats_key].record_request(request.loop.time() - started_at)
+    return json_response({
+        'predicted_tempo': round(tempo, 4),
+        'finish_time': tempo_to_finish_time(tempo),
+        'model': predictor.model_info['model_name'],
+    })
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return json_response(request.app[stats_key].snapshot())
+
+
+async def health(request: web.Request) -> web.Response:
+    return json_response({'status': 'ok', 'model': request.app[predictor_key].model_info['model_name']})
+
+
+async def _start_batcher(app: web.Application):
+    app[batcher_key].start()
+    yield
+    await app[batcher_key].stop()
+
+
+def create_app(predictor=None, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS) -> web.Application:
+    """Buduje aplikację aiohttp z modelem załadowanym raz na proces"""
+    app = web.Application()
+    app[predictor_key] = predictor or load_predictor()
+    app[stats_key] = LatencyStats()
+    app[batcher_key] = MicroBatcher(app[predictor_key].predict_batch, max_batch_size, max_wait_ms, app[stats_key])
+    app.cleanup_ctx.append(_start_batcher)
+    app.router.add_post('/predict', predict)
+    app.router.add_get('/metrics', metrics)
+    app.router.add_get('/health', health)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), port=SERVICE_PORT)
@@ -0,0 +1,109 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from utils.eda_utils import age_group
+
+# Wymiary kostki
+CUBE_DIMENSIONS = ['Year', 'Płeć', 'Age_Group', 'Finished']
+
+# Miary sumowalne dla Tempo i Tempo Stabilność: liczba wartości, suma, suma kwadratów
+MEASURE_COLUMNS = {'Tempo': 'tempo', 'Tempo Stabilność': 'stability'}
+
+
+def build_aggregate_cube(frames: Dict[int, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Kostka agregatów: rok × płeć × grupa wiekowa × ukończenie
+
+    Args:
+        frames: rok -> dane po prepare_data_for_analysis
+
+    Returns:
+        Jeden wiersz na niepustą kombinację wymiarów (braki płci / wieku jako NaN)
+        z liczbą zgłoszeń (rows), numerów startowych (bibs) oraz count / sum / sumsq
+        dla Tempo i Tempo Stabilność (średnie i wariancje dowolnych przekrojów).
+        Kostka ma kilkadziesiąt wierszy niezależnie od liczby biegaczy.
+    """
+    parts = []
+    for year, df in frames.items():
+        part = pd.DataFrame({
+            'Year': year,
+            'Płeć': df['Płeć'],
+            'Age_Group': age_group(df['Wiek']),
+            'Finished': df['Miejsce'].notna(),
+            'rows': 1,
+            'bibs': df['Numer startowy'].notna().astype(np.int64),
+        })
+        for column, prefix in MEASURE_COLUMNS.items():
+            values = df[column].astype(np.float64)
+            part[f'{prefix}_count'] = values.notna().astype(np.int64)
+            part[f'{prefix}_sum'] = values.fillna(0.0)
+            part[f'{prefix}_sumsq'] = values.fillna(0.0) ** 2
+        parts.append(part.groupby(CUBE_DIMENSIONS, observed=True, dropna=False).sum().reset_index())
+
+    cube = pd.concat(parts, ignore_index=True)
+    # Wspólne kategorie płci z obu lat (concat kategorii o różnych słownikach daje object)
+    cube['Płeć'] = cube['Płeć'].astype('category')
+    return cube
+
+
+def _mean(totals, prefix: str):
+    # Przy braku wartości suma też jest 0, więc 0 / 0 -> NaN (jak mean() pustej kolumny)
+    with np.errstate(invalid='ignore'):
+        return totals[f'{prefix}_sum'] / totals[f'{prefix}_count']
+
+
+def cube_years_summary(cube: pd.DataFrame) -> pd.DataFrame:
+    """Porównanie podstawowych statystyk między latami (jak compare_years_summary)"""
+    rows = []
+    for year, year_cube in cube.groupby('Year'):
+        totals = year_cube.sum(numeric_only=True)
+        finished = year_cube[year_cube['Finished']].sum(numeric_only=True)
+        by_gender = year_cube.groupby('Płeć', observed=True)['rows'].sum()
+        rows.append({
+            'Year': int(year),
+            'Total Registered': int(totals['rows']),
+            'Total Finished': int(finished['rows']),
+            'Finish Rate %': round(finished['rows'] / totals['rows'] * 100, 2),
+            'Avg Tempo (min/km)': round(_mean(finished, 'tempo'), 2),
+            'Avg Stability': round(_mean(finished, 'stability'), 4),
+            'Male %': round(by_gender.get('M', 0) / by_gender.sum() * 100, 2),
+            'Female %': round(by_gender.get('K', 0) / by_gender.sum() * 100, 2)
+        })
+    return pd.DataFrame(rows)
+
+
+def cube_gender_distribution(cube: pd.DataFrame, year: int) -> pd.DataFrame:
+    """Analiza rozkładu płci w danym roku (jak analyze_gender_distribution)"""
+    year_cube = cube[cube['Year'] == year]
+    totals = year_cube.groupby('Płeć', observed=False)[['bibs', 'tempo_count', 'tempo_sum']].sum()
+    finished = year_cube[year_cube['Finished']].groupby('Płeć', observed=False)['rows'].sum()
+
+    gender_stats = pd.DataFrame({
+        'Registered': totals['bibs'],
+        'Finished': finished.reindex(totals.index, fill_value=0),
+        'Avg Tempo (min/km)': _mean(totals, 'tempo').round(2)
+    })
+    gender_stats['Finish Rate %'] = (gender_stats['Finished'] / gender_stats['Registered'] * 100).round(2)
+    return gender_stats
+
+
+def cube_gender_counts(cube: pd.DataFrame, year: int) -> pd.Series:
+    """Liczba zgłoszeń według płci (jak df['Płeć'].value_counts())"""
+    year_cube = cube[cube['Year'] == year]
+    return year_cube.groupby('Płeć', observed=False)['rows'].sum().sort_values(ascending=False).rename('count')
+
+
+def cube_age_groups(cube: pd.DataFrame, year: int) -> pd.DataFrame:
+    """Analiza grup wiekowych w danym roku (jak analyze_age_groups)"""
+    year_cube = cube[(cube['Year'] == year) & cube['Age_Group'].notna()]
+    totals = year_cube.groupby('Age_Group', observed=False)[
+        ['bibs', 'tempo_count', 'tempo_sum', 'stability_count', 'stability_sum']
+    ].sum()
+
+    return pd.DataFrame({
+        'Count': totals['bibs'],
+        'Avg Tempo (min/km)': _mean(totals, 'tempo').round(2),
+        'Avg Stability': _mean(totals, 'stability').round(4)
+    })
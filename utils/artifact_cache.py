@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows - blokada tylko w obrębie procesu
+    fcntl = None
+
+# Katalog cache artefaktów modelu (pliki nazwane skrótem SHA-256 zawartości)
+ARTIFACT_CACHE_DIR = Path(os.getenv("ARTIFACT_CACHE_DIR", "temp_models"))
+
+# Nieużywane obiekty młodsze niż ten czas (s) nie są usuwane - mogą należeć
+# do pobrania, które jeszcze nie trafiło do indeksu (inny wątek lub proces)
+ARTIFACT_GC_GRACE = float(os.getenv("ARTIFACT_GC_GRACE", "600"))
+
+
+class ArtifactCache:
+    """
+    Lokalny cache artefaktów adresowany zawartością
+
+    Każdy plik zapisywany jest jako objects/<sha256> (plik tymczasowy + atomowy
+    rename), a index.json mapuje klucz w źródle na (etag, sha256). Pobrania są
+    warunkowe: jeśli ETag się nie zmienił, nic nie jest przesyłane. Równoległe
+    sesje nigdy nie nadpisują pliku, z którego czyta inna sesja. Zmiany
+    index.json (także z innych procesów) chroni blokada pliku index.lock;
+    stare wersje usuwa collect_garbage, wywoływane po zakończeniu pobrań.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = Path(cache_dir or ARTIFACT_CACHE_DIR)
+        self.objects_dir = self.cache_dir / "objects"
+        self.index_path = self.cache_dir / "index.json"
+        self.lock_path = self.cache_dir / "index.lock"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def fetch(self, storage, key: str) -> Path:
+        """
+        Zwraca lokalną ścieżkę artefaktu, pobierając go tylko gdy zmienił się w źródle
+
+        Args:
+            storage: Źródło plików (data_cache.S3Storage lub LocalStorage)
+            key: Klucz obiektu
+
+        Returns:
+            Ścieżka do pliku objects/<sha256>
+        """
+        entry = self._read_index().get(key)
+        cached_path = self.objects_dir / entry['sha256'] if entry else None
+        known_etag = entry['etag'] if entry and cached_path.exists() else None
+
+        data, etag = storage.get(key, etag=known_etag)
+        if data is None:
+            return cached_path
+
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self.objects_dir / digest
+        try:
+            # Istniejący obiekt dostaje świeży mtime - collect_garbage go nie usunie, zanim trafi do indeksu
+            os.utime(object_path)
+        except FileNotFoundError:
+            tmp_path = self.objects_dir / f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, object_path)
+
+        self._update_index(key, {'etag': etag, 'sha256': digest})
+        return object_path
+
+    def cached_keys(self, prefix: str = "") -> list:
+        """Klucze obecne w cache (np. do odgadnięcia nazwy pliku modelu bez listowania)"""
+        return [key for key in self._read_index() if key.startswith(prefix)]
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        """Blokada indeksu: między wątkami (Lock) i procesami (fcntl na index.lock)"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_index(self, index: dict) -> None:
+        tmp_path = self.cache_dir / f"index.json.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def _update_index(self, key: str, entry: dict) -> None:
+        with self._locked():
+            index = self._read_index()
+            index[key] = entry
+            self._write_index(index)
+
+    def collect_garbage(self, live_keys: list = None, prefix: str = "", grace_seconds: float = ARTIFACT_GC_GRACE) -> int:
+        """
+        Usuwa stare wersje artefaktów (wywoływać po zakończeniu wszystkich pobrań)
+
+        Args:
+            live_keys: Klucze obecne w źródle - wpisy indeksu z `prefix` spoza tej listy
+                są usuwane (None = indeks bez zmian)
+            prefix: Zakres kluczy, którego dotyczy live_keys
+            grace_seconds: Obiekty młodsze niż ten czas zostają, nawet jeśli indeks ich nie zna
+
+        Returns:
+            Liczba usuniętych obiektów
+        """
+        with self._locked():
+            index = self._read_index()
+            if live_keys is not None:
+                live = set(live_keys)
+                stale = [key for key in index if key.startswith(prefix) and key not in live]
+                for key in stale:
+                    del index[key]
+                if stale:
+                    self._write_index(index)
+
+            referenced = {entry['sha256'] for entry in index.values()}
+            cutoff = time.time() - grace_seconds
+            removed = 0
+            for path in self.objects_dir.iterdir():
+                # Pliki .tmp to pobrania w toku
+                if path.suffix == '.tmp' or path.name in referenced:
+                    continue
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+            return removed
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List
+
+from utils.extraction_cache import normalize_text
+from utils.llm_integration import configured_model_name, emit_telemetry, get_gemini_caller, validate_extracted_data
+from utils.llm_metrics import llm_metrics, usage_from_response
+from utils.local_extractor import extract_runner_data_locally, extraction_stats
+
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+
+
+class RateLimiter:
+    """Asynchroniczny limit zapytań (token bucket) + limit równoczesnych zapytań"""
+
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.interval_s = 60.0 / requests_per_minute
+        self.capacity = max_concurrency
+        self.tokens = float(max_concurrency)
+        self.updated_at = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self.updated_at is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) / self.interval_s)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * self.interval_s)
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+def create_batch_extraction_prompt(user_texts: List[str]) -> str:
+    """Tworzy jeden prompt do ekstrakcji danych z wielu opisów (odpowiedź: tablica JSON)"""
+    items = "\n".join(f"[{i}] {' '.join(text.split())}" for i, text in enumerate(user_texts, start=1))
+    prompt = f"""
+Jesteś asystentem, który pomaga wyekstrahować dane z opisów biegaczy.
+
+OPISY UŻYTKOWNIKÓW:
+{items}
+
+ZADANIE:
+Dla KAŻDEGO opisu wyekstrahuj:
+1. Płeć (gender): "M" dla mężczyzny, "K" dla kobiety
+2. Wiek (age): liczba całkowita
+3. Czas na 5km w minutach (time_5km_minutes): liczba zmiennoprzecinkowa
+
+ZASADY:
+- Jeśli jakiejś informacji brak, ustaw wartość null
+- Zwróć TYLKO poprawną tablicę JSON bez dodatkowego tekstu, jeden obiekt na opis
+- "id" to numer opisu z nawiasu kwadratowego
+- Format: [{{"id": 1, "gender": "M/K/null", "age": number/null, "time_5km_minutes": number/null}}, ...]
+
+PRZYKŁAD:
+
+Input:
+[1] Cześć, mam 32 lata, jestem mężczyzną i ostatnio przebiegłem 5km w 24 minuty
+[2] Mam 45 lat, mój ostatni czas na 5 km to 27 minut
+Output: [{{"id": 1, "gender": "M", "age": 32, "time_5km_minutes": 24.0}}, {{"id": 2, "gender": null, "age": 45, "time_5km_minutes": 27.0}}]
+
+Teraz wyekstrahuj dane ze wszystkich podanych opisów.
+"""
+    return prompt
+
+
+def parse_batch_response(raw_response: str, count: int) -> List[Dict]:
+    """
+    Rozbija odpowiedź na wyniki kolejnych opisów
+
+    Returns:
+        Lista długości `count`; None dla opisów, których brak w odpowiedzi
+    """
+    raw_response = raw_response.strip()
+    if raw_response.startswith("```json"):
+        raw_response = raw_response[7:]
+    if raw_response.startswith("```"):
+        raw_response = raw_response[3:]
+    if raw_response.endswith("```"):
+        raw_response = raw_response[:-3]
+
+    try:
+        items = json.loads(raw_response.strip())
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Błąd parsowania JSON: {str(e)}")
+    if not isinstance(items, list):
+        raise ValueError("Odpowiedź nie jest tablicą JSON")
+
+    results = [None] * count
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get("id")) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count:
+            results[index] = {field: item.get(field) for field in ("gender", "age", "time_5km_minutes")}
+    return results
+
+
+def _result(user_text: str, output, provider: str, **metadata) -> Dict:
+    return {
+        "input": user_text,
+        "output": output,
+        "metadata": {"provider": provider, **metadata}
+    }
+
+
+async def _extract_batch(user_texts: List[str], limiter: RateLimiter) -> List[Dict]:
+    prompt = create_batch_extraction_prompt(user_texts)
+    async with limiter:
+        started_at = time.perf_counter()
+        try:
+            response = await asyncio.to_thread(get_gemini_caller().call, prompt)
+            latency_ms = (time.perf_counter() - started_at) * 1000
+            parse_started_at = time.perf_counter()
+            outputs = parse_batch_response(response.text, len(user_texts))
+            parse_ms = (time.perf_counter() - parse_started_at) * 1000
+        except Exception as e:
+            llm_metrics.record("batch", None, (time.perf_counter() - started_at) * 1000, ok=False)
+            emit_telemetry({
+                "type": "generation",
+                "name": "extract_runners_batch",
+                "input": user_texts,
+                "level": "ERROR",
+                "status_message": str(e),
+                "metadata": {"batch_size": len(user_texts)}
+            })
+            return [_result(text, None, "google", error=str(e)) for text in user_texts]
+
+    model = configured_model_name()
+    usage = usage_from_response(response)
+    llm_metrics.record("batch", model, latency_ms + parse_ms, parse_ms, **usage)
+    emit_telemetry({
+        "type": "generation",
+        "name": "extract_runners_batch",
+        "input": user_texts,
+        "output": outputs,
+        "model": model,
+        "usage_details": {"input": usage["prompt_tokens"], "output": usage["response_tokens"]}
+        if usage["prompt_tokens"] is not None else None,
+        "metadata": {"batch_size": len(user_texts), "latency_ms": latency_ms, "parse_ms": parse_ms, **usage}
+    })
+    return [
+        _result(text, output, "google", model=model, batch_size=len(user_texts),
+                **({} if output is not None else {"error": "Brak opisu w odpowiedzi LLM"}))
+        for text, output in zip(user_texts, outputs)
+    ]
+
+
+async def extract_runners_batch(user_texts: List[str], batch_size: int = LLM_BATCH_SIZE,
+                                limiter: RateLimiter = None, use_local: bool = True) -> List[Dict]:
+    """
+    Ekstrakcja danych z wielu opisów naraz
+
+    Opisy obsłużone przez reguły lokalne nie trafiają do LLM, powtórzone opisy
+    (po normalizacji) wysyłane są raz, a pozostałe pakowane po `batch_size`
+    w jeden prompt. Paczki wysyłane są równolegle w granicach limitu zapytań.
+
+    Returns:
+        Lista wyników w kolejności wejścia, w formacie extract_runner_data
+        (przy błędzie: output=None i metadata['error'])
+    """
+    limiter = limiter or RateLimiter()
+    results = [None] * len(user_texts)
+
+    pending = {}  # znormalizowany opis -> indeksy opisów
+    for i, text in enumerate(user_texts):
+        if use_local:
+            local_data = extract_runner_data_locally(text)
+            local_hit = validate_extracted_data(local_data)["is_valid"]
+            extraction_stats.record(local_hit)
+            if local_hit:
+                results[i] = _result(text, local_data, "local", model="local-rules",
+                                     prompt_tokens=0, response_tokens=0, total_tokens=0)
+                continue
+        pending.setdefault(normalize_text(text), []).append(i)
+
+    groups = list(pending.values())
+    batches = [groups[start:start + batch_size] for start in range(0, len(groups), batch_size)]
+    batch_results = await asyncio.gather(*[
+        _extract_batch([user_texts[indexes[0]] for indexes in batch], limiter) for batch in batches
+    ])
+
+    for batch, extracted in zip(batches, batch_results):
+        for indexes, result in zip(batch, extracted):
+            for i in indexes:
+                results[i] = {**result, "input": user_texts[i]}
+    return results
+
+
+def extract_runners_batch_sync(user_texts: List[str], **kwargs) -> List[Dict]:
+    """Wersja synchroniczna extract_runners_batch (np. dla Streamlit)"""
+    return asyncio.run(extract_runners_batch(user_texts, **kwargs))
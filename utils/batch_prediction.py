@@ -0,0 +1,179 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.data_preprocessing import convert_times_to_seconds
+from utils.data_schema import format_seconds
+
+HALF_MARATHON_KM = 21.0975
+
+# Domyślna stabilność tempa (jak w llm_integration.convert_to_model_input)
+DEFAULT_STABILITY = 0.06
+
+# Liczba wierszy przetwarzanych naraz - ogranicza zużycie pamięci dla dużych plików
+CHUNK_SIZE = 20_000
+
+# Akceptowane nazwy kolumn w pliku z listą zawodników (porównywane bez wielkości liter)
+COLUMN_ALIASES = {
+    'gender': ['gender', 'płeć', 'plec', 'sex'],
+    'age': ['age', 'wiek'],
+    'time_5km': ['time_5km', 'time_5km_minutes', '5 km czas', 'czas 5km', 'czas_5km', '5km'],
+    'stability': ['stability', 'tempo stabilność', 'stabilność', 'stabilnosc'],
+}
+
+GENDER_VALUES = {
+    'm': 'M', 'mężczyzna': 'M', 'mezczyzna': 'M', 'male': 'M',
+    'k': 'K', 'kobieta': 'K', 'f': 'K', 'female': 'K',
+}
+
+
+def _resolve_columns(columns) -> dict:
+    """Mapuje kolumny pliku na pola gender/age/time_5km/stability"""
+    normalized = {str(col).strip().lower(): col for col in columns}
+    resolved = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        match = next((normalized[a] for a in aliases if a in normalized), None)
+        if match is not None:
+            resolved[field] = match
+
+    missing = [f for f in ('gender', 'age', 'time_5km') if f not in resolved]
+    if missing:
+        raise ValueError(f"Brak wymaganych kolumn: {', '.join(missing)}")
+    return resolved
+
+
+def read_roster_chunks(file, filename: str, chunksize: int = CHUNK_SIZE):
+    """
+    Czyta plik CSV / Excel z listą zawodników porcjami po `chunksize` wierszy
+
+    Args:
+        file: Plik (ścieżka lub obiekt plikowy, np. z st.file_uploader)
+        filename: Nazwa pliku (rozszerzenie decyduje o formacie)
+        chunksize: Liczba wierszy w porcji
+
+    Yields:
+        DataFrame z kolejną porcją wierszy
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix in ('.xlsx', '.xlsm'):
+        yield from _read_excel_chunks(file, chunksize)
+    else:
+        # Separator ; (jak w danych z zawodów) lub , - wykrywany z nagłówka
+        if hasattr(file, 'readline'):
+            header = file.readline()
+            file.seek(0)
+        else:
+            with open(file, 'rb') as f:
+                header = f.readline()
+        if isinstance(header, bytes):
+            header = header.decode('utf-8-sig', errors='ignore')
+        sep = ';' if header.count(';') > header.count(',') else ','
+        yield from pd.read_csv(file, sep=sep, chunksize=chunksize, encoding='utf-8-sig')
+
+
+def _read_excel_chunks(file, chunksize: int):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        workbook.close()
+
+
+def prepare_roster_features(chunk: pd.DataFrame) -> tuple:
+    """
+    Wektorowo zamienia porcję listy zawodników na feature'y modelu
+
+    Czas na 5 km może być liczbą minut lub tekstem MM:SS / HH:MM:SS.
+    Walidacja jak w llm_integration.validate_extracted_data.
+
+    Returns:
+        Tuple: (DataFrame z feature'ami modelu, Series z opisem błędu - pusty tekst gdy OK)
+    """
+    columns = _resolve_columns(chunk.columns)
+
+    gender = chunk[columns['gender']].astype(str).str.strip().str.lower().map(GENDER_VALUES)
+    age = pd.to_numeric(chunk[columns['age']], errors='coerce')
+
+    time_raw = chunk[columns['time_5km']]
+    time_minutes = pd.to_numeric(time_raw, errors='coerce')
+    as_text = time_minutes.isna() & time_raw.notna()
+    if as_text.any():
+        parsed = convert_times_to_seconds(time_raw[as_text].astype(str).astype(object)) / 60
+        time_minutes = time_minutes.where(~as_text, parsed)
+
+    if 'stability' in columns:
+        stability = pd.to_numeric(chunk[columns['stability']], errors='coerce').fillna(DEFAULT_STABILITY)
+    else:
+        stability = pd.Series(DEFAULT_STABILITY, index=chunk.index)
+
+    errors = pd.Series('', index=chunk.index, dtype=object)
+    errors = errors.where(gender.notna(), errors + 'Płeć (M/K); ')
+    errors = errors.where(age.between(10, 100), errors + 'Wiek (10-100); ')
+    errors = errors.where(time_minutes.between(10, 60), errors + 'Czas na 5km (10-60 minut); ')
+
+    features = pd.DataFrame({
+        'Gender_Numeric': (gender == 'M').astype(np.float64),
+        'Wiek': age.astype(np.float64),
+        '5 km Tempo': time_minutes / 5.0,
+        'Tempo Stabilność': stability.astype(np.float64),
+    }, index=chunk.index)
+
+    return features, errors.str.rstrip('; ')
+
+
+def predict_roster(predictor, chunks, output) -> dict:
+    """
+    Predykcja dla całej listy zawodników, porcja po porcji
+
+    Wyniki każdej porcji są od razu dopisywane jako CSV do pliku `output`
+    (np. tempfile.TemporaryFile), więc w pamięci trzymana jest tylko jedna
+    porcja danych i jej CSV - niezależnie od długości listy.
+
+    Args:
+        predictor: CompiledPredictor (utils.fast_predictor)
+        chunks: Iterator DataFrame'ów (np. z read_roster_chunks)
+        output: Plik binarny otwarty do zapisu (CSV w UTF-8 z BOM, separator ;)
+
+    Returns:
+        Słownik ze statystykami
+    """
+    stats = {'rows': 0, 'predicted': 0, 'invalid': 0, 'seconds': 0.0}
+    started_at = time.perf_counter()
+
+    for i, chunk in enumerate(chunks):
+        features, errors = prepare_roster_features(chunk)
+        valid = (errors == '').to_numpy()
+
+        tempo = np.full(len(chunk), np.nan)
+        if valid.any():
+            tempo[valid] = predictor.predict_batch(features[valid])
+
+        result = chunk.copy()
+        result['Przewidywane tempo (min/km)'] = np.round(tempo, 2)
+        result['Przewidywany czas'] = format_seconds(pd.Series(np.floor(tempo * HALF_MARATHON_KM * 60), index=chunk.index))
+        result['Błąd'] = errors
+        # BOM tylko na początku pliku (Excel rozpoznaje wtedy UTF-8)
+        output.write(result.to_csv(sep=';', index=False, header=(i == 0)).encode('utf-8-sig' if i == 0 else 'utf-8'))
+
+        stats['rows'] += len(chunk)
+        stats['predicted'] += int(valid.sum())
+        stats['invalid'] += int((~valid).sum())
+
+    stats['seconds'] = time.perf_counter() - started_at
+    stats['rows_per_sec'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    return stats
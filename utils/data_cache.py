@@ -0,0 +1,205 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+
+import pandas as pd
+
+# Katalog lokalnego cache (pliki Parquet z przetworzonymi CSV)
+CACHE_DIR = Path(os.getenv("DATA_CACHE_DIR", "data_cache"))
+
+
+class S3Storage:
+    """Źródło plików w buckecie S3 / DigitalOcean Spaces"""
+
+    def __init__(self, client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def version(self, key: str) -> str:
+        """Zwraca identyfikator wersji obiektu (ETag + Last-Modified)"""
+        head = self.client.head_object(Bucket=self.bucket, Key=key)
+        return f"{head['ETag'].strip(chr(34))}:{head['LastModified'].isoformat()}"
+
+    def fetch(self, key: str, dest: Path) -> None:
+        """Pobiera obiekt do lokalnego pliku"""
+        self.client.download_file(self.bucket, key, str(dest))
+
+    def get(self, key: str, etag: str = None):
+        """
+        Warunkowy GET obiektu
+
+        Returns:
+            Krotka (zawartość, etag); zawartość jest None, jeśli obiekt się nie zmienił
+        """
+        kwargs = {'IfNoneMatch': f'"{etag}"'} if etag else {}
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key, **kwargs)
+        except self.client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+                return None, etag
+            raise
+        return response['Body'].read(), response['ETag'].strip('"')
+
+    def list(self, prefix: str) -> list:
+        """Lista kluczy o podanym prefiksie"""
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
+        return [obj['Key'] for obj in response.get('Contents', [])]
+
+
+class LocalStorage:
+    """Lokalny katalog udający bucket S3 (testy offline)"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def version(self, key: str) -> str:
+        stat = (self.root / key).stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def fetch(self, key: str, dest: Path) -> None:
+        shutil.copyfile(self.root / key, dest)
+
+    def get(self, key: str, etag: str = None):
+        version = self.version(key)
+        if etag == version:
+            return None, etag
+        return (self.root / key).read_bytes(), version
+
+    def list(self, prefix: str) -> list:
+        return sorted(
+            path.relative_to(self.root).as_posix()
+            for path in self.root.glob(f"{prefix}*")
+            if path.is_file()
+        )
+
+
+def _cache_path(key: str, version: str, cache_dir: Path, tag: str = "") -> Path:
+    """Ścieżka pliku Parquet dla danej wersji obiektu (i wersji transformacji)"""
+    digest = hashlib.sha1(f"{key}|{version}|{tag}".encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{Path(key).stem}-{digest}.parquet"
+
+
+def _remove_stale(key: str, keep: Path, cache_dir: Path) -> None:
+    """Usuwa starsze wersje pliku z cache"""
+    for path in cache_dir.glob(f"{Path(key).stem}-*.parquet"):
+        if path != keep:
+            path.unlink(missing_ok=True)
+
+
+def load_cached_csv(
+    storage,
+    key: str,
+    sep: str = ";",
+    cache_dir: Path = None,
+    transform=None,
+    tag: str = "",
+    columns: list = None
+) -> pd.DataFrame:
+    """
+    Wczytuje CSV ze źródła, korzystając z lokalnego cache w formacie Parquet
+
+    Plik jest pobierany i parsowany ponownie tylko wtedy, gdy zmieni się
+    wersja obiektu w źródle (ETag / Last-Modified).
+
+    Args:
+        storage: Źródło plików (S3Storage lub LocalStorage)
+        key: Klucz obiektu CSV
+        sep: Separator CSV
+        cache_dir: Katalog cache (domyślnie CACHE_DIR)
+        transform: Opcjonalna funkcja stosowana do DataFrame przed zapisem do cache
+        tag: Wersja transformacji (zmiana unieważnia cache)
+        columns: Opcjonalna lista kolumn do wczytania (projekcja)
+
+    Returns:
+        DataFrame z danymi
+    """
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    cache_path = _cache_path(key, storage.version(key), cache_dir, tag)
+    if cache_path.exists():
+        return pd.read_parquet(cache_path, columns=columns)
+
+    # Pobranie do pliku tymczasowego i parsowanie CSV
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp_dir:
+        csv_path = Path(tmp_dir) / Path(key).name
+        storage.fetch(key, csv_path)
+        df = pd.read_csv(csv_path, sep=sep)
+
+    if transform is not None:
+        df = transform(df)
+
+    # Atomowy zapis: plik tymczasowy + rename
+    tmp_path = cache_dir / f"{cache_path.name}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+        _remove_stale(key, cache_path, cache_dir)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"Nie udało się zapisać cache dla '{key}': {e}")
+
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+# Odciski nadane przy wczytaniu: id(df) -> (słaba referencja, odcisk). Poza df.attrs,
+# bo pandas kopiuje attrs do ramek pochodnych (copy, fillna, astype, assign...)
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+def _register_fingerprint(df: pd.DataFrame, fingerprint: str) -> None:
+    key = id(df)
+
+    def forget(ref):
+        with _fingerprints_lock:
+            if key in _fingerprints and _fingerprints[key][0] is ref:
+                del _fingerprints[key]
+
+    with _fingerprints_lock:
+        _fingerprints[key] = (weakref.ref(df, forget), fingerprint)
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Odcisk zawartości DataFrame (wartości, indeks i nazwy kolumn)
+
+    Dla ramki zarejestrowanej przy wczytaniu (attach_fingerprint, project_columns)
+    zwracany jest zapisany odcisk; każda inna ramka - także pochodna od
+    zarejestrowanej - jest haszowana.
+    """
+    with _fingerprints_lock:
+        entry = _fingerprints.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update("|".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def attach_fingerprint(df: pd.DataFrame) -> pd.DataFrame:
+    """Liczy odcisk raz (przy wczytaniu) i rejestruje go dla tego obiektu (dane tylko do odczytu)"""
+    _register_fingerprint(df, dataset_fingerprint(df))
+    return df
+
+
+def project_columns(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    Projekcja kolumn współdzieląca dane z `df` (bez kopii kolumn)
+
+    Odcisk projekcji wyprowadzany jest z odcisku całości i listy kolumn,
+    więc cache'e kluczowane odciskiem nie mylą projekcji z pełnymi danymi.
+    """
+    columns = [col for col in columns if col in df.columns]
+    projected = pd.DataFrame({col: df[col] for col in columns}, index=df.index, copy=False)
+    digest = hashlib.sha1(dataset_fingerprint(df).encode("utf-8"))
+    digest.update("|".join(map(str, columns)).encode("utf-8"))
+    _register_fingerprint(projected, digest.hexdigest()[:16])
+    return projected
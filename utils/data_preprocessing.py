@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 from typing import Tuple
+from utils.outliers import iqr_bounds
+
+# Maksymalna długość napisu z czasem (np. 'HH:MM:SS' z odstępami)
+MAX_TIME_LENGTH = 16
 
 def clean_data_for_modeling(df: pd.DataFrame, year: int) -> pd.DataFrame:
     """
@@ -24,7 +28,7 @@ def clean_data_for_modeling(df: pd.DataFrame, year: int) -> pd.DataFrame:
     time_columns = ['Czas', '5 km Czas', '10 km Czas', '15 km Czas', '20 km Czas']
     for col in time_columns:
         if col in df_clean.columns:
-            df_clean[f'{col}_seconds'] = df_clean[col].apply(_convert_time_to_seconds)
+            df_clean[f'{col}_seconds'] = convert_times_to_seconds(df_clean[col])
     
     # 3. Obliczanie wieku
     df_clean['Wiek'] = year - df_clean['Rocznik']
@@ -54,22 +58,75 @@ def clean_data_for_modeling(df: pd.DataFrame, year: int) -> pd.DataFrame:
     return df_clean
 
 
-def _convert_time_to_seconds(time_str: str) -> float:
-    """Konwertuje czas w formacie HH:MM:SS lub MM:SS na sekundy"""
-    try:
-        if pd.isna(time_str):
-            return np.nan
-        parts = str(time_str).split(':')
-        if len(parts) == 3:
-            h, m, s = parts
-            return int(h) * 3600 + int(m) * 60 + int(s)
-        elif len(parts) == 2:
-            m, s = parts
-            return int(m) * 60 + int(s)
-        else:
-            return np.nan
-    except:
-        return np.nan
+def convert_times_to_seconds(times: pd.Series) -> pd.Series:
+    """
+    Wektorowo konwertuje kolumnę czasów HH:MM:SS lub MM:SS na sekundy
+
+    Tekst jest zamieniany na macierz kodów znaków (wiersz = czas), a wartość
+    liczona jest schematem Hornera: cyfra -> pole*10 + cyfra, dwukropek ->
+    (suma + pole)*60. Braki i niepoprawne wartości (także spacja wewnątrz
+    liczby, np. '51:0:54 7') dają NaN. Kolumny
+    numeryczne (np. po data_schema) traktowane są jako gotowe sekundy.
+
+    Args:
+        times: Series z czasami (tekst lub liczba sekund)
+
+    Returns:
+        Series float64 z liczbą sekund
+    """
+    if pd.api.types.is_numeric_dtype(times):
+        return times.astype('float64')
+    if len(times) == 0:
+        return pd.Series(np.array([], dtype='float64'), index=times.index, name=times.name)
+
+    values = times.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    text = np.where(missing, '', values).astype(str)
+
+    # Jeden wiersz macierzy = jedna pozycja znaku we wszystkich czasach
+    codes = np.ascontiguousarray(text.view(np.uint32).reshape(len(text), -1).T)
+
+    total = np.zeros(len(text), dtype=np.int64)
+    field = np.zeros(len(text), dtype=np.int64)
+    has_digit = np.zeros(len(text), dtype=bool)
+    colons = np.zeros(len(text), dtype=np.int64)
+    # Spacja po cyfrach pola - kolejna cyfra w tym polu oznacza spację w środku liczby
+    space_after_digit = np.zeros(len(text), dtype=bool)
+    valid = ~missing
+
+    # Dłuższe napisy nie są czasami (i mogłyby przepełnić int64)
+    if codes.shape[0] > MAX_TIME_LENGTH:
+        valid &= (codes[MAX_TIME_LENGTH:] == 0).all(axis=0)
+        codes = codes[:MAX_TIME_LENGTH]
+
+    for c in codes:
+        digit = c.astype(np.int64) - 48
+        is_digit = digit.view(np.uint64) < 10
+        is_colon = c == 58
+        is_space = c == 32
+        # Dozwolone: cyfry, dwukropki, spacje i dopełnienie (kod 0); pole przed ':' nie może być puste
+        valid &= is_digit | is_colon | is_space | (c == 0)
+        valid &= ~is_colon | has_digit
+        # Spacje tylko wokół pól (jak int(' 05 ')), nie w środku liczby ('54 7')
+        valid &= ~(is_digit & space_after_digit)
+        space_after_digit |= is_space & has_digit
+
+        field *= np.where(is_digit, 10, 1)
+        field += np.where(is_digit, digit, 0)
+        has_digit |= is_digit
+
+        if is_colon.any():
+            total += np.where(is_colon, field, 0)
+            total *= np.where(is_colon, 60, 1)
+            field[is_colon] = 0
+            has_digit &= ~is_colon
+            space_after_digit &= ~is_colon
+            colons += is_colon
+
+    total += field
+    valid &= has_digit & ((colons == 1) | (colons == 2))
+
+    return pd.Series(np.where(valid, total, np.nan), index=times.index, name=times.name)
 
 
 def _remove_outliers_iqr(df: pd.DataFrame, column: str, factor: float = 1.5) -> pd.DataFrame:
@@ -81,12 +138,8 @@ def _remove_outliers_iqr(df: pd.DataFrame, column: str, factor: float = 1.5) ->
         column: Nazwa kolumny
         factor: Współczynnik IQR (domyślnie 1.5, dla bardziej agresywnego czyszczenia: 3.0)
     """
-    Q1 = df[column].quantile(0.25)
-    Q3 = df[column].quantile(0.75)
-    IQR = Q3 - Q1
-    
-    lower_bound = Q1 - factor * IQR
-    upper_bound = Q3 + factor * IQR
+    bounds = iqr_bounds(df, [column], factor).loc[column]
+    lower_bound, upper_bound = bounds['lower'], bounds['upper']
     
     df_filtered = df[(df[column] >= lower_bound) & (df[column] <= upper_bound)].copy()
     
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from utils.data_preprocessing import convert_times_to_seconds
+
+# Wersja schematu - zmiana unieważnia lokalny cache Parquet
+# (2: parser czasów odrzuca spacje wewnątrz liczb)
+SCHEMA_VERSION = "2"
+
+# Kolumny tekstowe o małej liczbie unikalnych wartości
+CATEGORY_COLUMNS = ['Płeć', 'Kategoria wiekowa', 'Drużyna', 'Miasto', 'Kraj']
+
+# Czasy HH:MM:SS przechowywane jako liczba sekund
+TIME_COLUMNS = ['Czas', '5 km Czas', '10 km Czas', '15 km Czas', '20 km Czas']
+
+# Tempa i stabilność (min/km)
+FLOAT_COLUMNS = ['Tempo', '5 km Tempo', '10 km Tempo', '15 km Tempo', '20 km Tempo', 'Tempo Stabilność']
+
+# Miejsca i rocznik (mogą zawierać braki, więc float32 zamiast int)
+PLACE_COLUMNS = [
+    'Miejsce', 'Płeć Miejsce', 'Kategoria wiekowa Miejsce', 'Rocznik',
+    '5 km Miejsce Open', '10 km Miejsce Open', '15 km Miejsce Open', '20 km Miejsce Open'
+]
+
+INT_COLUMNS = ['Numer startowy']
+
+# Projekcje kolumn dla poszczególnych stron aplikacji
+EDA_COLUMNS = [
+    'Miejsce', 'Numer startowy', 'Imię', 'Nazwisko', 'Płeć', 'Kategoria wiekowa', 'Rocznik',
+    *TIME_COLUMNS, *FLOAT_COLUMNS
+]
+
+
+def apply_race_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Nadaje jawne, oszczędne pamięciowo typy kolumnom danych z zawodów
+
+    - kolumny kategoryczne: category
+    - czasy HH:MM:SS: Int32 (sekundy)
+    - tempa: float32
+    - miejsca i rocznik: float32
+    """
+    df_typed = df.copy()
+
+    for col in CATEGORY_COLUMNS:
+        if col in df_typed.columns:
+            df_typed[col] = df_typed[col].astype('category')
+
+    for col in TIME_COLUMNS:
+        if col in df_typed.columns:
+            df_typed[col] = convert_times_to_seconds(df_typed[col]).round().astype('Int32')
+
+    for col in FLOAT_COLUMNS + PLACE_COLUMNS:
+        if col in df_typed.columns:
+            df_typed[col] = pd.to_numeric(df_typed[col], errors='coerce').astype(np.float32)
+
+    for col in INT_COLUMNS:
+        if col in df_typed.columns:
+            df_typed[col] = pd.to_numeric(df_typed[col], errors='coerce').astype('Int32')
+
+    return df_typed
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    """Zwraca zużycie pamięci DataFrame w MB (z zawartością stringów)"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def memory_report(raw_df: pd.DataFrame, typed_df: pd.DataFrame, label: str = "") -> dict:
+    """Porównanie zużycia pamięci przed i po nadaniu schematu"""
+    before = memory_usage_mb(raw_df)
+    after = memory_usage_mb(typed_df)
+    report = {
+        'label': label,
+        'rows': len(raw_df),
+        'before_mb': round(before, 2),
+        'after_mb': round(after, 2),
+        'reduction %': round((1 - after / before) * 100, 1) if before else 0.0
+    }
+    print(f"Pamięć {label}: {report['before_mb']} MB -> {report['after_mb']} MB (-{report['reduction %']}%)")
+    return report
+
+
+def format_seconds(seconds: pd.Series) -> pd.Series:
+    """Formatuje sekundy jako HH:MM:SS (do wyświetlania); tekst zostawia bez zmian"""
+    if not pd.api.types.is_numeric_dtype(seconds):
+        return seconds
+    values = seconds.astype('float64')
+    hours = (values // 3600).astype('Int64').astype(str).str.zfill(2)
+    minutes = (values % 3600 // 60).astype('Int64').astype(str).str.zfill(2)
+    secs = (values % 60).astype('Int64').astype(str).str.zfill(2)
+    return (hours + ':' + minutes + ':' + secs).where(values.notna(), None)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    from utils.helper_functions import DATA_PREFIX, get_data_storage
+
+    storage = get_data_storage()
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for year in (2023, 2024):
+            csv_path = Path(tmp_dir) / f"halfmarathon_{year}.csv"
+            storage.fetch(f"{DATA_PREFIX}/halfmarathon_wroclaw_{year}__final.csv", csv_path)
+            raw = pd.read_csv(csv_path, sep=";")
+            reports.append(memory_report(raw, apply_race_schema(raw), label=str(year)))
+    print(pd.DataFrame(reports).to_string(index=False))
@@ -1,12 +1,32 @@
+import io
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Tuple, Dict
+from utils.data_preprocessing import convert_times_to_seconds
+from utils.outliers import OutlierScan
+
+_plot_style_applied = False
+
+# Grupy wiekowe w analizie demograficznej
+AGE_BINS = [0, 20, 30, 40, 50, 60, 100]
+AGE_LABELS = ['<20', '20-29', '30-39', '40-49', '50-59', '60+']
+
+# Powyżej tej liczby punktów wykresy rozrzutu rysowane są jako histogram 2D
+SCATTER_BINNING_THRESHOLD = 5000
+SCATTER_BINS = 60
+
+
+def _apply_plot_style():
+    """Ustawienia stylu dla wykresów (seaborn importowany dopiero przy pierwszym wykresie)"""
+    global _plot_style_applied
+    if _plot_style_applied:
+        return
+    import seaborn as sns
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    _plot_style_applied = True
 
-# Ustawienia stylu dla wykresów
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
 
 def analyze_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """Analiza brakujących wartości z procentami"""
@@ -23,6 +43,22 @@ def analyze_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     return missing_df.reset_index(drop=True)
 
 
+def data_quality_summary(df: pd.DataFrame, df_prep: pd.DataFrame) -> Dict:
+    """
+    Sekcja Data Quality: liczby wierszy, kolumn i typy z danych przygotowanych
+    (prepare_data_for_analysis), braki z surowych danych
+    """
+    finished = int(df_prep['Finished'].sum())
+    return {
+        'rows': len(df_prep),
+        'finished': finished,
+        'finish_rate': finished / len(df_prep) * 100 if len(df_prep) else 0.0,
+        'columns': len(df_prep.columns),
+        'dtypes': df_prep.dtypes.astype(str).value_counts(),  # kategorie z różnymi wartościami jako jeden typ
+        'missing': analyze_missing_values(df),
+    }
+
+
 def basic_statistics(df: pd.DataFrame) -> pd.DataFrame:
     """Podstawowe statystyki numeryczne"""
     return df.describe()
@@ -30,20 +66,7 @@ def basic_statistics(df: pd.DataFrame) -> pd.DataFrame:
 
 def convert_time_to_seconds(time_str: str) -> float:
     """Konwertuje czas w formacie HH:MM:SS lub MM:SS na sekundy"""
-    try:
-        if pd.isna(time_str):
-            return np.nan
-        parts = str(time_str).split(':')
-        if len(parts) == 3:
-            h, m, s = parts
-            return int(h) * 3600 + int(m) * 60 + int(s)
-        elif len(parts) == 2:
-            m, s = parts
-            return int(m) * 60 + int(s)
-        else:
-            return np.nan
-    except:
-        return np.nan
+    return float(convert_times_to_seconds(pd.Series([time_str], dtype=object)).iloc[0])
 
 
 def prepare_data_for_analysis(df: pd.DataFrame) -> pd.DataFrame:
@@ -54,7 +77,7 @@ def prepare_data_for_analysis(df: pd.DataFrame) -> pd.DataFrame:
     time_columns = ['Czas', '5 km Czas', '10 km Czas', '15 km Czas', '20 km Czas']
     for col in time_columns:
         if col in df_clean.columns:
-            df_clean[f'{col}_seconds'] = df_clean[col].apply(convert_time_to_seconds)
+            df_clean[f'{col}_seconds'] = convert_times_to_seconds(df_clean[col])
     
     # Obliczanie wieku z rocznika
     current_year = 2023 if df_clean['Rocznik'].median() < 2010 else 2024
@@ -67,6 +90,11 @@ def prepare_data_for_analysis(df: pd.DataFrame) -> pd.DataFrame:
     return df_clean
 
 
+def age_group(age: pd.Series) -> pd.Series:
+    """Grupa wiekowa (AGE_LABELS) dla wieku; brak wieku -> NaN"""
+    return pd.cut(age, bins=AGE_BINS, labels=AGE_LABELS)
+
+
 def analyze_gender_distribution(df: pd.DataFrame) -> pd.DataFrame:
     """Analiza rozkładu płci"""
     gender_stats = df.groupby('Płeć').agg({
@@ -88,10 +116,7 @@ def analyze_gender_distribution(df: pd.DataFrame) -> pd.DataFrame:
 def analyze_age_groups(df: pd.DataFrame) -> pd.DataFrame:
     """Analiza grup wiekowych"""
     df_with_age = df[df['Wiek'].notna()].copy()
-    
-    age_bins = [0, 20, 30, 40, 50, 60, 100]
-    age_labels = ['<20', '20-29', '30-39', '40-49', '50-59', '60+']
-    df_with_age['Age_Group'] = pd.cut(df_with_age['Wiek'], bins=age_bins, labels=age_labels)
+    df_with_age['Age_Group'] = age_group(df_with_age['Wiek'])
     
     age_stats = df_with_age.groupby('Age_Group').agg({
         'Numer startowy': 'count',
@@ -111,16 +136,8 @@ def analyze_age_groups(df: pd.DataFrame) -> pd.DataFrame:
 
 def detect_outliers_iqr(df: pd.DataFrame, column: str) -> Tuple[pd.DataFrame, int]:
     """Wykrywa outliery metodą IQR"""
-    df_clean = df[df[column].notna()].copy()
-    
-    Q1 = df_clean[column].quantile(0.25)
-    Q3 = df_clean[column].quantile(0.75)
-    IQR = Q3 - Q1
-    
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    
-    outliers = df_clean[(df_clean[column] < lower_bound) | (df_clean[column] > upper_bound)]
+    scan = OutlierScan(df, [column])
+    outliers = df[scan.mask(column)]
     
     return outliers, len(outliers)
 
@@ -149,8 +166,46 @@ def compare_years_summary(df_2023: pd.DataFrame, df_2024: pd.DataFrame) -> pd.Da
     return comparison
 
 
+def _scatter_or_density(ax, x: pd.Series, y: pd.Series, color: str, cmap: str, x_bin_width: float = None) -> None:
+    """
+    Wykres rozrzutu; dla dużej liczby punktów histogram 2D (np.histogram2d)
+
+    Czas rysowania histogramu zależy od liczby przedziałów, a nie liczby biegaczy.
+    x_bin_width - stała szerokość przedziałów osi x (np. 1 rok dla wieku całkowitego,
+    żeby przedziały nie obejmowały raz jednej, a raz dwóch wartości)
+    """
+    if len(x) <= SCATTER_BINNING_THRESHOLD:
+        ax.scatter(x, y, alpha=0.3, s=10, color=color)
+        return
+
+    x_values = x.to_numpy(np.float64)
+    x_bins = SCATTER_BINS
+    if x_bin_width is not None:
+        x_bins = np.arange(np.floor(x_values.min()), np.floor(x_values.max()) + 2 * x_bin_width, x_bin_width)
+    counts, x_edges, y_edges = np.histogram2d(x_values, y.to_numpy(np.float64), bins=(x_bins, SCATTER_BINS))
+    mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap=cmap)
+    ax.figure.colorbar(mesh, ax=ax, label='Liczba uczestników')
+
+
+def _binned_means(x: pd.Series, y: pd.Series, bin_width: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Średnie y w przedziałach x o szerokości bin_width
+
+    Returns:
+        Krotka (środki przedziałów, średnie, liczności) - tylko niepuste przedziały
+    """
+    x_values = x.to_numpy(np.float64)
+    edges = np.arange(np.floor(x_values.min()), np.floor(x_values.max()) + 2 * bin_width, bin_width)
+    counts, _ = np.histogram(x_values, bins=edges)
+    sums, _ = np.histogram(x_values, bins=edges, weights=y.to_numpy(np.float64))
+    x_sums, _ = np.histogram(x_values, bins=edges, weights=x_values)
+    filled = counts > 0
+    return x_sums[filled] / counts[filled], sums[filled] / counts[filled], counts[filled]
+
+
 def plot_time_distribution(df: pd.DataFrame, year: int) -> plt.Figure:
     """Wykres rozkładu czasów ukończenia"""
+    _apply_plot_style()
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
     df_finished = df[df['Tempo'].notna()]
@@ -178,6 +233,7 @@ def plot_time_distribution(df: pd.DataFrame, year: int) -> plt.Figure:
 
 def plot_age_distribution(df: pd.DataFrame, year: int) -> plt.Figure:
     """Wykres rozkładu wieku"""
+    _apply_plot_style()
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
     df_age = df[df['Wiek'].notna() & (df['Wiek'] > 0) & (df['Wiek'] < 100)]
@@ -193,16 +249,19 @@ def plot_age_distribution(df: pd.DataFrame, year: int) -> plt.Figure:
     
     # Tempo vs Wiek
     df_tempo_age = df_age[df_age['Tempo'].notna()]
-    axes[1].scatter(df_tempo_age['Wiek'], df_tempo_age['Tempo'], alpha=0.3, s=10, color='coral')
+    _scatter_or_density(axes[1], df_tempo_age['Wiek'], df_tempo_age['Tempo'], color='coral', cmap='Oranges',
+                        x_bin_width=1.0)
     axes[1].set_xlabel('Wiek', fontsize=12)
     axes[1].set_ylabel('Tempo (min/km)', fontsize=12)
     axes[1].set_title(f'Tempo vs Wiek - {year}', fontsize=14, fontweight='bold')
     axes[1].grid(True, alpha=0.3)
     
-    # Dodanie linii trendu
-    z = np.polyfit(df_tempo_age['Wiek'], df_tempo_age['Tempo'], 2)
+    # Dodanie linii trendu - dopasowanie do średnich z rocznych przedziałów wieku ważonych licznością
+    # (wiek jest całkowity, więc wynik jest taki sam jak dla wszystkich punktów)
+    ages, mean_tempo, counts = _binned_means(df_tempo_age['Wiek'], df_tempo_age['Tempo'])
+    z = np.polyfit(ages, mean_tempo, 2, w=np.sqrt(counts))
     p = np.poly1d(z)
-    axes[1].plot(sorted(df_tempo_age['Wiek']), p(sorted(df_tempo_age['Wiek'])), "r--", linewidth=2, label='Trend')
+    axes[1].plot(ages, p(ages), "r--", linewidth=2, label='Trend')
     axes[1].legend()
     
     plt.tight_layout()
@@ -211,6 +270,7 @@ def plot_age_distribution(df: pd.DataFrame, year: int) -> plt.Figure:
 
 def plot_pace_stability(df: pd.DataFrame, year: int) -> plt.Figure:
     """Wykres stabilności tempa"""
+    _apply_plot_style()
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
     df_stab = df[df['Tempo Stabilność'].notna()]
@@ -226,7 +286,7 @@ def plot_pace_stability(df: pd.DataFrame, year: int) -> plt.Figure:
     
     # Tempo vs Stabilność
     df_both = df[(df['Tempo'].notna()) & (df['Tempo Stabilność'].notna())]
-    axes[1].scatter(df_both['Tempo'], df_both['Tempo Stabilność'], alpha=0.3, s=10, color='green')
+    _scatter_or_density(axes[1], df_both['Tempo'], df_both['Tempo Stabilność'], color='green', cmap='Greens')
     axes[1].set_xlabel('Tempo (min/km)', fontsize=12)
     axes[1].set_ylabel('Tempo Stabilność', fontsize=12)
     axes[1].set_title(f'Tempo vs Stabilność - {year}', fontsize=14, fontweight='bold')
@@ -238,6 +298,7 @@ def plot_pace_stability(df: pd.DataFrame, year: int) -> plt.Figure:
 
 def plot_split_times(df: pd.DataFrame, year: int) -> plt.Figure:
     """Wykres czasów pośrednich"""
+    _apply_plot_style()
     fig, ax = plt.subplots(figsize=(12, 6))
     
     splits = ['5 km Tempo', '10 km Tempo', '15 km Tempo', '20 km Tempo', 'Tempo']
@@ -258,4 +319,29 @@ def plot_split_times(df: pd.DataFrame, year: int) -> plt.Figure:
     ax.grid(True, alpha=0.3, axis='y')
     
     plt.tight_layout()
-    return fig
\ No newline at end of file
+    return fig
+
+
+# Wykresy renderowane przez render_plot (nazwa -> funkcja)
+PLOT_FUNCTIONS = {
+    'time_distribution': plot_time_distribution,
+    'age_distribution': plot_age_distribution,
+    'pace_stability': plot_pace_stability,
+    'split_times': plot_split_times,
+}
+
+
+def figure_to_bytes(fig: plt.Figure, fmt: str = 'png', dpi: int = 200) -> bytes:
+    """Zapisuje figurę do PNG / SVG (ustawienia jak st.pyplot) i zamyka ją"""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        # Bez zamknięcia pyplot trzyma referencję do figury do końca procesu
+        plt.close(fig)
+
+
+def render_plot(plot: str, df: pd.DataFrame, year: int, fmt: str = 'png') -> bytes:
+    """Rysuje wykres PLOT_FUNCTIONS[plot] i zwraca go jako bajty obrazu (figura jest zamykana)"""
+    return figure_to_bytes(PLOT_FUNCTIONS[plot](df, year), fmt=fmt)
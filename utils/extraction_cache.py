@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+# Pusta wartość lub "off" wyłącza zapis na dysk (zostaje tylko cache w pamięci procesu)
+EXTRACTION_CACHE_DB = os.getenv("EXTRACTION_CACHE_DB", "data_cache/extractions.sqlite")
+EXTRACTION_CACHE_TTL = float(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 3600)))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "50000"))
+
+# Tylko te pola wyniku trafiają do cache - bez opisu użytkownika i promptu
+CACHED_FIELDS = ("output", "metadata")
+
+# Interpunkcja poza liczbami (":" w "24:30" czy "," w "24,5" zostają)
+PUNCTUATION_PATTERN = re.compile(r"(?<!\d)[^\w\s]|[^\w\s](?!\d)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalizacja opisu do klucza cache: wielkość liter, białe znaki, interpunkcja"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = PUNCTUATION_PATTERN.sub(" ", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+class ExtractionCache:
+    """
+    Dwupoziomowy cache wyników ekstrakcji: LRU w pamięci procesu + SQLite na dysku
+
+    Kluczem jest skrót znormalizowanego opisu, więc opisy różniące się tylko
+    wielkością liter, spacjami czy interpunkcją trafiają w ten sam wpis.
+    Zapisywane są wyłącznie CACHED_FIELDS (wyekstrahowane pola i metadane
+    wywołania) - treść opisu ani prompt nie trafiają ani do pamięci, ani na dysk.
+    Wpisy starsze niż `ttl_seconds` są pomijane, a po przekroczeniu limitu
+    usuwane są najdawniej używane. Równoczesne zapytania o ten sam klucz
+    (np. z kilku sesji) czekają na jedno wywołanie compute_fn (single-flight).
+    """
+
+    def __init__(self, db_path=None, ttl_seconds: float = EXTRACTION_CACHE_TTL,
+                 max_memory_entries: int = 512, max_disk_entries: int = EXTRACTION_CACHE_MAX_ENTRIES):
+        db_path = db_path if db_path is not None else EXTRACTION_CACHE_DB
+        self.db_path = Path(db_path) if db_path and str(db_path).lower() != "off" else None
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory = OrderedDict()  # klucz -> (czas zapisu, wartość)
+        self._lock = threading.Lock()
+        self._in_flight = {}  # klucz -> (Event, {'value' | 'error'})
+        self._local = threading.local()
+        self.metrics = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'coalesced': 0,
+                        'memory_evictions': 0, 'disk_evictions': 0}
+
+        if self.db_path is None:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            # Starsza tabela trzymała pełne wyniki z opisem i promptem - usuwamy ją
+            conn.execute("DROP TABLE IF EXISTS extractions")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_extraction_results_accessed ON extraction_results (accessed_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Połączenie SQLite na wątek (sesje Streamlit działają w osobnych wątkach)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+    def get_or_compute(self, text: str, compute_fn) -> tuple:
+        """
+        Zwraca wynik z cache lub wylicza go przez compute_fn(text)
+
+        Returns:
+            Tuple: (wynik ograniczony do CACHED_FIELDS, źródło) - źródło to
+            'memory', 'disk', 'coalesced' lub 'miss'
+        """
+        key = self.make_key(text)
+
+        value = self._get_memory(key)
+        if value is not None:
+            return value, 'memory'
+
+        entry = self._get_disk(key)
+        if entry is not None:
+            created_at, value = entry
+            self._put_memory(key, value, stored_at=created_at)
+            return value, 'disk'
+
+        with self._lock:
+            # Lider mógł właśnie skończyć - wynik jest już w pamięci
+            entry = self._memory.get(key)
+            if entry is not None and time.time() - entry[0] <= self.ttl_seconds:
+                self.metrics['memory_hits'] += 1
+                return entry[1], 'memory'
+
+            flight = self._in_flight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = (threading.Event(), {})
+                self._in_flight[key] = flight
+                self.metrics['misses'] += 1
+            else:
+                self.metrics['coalesced'] += 1
+
+        event, outcome = flight
+        if not is_leader:
+            event.wait()
+            if 'error' in outcome:
+                raise outcome['error']
+            return outcome['value'], 'coalesced'
+
+        try:
+            result = compute_fn(text)
+            value = {field: result.get(field) for field in CACHED_FIELDS}
+            self._put_memory(key, value)
+            self._put_disk(key, value)
+            outcome['value'] = value
+            return value, 'miss'
+        except Exception as e:
+            # Błędy nie są cache'owane - czekający dostają ten sam wyjątek
+            outcome['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            event.set()
+
+    def _get_memory(self, key: str):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.metrics['memory_hits'] += 1
+            return value
+
+    def _put_memory(self, key: str, value, stored_at: float = None) -> None:
+        with self._lock:
+            self._memory[key] = (stored_at or time.time(), value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self.metrics['memory_evictions'] += 1
+
+    def _get_disk(self, key: str):
+        """Zwraca (czas zapisu, wartość) lub None"""
+        if self.db_path is None:
+            return None
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created_at FROM extraction_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                with conn:
+                    conn.execute("DELETE FROM extraction_results WHERE key = ?", (key,))
+                return None
+            with conn:
+                conn.execute("UPDATE extraction_results SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"Błąd odczytu cache ekstrakcji: {e}")
+            return None
+
+        with self._lock:
+            self.metrics['disk_hits'] += 1
+        return created_at, json.loads(value)
+
+    def _put_disk(self, key: str, value) -> None:
+        if self.db_path is None:
+            return
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO extraction_results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                overflow = conn.execute("SELECT COUNT(*) FROM extraction_results").fetchone()[0] - self.max_disk_entries
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM extraction_results WHERE key IN "
+                        "(SELECT key FROM extraction_results ORDER BY accessed_at LIMIT ?)",
+                        (overflow,)
+                    )
+                    with self._lock:
+                        self.metrics['disk_evictions'] += overflow
+        except sqlite3.Error as e:
+            # Cache na dysku jest opcjonalny - błąd zapisu nie przerywa ekstrakcji
+            print(f"Błąd zapisu cache ekstrakcji: {e}")
+
+    def stats(self) -> dict:
+        """Metryki cache: trafienia w pamięci / na dysku, chybienia, scalone zapytania, usunięcia"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics['memory_entries'] = len(self._memory)
+        lookups = metrics['memory_hits'] + metrics['disk_hits'] + metrics['misses'] + metrics['coalesced']
+        metrics['hit_rate'] = (lookups - metrics['misses']) / lookups if lookups else 0.0
+        return metrics
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Cache ekstrakcji współdzielony przez wszystkie sesje w procesie"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExtractionCache()
+    return _cache
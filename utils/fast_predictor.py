@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Modele, dla których skaler jest stosowany przed predykcją (jak w predict_race_time)
+SCALED_MODELS = ['Linear Regression', 'Ridge Regression']
+
+
+class CompiledPredictor:
+    """
+    Predyktor z wagami przygotowanymi raz przy ładowaniu modelu
+
+    Dla modeli liniowych StandardScaler jest wkładany w współczynniki:
+        w · ((x - mean) / scale) + b  =  (w / scale) · x + (b - w · mean / scale)
+    więc predykcja to jeden iloczyn skalarny NumPy - bez DataFrame i sklearn.
+    Pozostałe modele korzystają ze zwykłej ścieżki sklearn.
+    """
+
+    def __init__(self, model, scaler, model_info: dict):
+        self.model = model
+        self.scaler = scaler
+        self.model_info = model_info
+        self.features = list(model_info['features'])
+        self.uses_scaler = model_info['model_name'] in SCALED_MODELS and scaler is not None
+        self.weights, self.bias = self._fold_linear(model, scaler if self.uses_scaler else None)
+
+    @property
+    def is_fast(self) -> bool:
+        """Czy predykcje idą szybką ścieżką NumPy"""
+        return self.weights is not None
+
+    def _fold_linear(self, model, scaler):
+        coef = getattr(model, 'coef_', None)
+        intercept = getattr(model, 'intercept_', None)
+        if coef is None or intercept is None or np.ndim(coef) != 1 or len(coef) != len(self.features):
+            return None, None
+
+        weights = np.asarray(coef, dtype=np.float64)
+        bias = float(intercept)
+        if scaler is not None:
+            mean = getattr(scaler, 'mean_', None)
+            scale = getattr(scaler, 'scale_', None)
+            if scale is not None:
+                weights = weights / scale
+            if mean is not None:
+                bias -= float(weights @ mean)
+        return weights, bias
+
+    def to_matrix(self, rows) -> np.ndarray:
+        """DataFrame / słownik kolumn -> macierz (n, liczba feature'ów) w kolejności modelu"""
+        if isinstance(rows, np.ndarray):
+            return rows.astype(np.float64, copy=False)
+        return np.column_stack([np.asarray(rows[f], dtype=np.float64) for f in self.features])
+
+    def predict_one(self, input_data: dict) -> float:
+        """Predykcja tempa (min/km) dla jednego zawodnika"""
+        if self.is_fast:
+            x = np.array([input_data[f] for f in self.features], dtype=np.float64)
+            return float(self.weights @ x + self.bias)
+        return float(self._predict_sklearn(pd.DataFrame([input_data])[self.features])[0])
+
+    def predict_batch(self, rows) -> np.ndarray:
+        """
+        Predykcja dla wielu zawodników naraz
+
+        Args:
+            rows: DataFrame lub słownik kolumn z feature'ami modelu,
+                  albo macierz (n, k) w kolejności model_info['features']
+        """
+        if self.is_fast:
+            return self.to_matrix(rows) @ self.weights + self.bias
+        if isinstance(rows, np.ndarray):
+            rows = pd.DataFrame(rows, columns=self.features)
+        return np.asarray(self._predict_sklearn(pd.DataFrame(rows)[self.features]), dtype=np.float64)
+
+    def _predict_sklearn(self, input_df: pd.DataFrame):
+        if self.uses_scaler:
+            return self.model.predict(self.scaler.transform(input_df))
+        return self.model.predict(input_df)
+
+
+def compile_predictor(model, scaler, model_info: dict) -> CompiledPredictor:
+    """Przygotowuje predyktor dla załadowanego modelu (wywoływane raz przy ładowaniu)"""
+    return CompiledPredictor(model, scaler, model_info)
@@ -1,18 +1,98 @@
+import os
 from dotenv import load_dotenv
 import boto3
 import pandas as pd
 import streamlit as st
+from utils.data_cache import (
+    S3Storage, LocalStorage, attach_fingerprint, dataset_fingerprint, load_cached_csv, project_columns
+)
+from utils.data_schema import SCHEMA_VERSION, apply_race_schema, memory_report
 
 BUCKET_NAME = "dane-modul9"
+DATA_PREFIX = "dane-zadanie_modul9"
 load_dotenv()
 
 s3 = boto3.client(
     "s3",
 )
 
-@st.cache_data
-def load_data():
-    # Wczytuje dane CSV tylko raz, potem wynik jest buforowany przez Streamlit cache
-    wroclaw_2023_df = pd.read_csv(f"s3://{BUCKET_NAME}/dane-zadanie_modul9/halfmarathon_wroclaw_2023__final.csv", sep=";")
-    wroclaw_2024_df = pd.read_csv(f"s3://{BUCKET_NAME}/dane-zadanie_modul9/halfmarathon_wroclaw_2024__final.csv", sep=";")
+
+def get_data_storage():
+    """Zwraca źródło danych: lokalny katalog (DATA_LOCAL_DIR) lub bucket S3"""
+    local_dir = os.getenv("DATA_LOCAL_DIR")
+    if local_dir:
+        return LocalStorage(local_dir)
+    return S3Storage(s3, BUCKET_NAME)
+
+
+def _load_year(storage, year: int) -> pd.DataFrame:
+    """Wczytuje dane jednego roku z nadanym schematem typów"""
+    def typed(raw_df):
+        typed_df = apply_race_schema(raw_df)
+        memory_report(raw_df, typed_df, label=str(year))
+        return typed_df
+
+    df = load_cached_csv(
+        storage,
+        f"{DATA_PREFIX}/halfmarathon_wroclaw_{year}__final.csv",
+        sep=";",
+        transform=typed,
+        tag=f"schema-{SCHEMA_VERSION}"
+    )
+    return attach_fingerprint(df)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_typed_data():
+    # Jedna kopia pełnych danych w procesie (wspólna dla sesji i stron) -
+    # wczytywana tylko raz, dalej z lokalnego cache Parquet (odświeżanego po zmianie pliku w S3)
+    storage = get_data_storage()
+    return _load_year(storage, 2023), _load_year(storage, 2024)
+
+
+def load_data(columns: tuple = None):
+    """
+    Dane z lat 2023 i 2024 (tylko do odczytu - współdzielone między sesjami)
+
+    Args:
+        columns: Opcjonalna projekcja kolumn (np. data_schema.EDA_COLUMNS);
+            projekcja nie kopiuje kolumn pełnych danych
+    """
+    wroclaw_2023_df, wroclaw_2024_df = _load_typed_data()
+    if columns is not None:
+        return project_columns(wroclaw_2023_df, list(columns)), project_columns(wroclaw_2024_df, list(columns))
     return wroclaw_2023_df, wroclaw_2024_df
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _prepare_cached(fingerprint: str, _df: pd.DataFrame) -> pd.DataFrame:
+    # Wspólne dla wszystkich sesji, rerunów i stron - klucz to odcisk zawartości danych,
+    # zwracany DataFrame jest tylko do odczytu (eda_utils ciągnie matplotlib - import przy pierwszym użyciu)
+    from utils.eda_utils import prepare_data_for_analysis
+    return prepare_data_for_analysis(_df)
+
+
+def prepare_cached(df: pd.DataFrame) -> pd.DataFrame:
+    """Przygotowane dane do analizy (eda_utils.prepare_data_for_analysis), liczone raz dla danej zawartości"""
+    return _prepare_cached(dataset_fingerprint(df), df)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _ranking_cached(fingerprint_2023: str, fingerprint_2024: str, _df_2023: pd.DataFrame, _df_2024: pd.DataFrame):
+    from utils.ranking_index import RankingIndex
+    return RankingIndex({2023: prepare_cached(_df_2023), 2024: prepare_cached(_df_2024)})
+
+
+def ranking_cached(df_2023: pd.DataFrame, df_2024: pd.DataFrame):
+    """Rankingi rok × płeć × kategoria wiekowa z przygotowanych danych, budowane raz dla danej zawartości"""
+    return _ranking_cached(dataset_fingerprint(df_2023), dataset_fingerprint(df_2024), df_2023, df_2024)
+
+
+def load_ranking_index():
+    """
+    Rankingi z projekcji EDA_COLUMNS - te same dane i ten sam obiekt co na stronie EDA
+
+    Strona predykcji wczytuje dane dopiero przy pierwszej predykcji.
+    """
+    from utils.data_schema import EDA_COLUMNS
+    return ranking_cached(*load_data(tuple(EDA_COLUMNS)))
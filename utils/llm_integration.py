@@ -1,25 +1,110 @@
 import os
 import json
+import threading
+import time
+import zlib
 from typing import Dict
 from dotenv import load_dotenv
-import google.generativeai as genai
-from langfuse import Langfuse, observe
+from utils.extraction_cache import get_extraction_cache, normalize_text
+from utils.llm_metrics import llm_metrics, usage_from_response
+from utils.local_extractor import extract_runner_data_locally, extraction_stats
+from utils.resilient_llm import ResilientCaller
+from utils.telemetry import FakeCollector, LangfuseSender, get_telemetry_queue
 
 # Załadowanie zmiennych środowiskowych
 load_dotenv()
 
-# Inicjalizacja klientów
-# Google Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-gemini_model = genai.GenerativeModel(os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash"))
+# Klienci Gemini i Langfuse tworzeni są przy pierwszym użyciu (import modułu jest tani),
+# raz na proces - kolejne wywołania korzystają z tych samych połączeń
+_clients_lock = threading.Lock()
+_gemini_model = None
+_gemini_caller = None
+_langfuse_client = None
 
 
-# Langfuse (inicjalizacja klienta)
-langfuse_client = Langfuse(
-    public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
-    secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
-    host=os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
-)
+def get_gemini_model():
+    """Model Google Gemini (tworzony przy pierwszym wywołaniu, współdzielony między wątkami)"""
+    global _gemini_model
+    if _gemini_model is None:
+        with _clients_lock:
+            if _gemini_model is None:
+                if os.getenv("LLM_BACKEND") == "stub":
+                    # LLM_BACKEND=stub - lokalna atrapa z opóźnieniami (testy, benchmarki)
+                    from utils.stub_llm import StubLLM
+
+                    _gemini_model = StubLLM()
+                    return _gemini_model
+
+                started_at = time.perf_counter()
+                import google.generativeai as genai
+
+                genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+                _gemini_model = genai.GenerativeModel(os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash"))
+                print(f"🔌 Klient Gemini gotowy w {(time.perf_counter() - started_at) * 1000:.0f} ms")
+    return _gemini_model
+
+
+def _generate_content(prompt: str, timeout_s: float):
+    return get_gemini_model().generate_content(prompt, request_options={"timeout": timeout_s})
+
+
+def get_gemini_caller() -> ResilientCaller:
+    """
+    Wywołania Gemini z limitem czasu, ponowieniami, zapytaniem hedge i wyłącznikiem obwodu
+
+    Ustawienia: LLM_TIMEOUT (s), LLM_RETRIES, LLM_HEDGE (1/0) - patrz utils.resilient_llm.
+    """
+    global _gemini_caller
+    if _gemini_caller is None:
+        with _clients_lock:
+            if _gemini_caller is None:
+                _gemini_caller = ResilientCaller(_generate_content)
+    return _gemini_caller
+
+
+def gemini_call_stats():
+    """Statystyki wywołań Gemini (None, jeśli Gemini nie był jeszcze używany)"""
+    return _gemini_caller.stats() if _gemini_caller is not None else None
+
+
+def get_langfuse_client():
+    """Klient Langfuse (tworzony przy pierwszym wywołaniu, współdzielony między wątkami)"""
+    global _langfuse_client
+    if _langfuse_client is None:
+        with _clients_lock:
+            if _langfuse_client is None:
+                started_at = time.perf_counter()
+                from langfuse import Langfuse
+
+                _langfuse_client = Langfuse(
+                    public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
+                    secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
+                    host=os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
+                )
+                print(f"🔌 Klient Langfuse gotowy w {(time.perf_counter() - started_at) * 1000:.0f} ms")
+    return _langfuse_client
+
+
+def __getattr__(name):
+    # Zgodność wsteczna: llm_integration.gemini_model / llm_integration.langfuse_client
+    if name == "gemini_model":
+        return get_gemini_model()
+    if name == "langfuse_client":
+        return get_langfuse_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _telemetry_sender():
+    # TELEMETRY_BACKEND=fake - lokalny kolektor zamiast Langfuse (testy, praca offline)
+    if os.getenv("TELEMETRY_BACKEND") == "fake":
+        return FakeCollector()
+    # Klient Langfuse tworzony dopiero w wątku telemetrii, przy pierwszej wysyłce
+    return LangfuseSender(get_langfuse_client)
+
+
+def emit_telemetry(event: Dict) -> bool:
+    """Przekazuje zdarzenie do kolejki telemetrii (nie czeka na Langfuse)"""
+    return get_telemetry_queue(_telemetry_sender).emit(event)
 
 
 def create_extraction_prompt(user_text: str) -> str:
@@ -57,16 +142,73 @@ Teraz wyekstrahuj dane z podanego opisu użytkownika.
     return prompt
 
 
-@observe(as_type="generation")
-def extract_runner_data_with_gemini(user_text: str) -> Dict:
+def create_compact_extraction_prompt(user_text: str) -> str:
+    """Krótki prompt ekstrakcji (bez przykładów) - wariant do porównania A/B z create_extraction_prompt"""
+    return (
+        'ZADANIE: Zwróć TYLKO JSON {"gender": "M"/"K"/null, "age": liczba/null, "time_5km_minutes": liczba/null} '
+        'z danymi biegacza z opisu (płeć, wiek, czas na 5km w minutach). Brak informacji = null.\n'
+        f'OPIS UŻYTKOWNIKA: {user_text}'
+    )
+
+
+PROMPT_VARIANTS = {
+    "full": create_extraction_prompt,
+    "compact": create_compact_extraction_prompt,
+}
+
+
+def choose_prompt_variant(user_text: str) -> str:
     """
-    Ekstrahuje dane biegacza z tekstu używając Google Gemini API
-    Dane wejściowe i wyjściowe zostaną automatycznie zarejestrowane w Langfuse.
+    Wariant promptu wg LLM_PROMPT_VARIANT: "full" (domyślnie), "compact" lub "ab"
+
+    W trybie "ab" wariant zależy od skrótu znormalizowanego opisu (jak klucz
+    cache ekstrakcji), więc opisy dzielące wpis w cache trafiają do tego samego wariantu.
+    """
+    variant = os.getenv("LLM_PROMPT_VARIANT", "full")
+    if variant == "ab":
+        return "compact" if zlib.crc32(normalize_text(user_text).encode("utf-8")) % 2 else "full"
+    return variant if variant in PROMPT_VARIANTS else "full"
+
+
+def configured_model_name() -> str:
     """
-    prompt = create_extraction_prompt(user_text)
-    response = gemini_model.generate_content(prompt)
-    raw_response = response.text.strip()
+    Nazwa skonfigurowanego modelu (GEMINI_MODEL)
+
+    Odpowiedzi google-generativeai 0.8.3 nie mówią, która wersja modelu
+    odpowiedziała, więc w metrykach i telemetrii zapisywana jest nazwa z konfiguracji.
+    """
+    return getattr(get_gemini_model(), "model_name", None)
+
 
+def extract_runner_data_with_gemini(user_text: str, prompt_variant: str = None) -> Dict:
+    """
+    Ekstrahuje dane biegacza z tekstu używając Google Gemini API
+    Dane wejściowe i wyjściowe trafiają do Langfuse przez kolejkę telemetrii (w tle),
+    a tokeny (z usage_metadata) i czasy - do kroczących metryk utils.llm_metrics.
+    """
+    prompt_variant = prompt_variant or choose_prompt_variant(user_text)
+    prompt = PROMPT_VARIANTS[prompt_variant](user_text)
+    started_at = time.perf_counter()
+    try:
+        response = get_gemini_caller().call(prompt)
+        raw_response = response.text.strip()
+    except Exception as e:
+        wall_ms = (time.perf_counter() - started_at) * 1000
+        llm_metrics.record(prompt_variant, None, wall_ms, ok=False)
+        emit_telemetry({
+            "type": "generation",
+            "name": "extract_runner_data_with_gemini",
+            "input": user_text,
+            "level": "ERROR",
+            "status_message": str(e),
+            "metadata": {"latency_ms": wall_ms, "prompt_variant": prompt_variant}
+        })
+        raise
+    latency_ms = (time.perf_counter() - started_at) * 1000
+    model = configured_model_name()
+    usage = usage_from_response(response)
+
+    parse_started_at = time.perf_counter()
     # Czyszczenie potencjalnych bloków markdown
     if raw_response.startswith("```json"):
         raw_response = raw_response[7:]
@@ -78,21 +220,89 @@ def extract_runner_data_with_gemini(user_text: str) -> Dict:
     try:
         extracted_data = json.loads(raw_response.strip())
     except json.JSONDecodeError as e:
-        # Langfuse automatycznie zarejestruje wyjątek dzięki dekoratorowi @observe
+        parse_ms = (time.perf_counter() - parse_started_at) * 1000
+        llm_metrics.record(prompt_variant, model, latency_ms + parse_ms, parse_ms, ok=False, **usage)
+        emit_telemetry({
+            "type": "generation",
+            "name": "extract_runner_data_with_gemini",
+            "input": user_text,
+            "output": raw_response,
+            "model": model,
+            "level": "ERROR",
+            "status_message": f"Błąd parsowania JSON: {e}",
+            "metadata": {"latency_ms": latency_ms, "prompt_variant": prompt_variant, **usage}
+        })
         raise ValueError(f"Błąd parsowania JSON: {str(e)}")
+    parse_ms = (time.perf_counter() - parse_started_at) * 1000
+    llm_metrics.record(prompt_variant, model, latency_ms + parse_ms, parse_ms, **usage)
 
-    estimated_tokens = len(prompt.split()) + len(raw_response.split())
-
-    return {
+    result = {
         "input": user_text,
         "prompt": prompt,
         "output": extracted_data,
         "metadata": {
-            "model": "gemini-1.5-flash",
-            "estimated_tokens": estimated_tokens,
-            "provider": "google"
+            "model": model,
+            "provider": "google",
+            "prompt_variant": prompt_variant,
+            **usage,
+            "latency_ms": round(latency_ms, 1),
+            "parse_ms": round(parse_ms, 3)
         }
     }
+    emit_telemetry({
+        "type": "generation",
+        "name": "extract_runner_data_with_gemini",
+        "input": user_text,
+        "output": extracted_data,
+        "model": model,
+        "usage_details": {"input": usage["prompt_tokens"], "output": usage["response_tokens"]}
+        if usage["prompt_tokens"] is not None else None,
+        "metadata": result["metadata"]
+    })
+    return result
+
+
+def extract_runner_data(user_text: str, allow_llm: bool = True) -> Dict:
+    """
+    Ekstrahuje dane biegacza: najpierw regułami lokalnymi, Gemini tylko gdy trzeba
+
+    Gemini wywoływane jest wyłącznie wtedy, gdy wynik lokalny nie przechodzi
+    validate_extracted_data (a allow_llm=True). Odpowiedzi Gemini trafiają do
+    cache ekstrakcji (utils.extraction_cache), więc ten sam opis nie jest
+    wysyłany ponownie (cache trzyma tylko pola output i metadata). Wynik ma ten sam format co extract_runner_data_with_gemini;
+    metadata['provider'] mówi, skąd pochodzi, a metadata['cache'] - czy z cache.
+    """
+    started_at = time.perf_counter()
+    local_data = extract_runner_data_locally(user_text)
+    latency_ms = (time.perf_counter() - started_at) * 1000
+    local_hit = validate_extracted_data(local_data)["is_valid"]
+    extraction_stats.record(local_hit)
+    if local_hit or not allow_llm:
+        return {
+            "input": user_text,
+            "prompt": None,
+            "output": local_data,
+            "metadata": {
+                "model": "local-rules",
+                "provider": "local",
+                # Ten sam schemat użycia co dla Gemini (reguły lokalne nie zużywają tokenów)
+                "prompt_tokens": 0,
+                "response_tokens": 0,
+                "total_tokens": 0,
+                "latency_ms": round(latency_ms, 1),
+                "parse_ms": 0.0
+            }
+        }
+
+    result, cache_source = get_extraction_cache().get_or_compute(user_text, extract_runner_data_with_gemini)
+    # Cache nie przechowuje opisu ani promptu - prompt odtwarzany jest z wariantu
+    prompt_variant = result["metadata"].get("prompt_variant")
+    return {
+        **result,
+        "input": user_text,
+        "prompt": PROMPT_VARIANTS[prompt_variant](user_text) if prompt_variant in PROMPT_VARIANTS else None,
+        "metadata": {**result["metadata"], "cache": cache_source}
+    }
 
 
 def validate_extracted_data(extracted_data: Dict) -> Dict:
@@ -160,7 +370,6 @@ def convert_to_model_input(extracted_data: Dict) -> Dict:
     }
 
 
-@observe(as_type="generation")
 def log_prediction_to_langfuse(
     user_text: str,
     extracted_data: Dict,
@@ -170,9 +379,9 @@ def log_prediction_to_langfuse(
 ):
     """
     Loguje interakcję (ekstrakcja + predykcja) do Langfuse
-    Dzięki dekoratorowi @observe dane są automatycznie rejestrowane.
+    Zdarzenie trafia do kolejki telemetrii - wywołanie nie czeka na Langfuse.
     """
-    return {
+    event = {
         "input": user_text,
         "output": {
             "extracted_data": extracted_data,
@@ -184,6 +393,8 @@ def log_prediction_to_langfuse(
             "model_type": "ml_prediction"
         }
     }
+    emit_telemetry({"type": "generation", "name": "log_prediction_to_langfuse", **event})
+    return event
 
 
 def test_extraction(user_text: str):
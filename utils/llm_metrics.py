@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+def usage_from_response(response) -> dict:
+    """Liczby tokenów z usage_metadata odpowiedzi Gemini (None, gdy API ich nie podało)"""
+    usage = getattr(response, 'usage_metadata', None)
+    prompt_tokens = getattr(usage, 'prompt_token_count', None)
+    response_tokens = getattr(usage, 'candidates_token_count', None)
+    total_tokens = getattr(usage, 'total_token_count', None)
+    if total_tokens is None and prompt_tokens is not None and response_tokens is not None:
+        total_tokens = prompt_tokens + response_tokens
+    return {'prompt_tokens': prompt_tokens, 'response_tokens': response_tokens, 'total_tokens': total_tokens}
+
+
+class LLMMetrics:
+    """
+    Kroczące metryki wywołań LLM (ostatnie `window` wywołań w procesie)
+
+    Każde wywołanie: wariant promptu, model, tokeny promptu / odpowiedzi
+    (z usage_metadata), czas całkowity i czas parsowania odpowiedzi.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, variant: str, model: str, wall_ms: float, parse_ms: float = None, ok: bool = True,
+               prompt_tokens: int = None, response_tokens: int = None, total_tokens: int = None) -> None:
+        with self._lock:
+            self.calls.append({
+                'variant': variant,
+                'model': model,
+                'ok': ok,
+                'wall_ms': wall_ms,
+                'parse_ms': parse_ms,
+                'prompt_tokens': prompt_tokens,
+                'response_tokens': response_tokens,
+                'total_tokens': total_tokens,
+                'recorded_at': time.time(),
+            })
+
+    def summary(self) -> dict:
+        """Podsumowanie per wariant promptu: liczba wywołań, błędy, czasy (ms) i średnie tokeny"""
+        with self._lock:
+            calls = list(self.calls)
+
+        by_variant = {}
+        for call in calls:
+            by_variant.setdefault(call['variant'], []).append(call)
+
+        summary = {}
+        for variant, variant_calls in by_variant.items():
+            wall = np.array([c['wall_ms'] for c in variant_calls])
+            summary[variant] = {
+                'calls': len(variant_calls),
+                'error_rate': round(sum(not c['ok'] for c in variant_calls) / len(variant_calls), 3),
+                'models': sorted({c['model'] for c in variant_calls if c['model']}),
+                'wall_p50_ms': round(float(np.percentile(wall, 50)), 1),
+                'wall_p95_ms': round(float(np.percentile(wall, 95)), 1),
+                'parse_mean_ms': _mean(variant_calls, 'parse_ms', 3),
+                'prompt_tokens_mean': _mean(variant_calls, 'prompt_tokens'),
+                'response_tokens_mean': _mean(variant_calls, 'response_tokens'),
+                'total_tokens_sum': sum(c['total_tokens'] or 0 for c in variant_calls),
+            }
+        return summary
+
+
+def _mean(calls: list, field: str, digits: int = 1):
+    values = [c[field] for c in calls if c[field] is not None]
+    return round(float(np.mean(values)), digits) if values else None
+
+
+llm_metrics = LLMMetrics()
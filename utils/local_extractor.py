@@ -0,0 +1,233 @@
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+# Słowa jednoznacznie określające płeć (PL / EN)
+MALE_PATTERN = re.compile(
+    r"\b(?:mężczyzn\w*|mezczyzn\w*|facet\w*|chłopak\w*|male|man|guy|boy)\b"
+    # Czasowniki w 1. os. l. poj. czasu przeszłego: przebiegłem, ukończyłem...
+    r"|\b\w{3,}łem\b",
+    re.IGNORECASE
+)
+FEMALE_PATTERN = re.compile(
+    r"\b(?:kobiet\w*|dziewczyn\w*|pani|female|woman|girl|lady)\b"
+    r"|\b\w{3,}łam\b",
+    re.IGNORECASE
+)
+
+# Wiek tylko w 1. osobie ("mam 32 lata", "kończę 40 lat", "32-latek") lub jako osobny element listy
+# ("Kobieta, 51 lat, ...") - "biegam od 15 lat" to staż, nie wiek
+AGE_PATTERNS = [
+    re.compile(r"\b(?:mam|kończę|skończył[ae]m)\s+(\d{1,3})\s*(?:lat[a]?|roku?)\b", re.IGNORECASE),
+    re.compile(r"\b(\d{1,3})\s*-?\s*(?:lat(?:ek|ka|kiem|ką)|letni\w*)\b", re.IGNORECASE),
+    re.compile(r"(?:^|[,;:.]\s*)(\d{1,3})\s*(?:lat[a]?|roku życia|r\.?\s*ż\.?)\s*(?=[,;.]|$)", re.IGNORECASE),
+    re.compile(r"\b(?:wiek|age)\s*[:=]?\s*(\d{1,3})\b", re.IGNORECASE),
+    re.compile(r"\b(?:i'?m|i am)\s+(?:a\s+)?(\d{1,3})\b", re.IGNORECASE),
+    re.compile(r"\b(\d{1,3})\s*(?:-?\s*)(?:years?[\s-]*old|y/?o)\b", re.IGNORECASE),
+]
+
+# Opis innej osoby ("moja żona biega 5 km w 30 minut") - całość zostawiamy LLM
+OTHER_PERSON_PATTERN = re.compile(
+    r"\b(?:żon\w*|mąż|męż(?:a|em|owi|u)|syn(?:a|em|owi)?|córk\w*|córka|brat\w*|siostr\w*|koleg\w*|koleżank\w*"
+    r"|przyjaciel\w*|przyjaciółk\w*|tat[aąy]|tacie|ojc\w*|ojciec|mam[aąy]|mamie|matk\w*|partner\w*|dzieck\w*|dzieci\w*"
+    r"|wife|husband|son|daughter|brother|sister|friend|dad|father|mom|mum|mother|partner|girlfriend|boyfriend|kids?)\b",
+    re.IGNORECASE
+)
+
+# Czas z godzinami ("2 godziny i 25 minut") - minuty same w sobie nie są czasem na 5 km
+HOURS_PATTERN = re.compile(r"\b\d+(?:[.,]\d+)?\s*(?:h|godz\w*|godzin\w*|hours?|hrs?)(?![a-ząćęłńóśźż])", re.IGNORECASE)
+
+# Wzmianka o dystansie 5 km
+DISTANCE_5KM_PATTERN = re.compile(
+    r"\b(?:5\s*(?:km|k|kilometr\w*)|pięć\s+kilometr\w*|piątk\w*|parkrun\w*)\b",
+    re.IGNORECASE
+)
+
+# Inne dystanse (10 km, półmaraton...) - czasy przy nich nie dotyczą 5 km
+OTHER_DISTANCE_PATTERN = re.compile(
+    r"\b(?:(\d+(?:[.,]\d+)?)\s*(?:km|k|kilometr\w*)|(?:pół)?maraton\w*|(?:half[\s-]?)?marathon\w*)\b",
+    re.IGNORECASE
+)
+
+# Czas: 24:30 / 0:24:30 / 24'30" / 24 min 30 s / 24,5 minuty
+CLOCK_PATTERN = re.compile(r"\b(\d{1,2})[:'](\d{2})(?:[:'](\d{2}))?\"?")
+MINUTES_PATTERN = re.compile(
+    r"\b(\d{1,3}(?:[.,]\d+)?)\s*(?:min(?:ut[aey]?|utę|s|utes?)?\.?|m)(?![a-ząćęłńóśźż])"
+    r"(?:\s*(?:i\s+|and\s+)?(\d{1,2})\s*(?:s|sek(?:und[ay]?)?|sec(?:onds?)?)\b)?",
+    re.IGNORECASE
+)
+
+# Maksymalna odległość (w znakach) czasu od wzmianki o 5 km
+MAX_DISTANCE_CHARS = 40
+
+
+class ExtractionStats:
+    """Licznik trafień lokalnego ekstraktora (chybienia trafiają do LLM, o ile jest skonfigurowany)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.local_misses = 0
+
+    def record(self, local_hit: bool) -> None:
+        with self._lock:
+            if local_hit:
+                self.local_hits += 1
+            else:
+                self.local_misses += 1
+
+    @property
+    def total(self) -> int:
+        return self.local_hits + self.local_misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Odsetek opisów obsłużonych lokalnie (0-1)"""
+        return self.local_hits / self.total if self.total else 0.0
+
+
+extraction_stats = ExtractionStats()
+
+
+def _extract_gender(text: str) -> Optional[str]:
+    is_male = MALE_PATTERN.search(text) is not None
+    is_female = FEMALE_PATTERN.search(text) is not None
+    # Sprzeczne sygnały (np. "biegam z żoną, która jest kobietą...") zostawiamy LLM
+    if is_male == is_female:
+        return None
+    return "M" if is_male else "K"
+
+
+def _extract_age(text: str) -> Optional[int]:
+    ages = {int(match) for pattern in AGE_PATTERNS for match in pattern.findall(text)}
+    return ages.pop() if len(ages) == 1 else None
+
+
+def _find_times(text: str) -> list:
+    """Lista (początek, koniec, minuty) wszystkich wyrażeń czasu w tekście"""
+    times = []
+    for match in CLOCK_PATTERN.finditer(text):
+        first, second, third = match.groups()
+        if third is not None:
+            minutes = int(first) * 60 + int(second) + int(third) / 60
+        else:
+            minutes = int(first) + int(second) / 60
+        times.append((match.start(), match.end(), minutes))
+
+    for match in MINUTES_PATTERN.finditer(text):
+        minutes = float(match.group(1).replace(',', '.'))
+        if match.group(2):
+            minutes += int(match.group(2)) / 60
+        times.append((match.start(), match.end(), minutes))
+    return times
+
+
+def _distance_mentions(text: str) -> list:
+    """Lista (początek, koniec, czy_5km) wzmianek o dystansach"""
+    mentions = [(m.start(), m.end(), True) for m in DISTANCE_5KM_PATTERN.finditer(text)]
+    for match in OTHER_DISTANCE_PATTERN.finditer(text):
+        value = match.group(1)
+        if value is None or float(value.replace(',', '.')) != 5:
+            mentions.append((match.start(), match.end(), False))
+    return mentions
+
+
+def _extract_time_5km(text: str) -> Optional[float]:
+    """
+    Czas na 5 km albo None, gdy nie da się go jednoznacznie wskazać
+
+    Czas należy do najbliższej wcześniejszej wzmianki o dystansie ("5 km w 24 min"),
+    a gdy takiej nie ma - do najbliższej następnej ("24 min na 5 km"). Czasy
+    innych dystansów są pomijane, czasy po wzmiance o 5 km mają pierwszeństwo,
+    a kilka różnych kandydatów lub czas z godzinami zostawiamy LLM.
+    """
+    mentions = _distance_mentions(text)
+    if not any(is_5km for _, _, is_5km in mentions) or HOURS_PATTERN.search(text):
+        return None
+
+    after, before = set(), set()
+    for start, end, minutes in _find_times(text):
+        preceding = [(start - m_end, is_5km) for m_start, m_end, is_5km in mentions
+                     if 0 <= start - m_end <= MAX_DISTANCE_CHARS]
+        following = [(m_start - end, is_5km) for m_start, m_end, is_5km in mentions
+                     if 0 <= m_start - end <= MAX_DISTANCE_CHARS]
+        if preceding:
+            _, is_5km = min(preceding)
+            if is_5km:
+                after.add(round(minutes, 2))
+        elif following:
+            _, is_5km = min(following)
+            if is_5km:
+                before.add(round(minutes, 2))
+
+    candidates = after or before
+    return candidates.pop() if len(candidates) == 1 else None
+
+
+def extract_runner_data_locally(user_text: str) -> Dict:
+    """
+    Ekstrahuje płeć, wiek i czas na 5 km regułami (bez wywołania LLM)
+
+    Zwraca słownik w tym samym formacie co odpowiedź Gemini
+    ({"gender", "age", "time_5km_minutes"}); brakujące wartości to None.
+    Opis, który dotyczy też innej osoby, w całości zostaje dla LLM.
+    """
+    if OTHER_PERSON_PATTERN.search(user_text):
+        return {"gender": None, "age": None, "time_5km_minutes": None}
+    return {
+        "gender": _extract_gender(user_text),
+        "age": _extract_age(user_text),
+        "time_5km_minutes": _extract_time_5km(user_text),
+    }
+
+
+# Opisy z oczekiwanym wynikiem (None = do rozstrzygnięcia przez LLM)
+REGRESSION_CASES = [
+    ("Cześć, mam na imię Jan, mam 32 lata, jestem mężczyzną i ostatnio przebiegłem 5km w 24 minuty",
+     {"gender": "M", "age": 32, "time_5km_minutes": 24.0}),
+    ("Jestem kobietą, mam 28 lat, biegam 5km w około 30 minut i należę do klubu biegowego",
+     {"gender": "K", "age": 28, "time_5km_minutes": 30.0}),
+    ("Mam 45 lat, mój ostatni czas na 5 km to 27 minut",
+     {"gender": None, "age": 45, "time_5km_minutes": 27.0}),
+    ("Kobieta, 51 lat, parkrun 29:45",
+     {"gender": "K", "age": 51, "time_5km_minutes": 29.75}),
+    ("I'm a 40 year old male, my 5k time is 22:10",
+     {"gender": "M", "age": 40, "time_5km_minutes": 22.17}),
+    ("Przebiegłam 5 km w 26 min 30 s, mam 35 lat",
+     {"gender": "K", "age": 35, "time_5km_minutes": 26.5}),
+    # Czas innego dystansu bliżej wzmianki o 5 km
+    ("Mam 32 lata, jestem mężczyzną, 10 km biegam w 50 minut, 5 km w 24 minuty",
+     {"gender": "M", "age": 32, "time_5km_minutes": 24.0}),
+    ("Jestem kobietą, mam 30 lat, kiedyś biegałam poniżej 25 min na 5 km, teraz biegam w 28 minut",
+     {"gender": "K", "age": 30, "time_5km_minutes": 28.0}),
+    # Staż biegania to nie wiek
+    ("Jestem mężczyzną, biegam od 15 lat, 5 km w 24 minuty",
+     {"gender": "M", "age": None, "time_5km_minutes": 24.0}),
+    # Czas z godzinami - nie zgadujemy samych minut
+    ("Mam 40 lat, 5 km przebiegłam w 2 godziny i 25 minut",
+     {"gender": "K", "age": 40, "time_5km_minutes": None}),
+    # Czas innej osoby
+    ("Jestem mężczyzną, mam 35 lat, moja żona biega 5 km w 30 minut",
+     {"gender": None, "age": None, "time_5km_minutes": None}),
+    ("I'm 29, a woman, my 5k is 27:30",
+     {"gender": "K", "age": 29, "time_5km_minutes": 27.5}),
+    ("32-latek, facet, 5 km w 23 min",
+     {"gender": "M", "age": 32, "time_5km_minutes": 23.0}),
+    # Dwa czasy po wzmiance o 5 km - niejednoznaczne
+    ("Mam 40 lat, jestem mężczyzną, 5 km biegam w 25 minut, a czasem w 23 minuty",
+     {"gender": "M", "age": 40, "time_5km_minutes": None}),
+]
+
+
+if __name__ == "__main__":
+    failures = 0
+    for text, expected in REGRESSION_CASES:
+        start = time.perf_counter()
+        result = extract_runner_data_locally(text)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        ok = result == expected
+        failures += not ok
+        print(f"{'OK ' if ok else 'BŁĄD'} {elapsed_us:7.1f} µs | {result} | {text}")
+    if failures:
+        raise SystemExit(f"{failures} z {len(REGRESSION_CASES)} przypadków niezgodnych")
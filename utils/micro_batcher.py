@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LatencyStats:
+    """
+    Statystyki opóźnień i przepustowości serwisu
+
+    Trzyma czasy ostatnich `window` zapytań (p50 / p99) oraz znaczniki czasu
+    z ostatnich `qps_window_s` sekund (QPS).
+    """
+
+    def __init__(self, window: int = 10_000, qps_window_s: float = 10.0):
+        self.latencies = deque(maxlen=window)
+        self.timestamps = deque()
+        self.qps_window_s = qps_window_s
+        self.requests = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.started_at = time.monotonic()
+
+    def record_request(self, latency_s: float) -> None:
+        now = time.monotonic()
+        self.requests += 1
+        self.latencies.append(latency_s)
+        self.timestamps.append(now)
+        self._trim(now)
+
+    def record_batch(self, size: int) -> None:
+        self.batches += 1
+        self.batched_rows += size
+
+    def _trim(self, now: float) -> None:
+        while self.timestamps and now - self.timestamps[0] > self.qps_window_s:
+            self.timestamps.popleft()
+
+    def snapshot(self) -> dict:
+        """Bieżące metryki (czasy w milisekundach)"""
+        now = time.monotonic()
+        self._trim(now)
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        window_s = min(self.qps_window_s, now - self.started_at) or 1.0
+        return {
+            'requests': self.requests,
+            'qps': round(len(self.timestamps) / window_s, 1),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+            'batches': self.batches,
+            'avg_batch_size': round(self.batched_rows / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class MicroBatcher:
+    """
+    Łączy równoległe zapytania o predykcję w małe wektorowe porcje
+
+    Pierwsze zapytanie w kolejce otwiera porcję; kolejne są do niej dokładane,
+    dopóki nie minie `max_wait_ms` lub porcja nie osiągnie `max_batch_size`.
+    Cała porcja to jedno wywołanie predict_batch (jeden iloczyn macierzowy).
+    """
+
+    def __init__(self, predict_batch, max_batch_size: int = 64, max_wait_ms: float = 2.0, stats: LatencyStats = None):
+        """
+        Args:
+            predict_batch: Funkcja macierz (n, k) -> wektor n predykcji
+            max_batch_size: Maksymalna liczba zapytań w porcji
+            max_wait_ms: Maksymalny czas oczekiwania na dopełnienie porcji
+            stats: Opcjonalne LatencyStats (liczba i rozmiar porcji)
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.stats = stats
+        self._queue = None
+        self._worker = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def predict(self, features) -> float:
+        """Predykcja dla jednego wektora feature'ów (czeka na swoją porcję)"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                # Najpierw zabieramy to, co już czeka - bez usypiania pętli
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        try:
+            predictions = self.predict_batch(np.array([features for features, _ in batch], dtype=np.float64))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if self.stats is not None:
+            self.stats.record_batch(len(batch))
+        for (_, future), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(float(prediction))
@@ -0,0 +1,97 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Model, scaler i model_info ładowane raz na proces i współdzielone między sesjami
+
+    Co `check_interval` sekund sprawdzana jest (tanio) wersja modelu w źródle.
+    Nowa wersja jest ładowana obok bieżącej i podmieniana jednym przypisaniem,
+    więc trwające predykcje dalej korzystają ze starego modelu. Błąd ładowania
+    w tle jest tylko logowany (zostaje poprzedni model); błąd pierwszego
+    ładowania trafia do `last_error`, żeby strona mogła go pokazać.
+    """
+
+    def __init__(self, load_fn, version_fn, check_interval: float = 60.0, compile_fn=None):
+        """
+        Args:
+            load_fn: Funkcja zwracająca krotkę (model, scaler, model_info); błędy zgłasza wyjątkiem
+            version_fn: Funkcja zwracająca identyfikator wersji (np. ETag, training_date)
+            check_interval: Odstęp między sprawdzeniami wersji (s)
+            compile_fn: Opcjonalna funkcja (model, scaler, model_info) -> predyktor,
+                        wywoływana raz przy każdym załadowaniu modelu
+        """
+        self.load_fn = load_fn
+        self.version_fn = version_fn
+        self.check_interval = check_interval
+        self.compile_fn = compile_fn
+        self._lock = threading.Lock()
+        self._state = None  # (wersja, (model, scaler, model_info), predyktor)
+        self._checked_at = 0.0
+        self.last_error = None  # wyjątek z ostatniego nieudanego pierwszego ładowania
+
+    def get(self):
+        """Zwraca bieżącą krotkę (model, scaler, model_info)"""
+        state = self._current_state()
+        return state[1] if state is not None else (None, None, None)
+
+    def get_predictor(self):
+        """Zwraca predyktor zbudowany przez compile_fn dla bieżącego modelu (lub None)"""
+        state = self._current_state()
+        return state[2] if state is not None else None
+
+    def _current_state(self):
+        state = self._state
+        if state is None:
+            # Pierwsze ładowanie - pozostałe wątki czekają, bo nie mają czego użyć
+            with self._lock:
+                if self._state is None:
+                    try:
+                        self._reload(self._current_version())
+                        self.last_error = None
+                    except Exception as e:
+                        # Bez modelu - kolejne wywołanie spróbuje ponownie
+                        print(f"Nie udało się załadować modelu: {e}")
+                        self.last_error = e
+                state = self._state
+        elif time.monotonic() - self._checked_at >= self.check_interval:
+            # Sprawdzenie wersji w tle: jeśli inny wątek już sprawdza, nic nie robimy
+            if self._lock.acquire(blocking=False):
+                self._checked_at = time.monotonic()
+                threading.Thread(target=self._check_for_update, daemon=True).start()
+
+        return state
+
+    def version(self):
+        """Wersja aktualnie załadowanego modelu"""
+        return self._state[0] if self._state is not None else None
+
+    def _check_for_update(self):
+        try:
+            version = self._current_version()
+            current = self.version()
+            if version is not None and version != current:
+                print(f"🔄 Nowa wersja modelu: {current} -> {version}")
+                self._reload(version)
+        except Exception as e:
+            print(f"Nie udało się przeładować modelu: {e}")
+        finally:
+            self._lock.release()
+
+    def _current_version(self):
+        self._checked_at = time.monotonic()
+        try:
+            return self.version_fn()
+        except Exception as e:
+            print(f"Nie udało się sprawdzić wersji modelu: {e}")
+            return None
+
+    def _reload(self, version):
+        bundle = self.load_fn()
+        model, _, model_info = bundle
+        if model is None or model_info is None:
+            # Nieudane ładowanie nie nadpisuje działającego modelu
+            return
+        predictor = self.compile_fn(*bundle) if self.compile_fn else None
+        self._state = (version, bundle, predictor)
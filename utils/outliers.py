@@ -0,0 +1,74 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Zmienne analizowane w sekcji Outliers Detection
+OUTLIER_COLUMNS = ['Tempo', 'Tempo Stabilność', 'Wiek', '5 km Tempo', '10 km Tempo', '15 km Tempo', '20 km Tempo']
+
+
+def iqr_bounds(df: pd.DataFrame, columns: List[str], factor: float = 1.5) -> pd.DataFrame:
+    """
+    Granice IQR dla wielu kolumn naraz (jedno wektorowe wyliczenie kwartyli)
+
+    Returns:
+        DataFrame indeksowany nazwą kolumny: Q1, Q3, IQR, lower, upper
+    """
+    values = df[columns].to_numpy()
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+    with np.errstate(invalid='ignore'):
+        q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    return pd.DataFrame({
+        'Q1': q1,
+        'Q3': q3,
+        'IQR': iqr,
+        'lower': q1 - factor * iqr,
+        'upper': q3 + factor * iqr,
+    }, index=pd.Index(columns, name='Column'))
+
+
+class OutlierScan:
+    """
+    Wynik jednego przebiegu IQR po wielu kolumnach
+
+    Granice (bounds) i maski outlierów (macierz bool: wiersz danych × kolumna)
+    liczone są raz; widoki dla poszczególnych zmiennych tylko z nich czytają.
+    Braki danych nie są outlierami.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: List[str] = OUTLIER_COLUMNS, factor: float = 1.5):
+        self.columns = [col for col in columns if col in df.columns]
+        self.factor = factor
+        self.bounds = iqr_bounds(df, self.columns, factor)
+
+        values = df[self.columns].to_numpy()
+        if values.dtype.kind != 'f':
+            values = values.astype(np.float64)
+        lower = self.bounds['lower'].to_numpy(values.dtype)
+        upper = self.bounds['upper'].to_numpy(values.dtype)
+        # Kolumnowy układ pamięci - maska jednej zmiennej to ciągły wycinek
+        self.masks = np.asfortranarray((values < lower) | (values > upper))
+        self.valid_counts = (~np.isnan(values)).sum(axis=0)
+
+    def mask(self, column: str) -> np.ndarray:
+        """Maska outlierów (bool, długość = liczba wierszy danych) dla kolumny"""
+        return self.masks[:, self.columns.index(column)]
+
+    def count(self, column: str) -> int:
+        return int(self.mask(column).sum())
+
+    def total(self, column: str) -> int:
+        """Liczba obserwacji (bez braków) w kolumnie"""
+        return int(self.valid_counts[self.columns.index(column)])
+
+    def summary(self) -> pd.DataFrame:
+        """Liczba i odsetek outlierów dla wszystkich kolumn wraz z granicami"""
+        counts = self.masks.sum(axis=0)
+        summary = self.bounds[['lower', 'upper']].copy()
+        summary['Outliers'] = counts
+        summary['Observations'] = self.valid_counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            summary['Outliers %'] = np.round(counts / self.valid_counts * 100, 2)
+        return summary
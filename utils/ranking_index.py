@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Kolumny zwracane w Top-N (o ile są w danych)
+RANKING_COLUMNS = ['Imię', 'Nazwisko', 'Płeć', 'Kategoria wiekowa', 'Wiek', 'Czas', 'Tempo', 'Tempo Stabilność']
+
+
+class RankingIndex:
+    """
+    Rankingi tempa ukończonych biegów: rok × płeć × kategoria wiekowa
+
+    Dla każdego roku dane ukończonych biegów sortowane są raz po tempie; każda
+    grupa (cały bieg, płeć, kategoria, płeć + kategoria) to posortowana tablica
+    pozycji i temp. Top-N to wycinek pierwszych N pozycji, a miejsce dla
+    dowolnego tempa - wyszukiwanie binarne (np.searchsorted, O(log n)).
+    Grupa None oznacza "wszyscy".
+    """
+
+    def __init__(self, frames: Dict[int, pd.DataFrame], value_column: str = 'Tempo'):
+        self.value_column = value_column
+        self._tables = {}
+        self._positions = {}
+        self._values = {}
+
+        for year, df in frames.items():
+            finished = df[df['Miejsce'].notna() & df[value_column].notna()]
+            order = np.argsort(finished[value_column].to_numpy(np.float64), kind='stable')
+            table = finished.iloc[order][[col for col in RANKING_COLUMNS if col in finished.columns]]
+            self._tables[year] = table.reset_index(drop=True)
+            values = finished[value_column].to_numpy(np.float64)[order]
+
+            genders = finished['Płeć'].astype(object).to_numpy()[order]
+            categories = finished['Kategoria wiekowa'].astype(object).to_numpy()[order]
+            # groupby.indices: rosnące pozycje każdej grupy (jedno sortowanie na podział,
+            # bez maski na grupę), więc każda grupa zostaje posortowana po tempie
+            rows = pd.Series(np.arange(len(values)))
+            groups = {(None, None): rows.to_numpy()}
+            groups.update({(gender, None): pos for gender, pos in rows.groupby(genders).indices.items()})
+            groups.update({(None, category): pos for category, pos in rows.groupby(categories).indices.items()})
+            groups.update(rows.groupby([genders, categories]).indices)
+
+            for (gender, category), positions in groups.items():
+                self._positions[(year, gender, category)] = positions
+                self._values[(year, gender, category)] = values[positions]
+
+    def years(self) -> List[int]:
+        return sorted(self._tables)
+
+    def categories(self, year: int, gender: str = None) -> List[str]:
+        """Kategorie wiekowe z rankingiem w danym roku (opcjonalnie dla płci)"""
+        return sorted(
+            category for (key_year, key_gender, category) in self._positions
+            if key_year == year and category is not None and key_gender == gender
+        )
+
+    def top(self, year: int, gender: str = None, category: str = None, n: int = 10) -> pd.DataFrame:
+        """Najszybsze N osób w grupie; indeks = miejsce w grupie (od 1)"""
+        positions = self._positions.get((year, gender, category), np.array([], dtype=np.int64))
+        top = self._tables[year].iloc[positions[:n]].reset_index(drop=True)
+        top.index = top.index + 1
+        return top
+
+    def place(self, value: float, year: int, gender: str = None, category: str = None) -> Optional[dict]:
+        """
+        Miejsce, jakie dałoby tempo `value` w grupie
+
+        Returns:
+            Słownik: place (miejsce ex aequo z równym tempem), field (liczba
+            ukończonych w grupie razem z biegaczem o tempie `value`, więc
+            place <= field), percentile (odsetek wolniejszych spośród
+            ukończonych); None dla pustej / nieznanej grupy
+        """
+        values = self._values.get((year, gender, category))
+        if values is None or len(values) == 0:
+            return None
+        better = int(np.searchsorted(values, value, side='left'))
+        slower = len(values) - int(np.searchsorted(values, value, side='right'))
+        return {
+            'place': better + 1,
+            'field': len(values) + 1,
+            'percentile': round(slower / len(values) * 100, 1),
+        }
+
+    def age_category(self, year: int, gender: str, age: float) -> Optional[str]:
+        """
+        Kategoria wiekowa z danych danego roku dla płci i wieku
+
+        Kategorie mają postać płeć + dolna granica wieku (np. M30); wybierana
+        jest najwyższa granica nie większa niż wiek (młodsi - najniższa kategoria).
+        """
+        thresholds = {}
+        for category in self.categories(year, gender):
+            try:
+                thresholds[int(category[len(gender):])] = category
+            except ValueError:
+                continue
+        if not thresholds:
+            return None
+        eligible = [threshold for threshold in thresholds if threshold <= age]
+        return thresholds[max(eligible) if eligible else min(thresholds)]
+
+    def placements(self, value: float, gender: str, age: float) -> pd.DataFrame:
+        """Miejsca tempa `value` w każdym roku: open, w płci i w kategorii wiekowej"""
+        rows = []
+        for year in self.years():
+            groups = [("Open", None, None), (f"Płeć {gender}", gender, None)]
+            category = self.age_category(year, gender, age)
+            if category is not None:
+                groups.append((f"Kategoria {category}", gender, category))
+            for label, group_gender, group_category in groups:
+                placement = self.place(value, year, group_gender, group_category)
+                if placement is not None:
+                    rows.append({'Rok': year, 'Ranking': label, 'Miejsce': placement['place'],
+                                 'Stawka (z Tobą)': placement['field'], 'Szybszy niż %': placement['percentile']})
+        return pd.DataFrame(rows)
@@ -0,0 +1,248 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "15"))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+# Hedge podwaja koszt wolnych zapytań - domyślnie wyłączony
+LLM_HEDGE = os.getenv("LLM_HEDGE", "0") == "1"
+
+try:
+    from google.api_core.exceptions import DeadlineExceeded
+    # Przekroczenie czasu: lokalny limit próby lub DeadlineExceeded z API Google
+    TIMEOUT_ERRORS = (TimeoutError, DeadlineExceeded)
+except ImportError:  # bez klienta Google
+    TIMEOUT_ERRORS = (TimeoutError,)
+
+# Granice koszyków histogramu opóźnień (ms)
+HISTOGRAM_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class CircuitOpenError(Exception):
+    """Wyłącznik obwodu jest otwarty - zapytanie nie zostało wysłane"""
+
+
+def is_timeout_error(error: Exception) -> bool:
+    return isinstance(error, TIMEOUT_ERRORS)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Błąd, który warto ponowić: przekroczenie czasu, zerwane połączenie, HTTP 429 lub 5xx
+
+    Kod HTTP pochodzi z `code` (wyjątki google.api_core) lub `response.status_code`
+    (requests / httpx). Pozostałe błędy (np. 400, zły klucz API) zwracane są od razu.
+    """
+    if is_timeout_error(error) or isinstance(error, ConnectionError):
+        return True
+    status = getattr(error, 'code', None)
+    if not isinstance(status, int):
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return isinstance(status, int) and (status == 429 or 500 <= status < 600)
+
+
+class LatencyHistogram:
+    """Histogram opóźnień (stałe koszyki) + okno ostatnich pomiarów do percentyli"""
+
+    def __init__(self, buckets_ms: list = None, window: int = 500):
+        self.buckets_ms = list(buckets_ms or HISTOGRAM_BUCKETS_MS)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency_s: float) -> None:
+        latency_ms = latency_s * 1000
+        index = next((i for i, bound in enumerate(self.buckets_ms) if latency_ms <= bound), len(self.buckets_ms))
+        with self._lock:
+            self.counts[index] += 1
+            self.samples.append(latency_ms)
+
+    def percentile(self, q: float):
+        """Percentyl (ms) z ostatnich pomiarów lub None, gdy brak danych"""
+        with self._lock:
+            samples = list(self.samples)
+        return float(np.percentile(samples, q)) if samples else None
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+        labels = [f"<={bound}" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}"]
+        return {
+            'buckets_ms': dict(zip(labels, counts)),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+        }
+
+
+class CircuitBreaker:
+    """
+    Wyłącznik obwodu oparty na odsetku błędów w oknie ostatnich wywołań
+
+    Gdy w ostatnich `window` wywołaniach (co najmniej `min_calls`) odsetek
+    błędów przekroczy `failure_threshold`, obwód otwiera się na `cooldown_s`
+    sekund. Potem przepuszczane jest jedno zapytanie próbne (half-open):
+    sukces zamyka obwód, błąd otwiera go ponownie.
+    """
+
+    def __init__(self, failure_threshold: float = 0.5, window: int = 20, min_calls: int = 5, cooldown_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.cooldown_s = cooldown_s
+        self.results = deque(maxlen=window)
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown_s:
+                self.state = 'half_open'
+                return True
+            return self.state == 'closed'
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if self.state == 'half_open':
+                self._set_state('closed' if success else 'open')
+                return
+            self.results.append(success)
+            failures = self.results.count(False)
+            if (self.state == 'closed' and len(self.results) >= self.min_calls
+                    and failures / len(self.results) > self.failure_threshold):
+                self._set_state('open')
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            print(f"⚡ Wyłącznik LLM: {self.state} -> {state}")
+        self.state = state
+        if state == 'open':
+            self.opened_at = time.monotonic()
+        self.results.clear()
+
+
+class ResilientCaller:
+    """
+    Wywołanie usługi zdalnej z limitem czasu, ponowieniami, zapytaniem hedge i wyłącznikiem
+
+    - każda próba ma limit czasu `timeout_s` (przekazywany też do call_fn),
+    - po błędzie przejściowym (is_transient_error) kolejna próba startuje po losowym
+      opóźnieniu (full jitter); pozostałe błędy są zwracane bez ponawiania,
+    - gdy próba trwa dłużej niż p95 dotychczasowych odpowiedzi, wysyłane jest
+      drugie, równoległe zapytanie i wygrywa pierwsza poprawna odpowiedź,
+    - przy otwartym wyłączniku rzucany jest od razu CircuitOpenError.
+    """
+
+    def __init__(self, call_fn, timeout_s: float = LLM_TIMEOUT, retries: int = LLM_RETRIES,
+                 backoff_base_s: float = 0.5, hedge: bool = LLM_HEDGE, hedge_min_samples: int = 20,
+                 breaker: CircuitBreaker = None, max_workers: int = 16):
+        """
+        Args:
+            call_fn: Funkcja (argument, timeout_s) -> odpowiedź
+            timeout_s: Limit czasu jednej próby (s)
+            retries: Liczba ponowień po błędzie przejściowym lub przekroczeniu czasu
+            backoff_base_s: Bazowe opóźnienie ponowienia (rośnie 2x z każdą próbą)
+            hedge: Czy wysyłać zapytanie hedge po czasie p95
+            hedge_min_samples: Minimalna liczba pomiarów, zanim p95 zostanie użyte
+            breaker: Wyłącznik obwodu (domyślnie CircuitBreaker())
+            max_workers: Maksymalna liczba równoległych zapytań
+        """
+        self.call_fn = call_fn
+        self.timeout_s = timeout_s
+        self.retries = retries
+        self.backoff_base_s = backoff_base_s
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.histogram = LatencyHistogram()
+        self.counters = {'calls': 0, 'attempts': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0,
+                         'timeouts': 0, 'errors': 0, 'rejected': 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def hedge_delay_s(self):
+        """Opóźnienie zapytania hedge: p95 udanych odpowiedzi (None = jeszcze za mało danych)"""
+        if not self.hedge or len(self.histogram) < self.hedge_min_samples:
+            return None
+        return self.histogram.percentile(95) / 1000
+
+    def call(self, argument):
+        """Wywołuje call_fn(argument, timeout_s) z ponowieniami; rzuca ostatni błąd"""
+        self._count('calls')
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise CircuitOpenError("Usługa LLM chwilowo niedostępna (zbyt wiele błędów)")
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count('retries')
+                time.sleep(random.uniform(0, self.backoff_base_s * 2 ** (attempt - 1)))
+            try:
+                result = self._attempt(argument)
+            except Exception as e:
+                last_error = e
+                self._count('timeouts' if is_timeout_error(e) else 'errors')
+                if not is_transient_error(e):
+                    # Usługa odpowiedziała - błąd po naszej stronie, ponowienie nic nie da
+                    self.breaker.record(True)
+                    raise
+                self.breaker.record(False)
+                if not self.breaker.allow():
+                    break
+                continue
+            self.breaker.record(True)
+            return result
+        raise last_error
+
+    def _attempt(self, argument):
+        started_at = time.perf_counter()
+        deadline = time.monotonic() + self.timeout_s
+        self._count('attempts')
+        futures = {self._executor.submit(self.call_fn, argument, self.timeout_s): 'primary'}
+
+        hedge_delay = self.hedge_delay_s()
+        if hedge_delay is not None and hedge_delay < self.timeout_s:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                self._count('hedges')
+                futures[self._executor.submit(self.call_fn, argument, self.timeout_s)] = 'hedge'
+
+        error = None
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if futures[future] == 'hedge':
+                    self._count('hedge_wins')
+                self.histogram.record(time.perf_counter() - started_at)
+                return future.result()
+
+        if error is not None and not pending:
+            raise error
+        # Wątek z zapytaniem nie jest przerywany - call_fn dostał timeout_s i sam się zakończy
+        raise TimeoutError(f"Brak odpowiedzi LLM w ciągu {self.timeout_s:g} s")
+
+    def stats(self) -> dict:
+        """Liczniki, stan wyłącznika i histogram opóźnień"""
+        with self._lock:
+            counters = dict(self.counters)
+        return {**counters, 'breaker': self.breaker.state, 'latency': self.histogram.snapshot()}
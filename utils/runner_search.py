@@ -0,0 +1,143 @@
+import re
+import unicodedata
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from utils.data_schema import format_seconds
+
+# Pola przeszukiwane po prefiksie (każde słowo osobno)
+SEARCH_COLUMNS = ['Imię', 'Nazwisko', 'Numer startowy', 'Drużyna']
+
+# Kolumny zwracane w wynikach wyszukiwania
+RESULT_COLUMNS = [
+    'Numer startowy', 'Imię', 'Nazwisko', 'Drużyna', 'Płeć', 'Kategoria wiekowa',
+    'Miejsce', 'Płeć Miejsce', 'Kategoria wiekowa Miejsce',
+    '5 km Czas', '10 km Czas', '15 km Czas', '20 km Czas', 'Czas', 'Tempo'
+]
+
+# Separatory słów: nazwiska dwuczłonowe ('Kowalska-Łęcka'), drużyny ('KB/Wrocław', 'A.Z.S.')
+WORD_SEPARATORS = re.compile(r"[\s\-/.]+")
+
+# Litery bez rozkładu NFKD na literę bazową + znak diakrytyczny
+_FOLD_TABLE = str.maketrans({'ł': 'l', 'Ł': 'l', 'ø': 'o', 'Ø': 'o', 'đ': 'd', 'Đ': 'd', 'ß': 'ss'})
+
+
+def fold_text(text: str) -> str:
+    """Małe litery bez znaków diakrytycznych ('Łukasz' -> 'lukasz')"""
+    text = unicodedata.normalize('NFKD', str(text).translate(_FOLD_TABLE).lower())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def split_words(text: str) -> list:
+    """Słowa tekstu po fold_text ('Kowalska-Łęcka' -> ['kowalska', 'lecka'])"""
+    return [word for word in WORD_SEPARATORS.split(fold_text(text)) if word]
+
+
+def _word_postings(values: pd.Series):
+    """
+    Słowa (split_words) z kolumny i numery wierszy, w których występują
+
+    Każda unikalna wartość jest składana i dzielona na słowa raz (imiona czy drużyny
+    powtarzają się wielokrotnie), a rozwinięcie na wiersze jest wektorowe.
+    """
+    codes, uniques = pd.factorize(values)
+    words = [split_words(value) for value in uniques]
+    word_counts = np.array([len(w) for w in words] + [0], dtype=np.int64)  # ostatni: brak wartości (kod -1)
+    word_offsets = np.concatenate([[0], np.cumsum(word_counts[:-1])])
+    flat_words = np.array([word for w in words for word in w], dtype=str)
+
+    per_row = word_counts[codes]
+    rows = np.repeat(np.arange(len(values)), per_row)
+    # Numer słowa w obrębie wiersza: 0, 1, ... dla każdego wiersza
+    within_row = np.arange(len(rows)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    return flat_words[word_offsets[codes[rows]] + within_row], rows
+
+
+class RunnerSearchIndex:
+    """
+    Indeks wyszukiwania biegaczy po imieniu, nazwisku, numerze startowym i drużynie
+
+    Każde słowo z pól SEARCH_COLUMNS (split_words) trafia do jednej posortowanej
+    tablicy kluczy z numerem wiersza. Słowo zapytania to przedział kluczy
+    o danym prefiksie (dwa np.searchsorted, O(log n)); przy kilku słowach
+    wynikiem jest część wspólna wierszy.
+    """
+
+    def __init__(self, frames: Dict[int, pd.DataFrame]):
+        tables = []
+        for year, df in frames.items():
+            table = df[[col for col in RESULT_COLUMNS if col in df.columns]].copy()
+            finished = df['Miejsce'].notna().sum()
+            # Odsetek ukończonych biegaczy z gorszym miejscem
+            table['Percentyl'] = ((finished - df['Miejsce'].astype('float64')) / finished * 100).round(1)
+            table.insert(0, 'Rok', year)
+            tables.append(table)
+        self.table = pd.concat(tables, ignore_index=True)
+
+        # Pozycja wiersza w kolejności wyników (rok, miejsce; bez miejsca na końcu)
+        result_order = self.table.sort_values(['Rok', 'Miejsce'], na_position='last', kind='stable').index.to_numpy()
+        self._rank = np.empty(len(self.table), dtype=np.int64)
+        self._rank[result_order] = np.arange(len(self.table))
+
+        keys, rows = [], []
+        for col in SEARCH_COLUMNS:
+            if col not in self.table.columns:
+                continue
+            values = self.table[col]
+            if pd.api.types.is_numeric_dtype(values):
+                values = values.astype('Int64')
+            column_keys, column_rows = _word_postings(values)
+            keys.append(column_keys)
+            rows.append(column_rows)
+
+        keys = np.concatenate(keys) if keys else np.array([], dtype=str)
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.rows = rows[order].astype(np.int64)
+
+    def _prefix_rows(self, prefix: str) -> np.ndarray:
+        start = np.searchsorted(self.keys, prefix, side='left')
+        end = np.searchsorted(self.keys, prefix + '\U0010ffff', side='left')
+        return np.unique(self.rows[start:end])
+
+    def match(self, query: str) -> np.ndarray:
+        """Numery wierszy tabeli pasujących do wszystkich słów zapytania"""
+        matches = None
+        for term in split_words(query):
+            term_rows = self._prefix_rows(term)
+            matches = term_rows if matches is None else np.intersect1d(matches, term_rows, assume_unique=True)
+            if len(matches) == 0:
+                break
+        return matches if matches is not None else np.array([], dtype=np.int64)
+
+    def search(self, query: str, limit: int = 20) -> pd.DataFrame:
+        """
+        Biegacze pasujący do wszystkich słów zapytania (prefiksy, bez znaczenia wielkość liter i ogonki)
+
+        Returns:
+            DataFrame z rokiem, miejscami, czasami pośrednimi i percentylem
+            (sortowany: rok, miejsce), najwyżej `limit` wierszy
+        """
+        matches = self.match(query)
+        # Wycinany jest tylko wynikowy fragment tabeli, niezależnie od liczby dopasowań
+        ranks = self._rank[matches]
+        if len(matches) > limit:
+            selected = np.argpartition(ranks, limit)[:limit]
+            matches, ranks = matches[selected], ranks[selected]
+        top = matches[np.argsort(ranks)]
+        return self.table.iloc[top]
+
+
+def format_search_results(results: pd.DataFrame) -> pd.DataFrame:
+    """Czasy jako HH:MM:SS, numer startowy i miejsca jako liczby całkowite (do wyświetlania)"""
+    results = results.copy()
+    for col in ['5 km Czas', '10 km Czas', '15 km Czas', '20 km Czas', 'Czas']:
+        if col in results.columns:
+            results[col] = format_seconds(results[col])
+    for col in ['Numer startowy', 'Miejsce', 'Płeć Miejsce', 'Kategoria wiekowa Miejsce']:
+        if col in results.columns:
+            results[col] = results[col].astype('Int64')
+    return results
@@ -0,0 +1,61 @@
+import importlib
+import sys
+import time
+import streamlit as st
+
+
+@st.cache_resource
+def _first_render_times() -> dict:
+    # Wspólne dla całego procesu: strona -> czas pierwszego renderowania (s)
+    return {}
+
+
+@st.cache_resource
+def _page_import_times() -> dict:
+    # Wspólne dla całego procesu: moduł strony -> czas pierwszego importu (s)
+    return {}
+
+
+def import_page(module_name: str):
+    """
+    Importuje moduł strony przy pierwszym użyciu i zapisuje czas importu
+
+    Args:
+        module_name: Pełna nazwa modułu, np. "app_pages.eda_analysis"
+
+    Returns:
+        Zaimportowany moduł
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    started_at = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - started_at
+    _page_import_times()[module_name] = elapsed
+    print(f"📦 Import '{module_name}': {elapsed * 1000:.0f} ms")
+    return module
+
+
+def page_import_times() -> dict:
+    """Czasy pierwszego importu modułów stron w procesie (moduł -> s)"""
+    return dict(_page_import_times())
+
+
+def record_page_render(page: str, started_at: float) -> dict:
+    """
+    Zapisuje czas renderowania strony (od startu skryptu do końca show())
+
+    Args:
+        page: Nazwa strony z menu
+        started_at: time.perf_counter() z początku uruchomienia skryptu
+
+    Returns:
+        Słownik z czasem pierwszego renderowania strony w procesie i bieżącego rerunu
+    """
+    elapsed = time.perf_counter() - started_at
+    first_renders = _first_render_times()
+    if page not in first_renders:
+        first_renders[page] = elapsed
+        print(f"⏱️ Pierwsze renderowanie '{page}': {elapsed * 1000:.0f} ms")
+    return {'first_render_s': first_renders[page], 'render_s': elapsed}
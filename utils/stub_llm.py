@@ -0,0 +1,90 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+
+from utils.local_extractor import extract_runner_data_locally
+
+BATCH_ITEM_PATTERN = re.compile(r"^\[(\d+)\]\s*(.*)$", re.MULTILINE)
+
+
+class StubUsage:
+    """Przybliżone usage_metadata (ok. 4 znaki na token)"""
+
+    def __init__(self, prompt: str, text: str):
+        self.prompt_token_count = math.ceil(len(prompt) / 4)
+        self.candidates_token_count = math.ceil(len(text) / 4)
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class StubResponse:
+    def __init__(self, prompt: str, text: str):
+        self.text = text
+        self.usage_metadata = StubUsage(prompt, text)
+
+
+class StubLLM:
+    """
+    Lokalna atrapa GenerativeModel (testy, benchmarki, praca bez klucza API)
+
+    Odpowiada w formacie Gemini (JSON z gender / age / time_5km_minutes,
+    wyekstrahowanym regułami lokalnymi; dla promptu z wieloma opisami -
+    tablica JSON) i pozwala wstrzyknąć opóźnienia oraz błędy:
+        delay_s      - typowe opóźnienie odpowiedzi
+        item_delay_s - dodatkowe opóźnienie na każdy opis w prompcie wsadowym
+        jitter_s     - losowy rozrzut opóźnienia
+        slow_rate    - odsetek odpowiedzi bardzo wolnych (ogon rozkładu)
+        slow_delay_s - opóźnienie wolnej odpowiedzi
+        error_rate   - odsetek odpowiedzi kończących się wyjątkiem
+    """
+
+    def __init__(self, delay_s: float = 0.05, jitter_s: float = 0.02, slow_rate: float = 0.0,
+                 slow_delay_s: float = 2.0, error_rate: float = 0.0, seed: int = None, item_delay_s: float = 0.005):
+        self.model_name = "stub"
+        self.delay_s = delay_s
+        self.item_delay_s = item_delay_s
+        self.jitter_s = jitter_s
+        self.slow_rate = slow_rate
+        self.slow_delay_s = slow_delay_s
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, request_options: dict = None) -> StubResponse:
+        batch_items = BATCH_ITEM_PATTERN.findall(_user_text(prompt))
+        with self._lock:
+            self.calls += 1
+            is_slow = self._random.random() < self.slow_rate
+            is_error = self._random.random() < self.error_rate
+            delay = self.slow_delay_s if is_slow else self.delay_s + self._random.uniform(0, self.jitter_s)
+            delay += self.item_delay_s * len(batch_items)
+
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Przekroczono limit czasu (stub)")
+        time.sleep(delay)
+        if is_error:
+            raise ConnectionError("Błąd usługi LLM (stub)")
+
+        if batch_items:
+            text = json.dumps([
+                {"id": int(item_id), **extract_runner_data_locally(item)} for item_id, item in batch_items
+            ], ensure_ascii=False)
+        else:
+            text = json.dumps(extract_runner_data_locally(_user_text(prompt)), ensure_ascii=False)
+        return StubResponse(prompt, text)
+
+
+def _user_text(prompt: str) -> str:
+    """Wyciąga opis użytkownika z promptu ekstrakcji"""
+    for marker in ("OPIS UŻYTKOWNIKA:", "OPISY UŻYTKOWNIKÓW:"):
+        start = prompt.find(marker)
+        if start == -1:
+            continue
+        end = prompt.find("ZADANIE:", start)
+        return prompt[start + len(marker):end if end != -1 else len(prompt)].strip()
+    return prompt
@@ -0,0 +1,87 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Kolumny z filtrem wyboru wartości w Data Overview
+FILTER_COLUMNS = ['Płeć', 'Kategoria wiekowa', 'Miasto', 'Drużyna']
+
+# Kolumny z gotowym porządkiem sortowania (liczonym raz przy budowie indeksu)
+SORT_COLUMNS = ['Miejsce', 'Numer startowy', 'Nazwisko', 'Czas', 'Tempo', '5 km Tempo', 'Tempo Stabilność', 'Rocznik']
+
+
+class TableIndex:
+    """
+    Indeks do stronicowania, filtrowania i sortowania tabeli po stronie serwera
+
+    Przy budowie liczone są kody wartości kolumn filtrów i permutacje
+    sortujące (rosnąco i malejąco, braki zawsze na końcu). Zapytanie to
+    operacje na tablicach NumPy, a DataFrame wycinany jest tylko dla
+    widocznej strony.
+    """
+
+    def __init__(self, df: pd.DataFrame, filter_columns: List[str] = FILTER_COLUMNS,
+                 sort_columns: List[str] = SORT_COLUMNS):
+        self.df = df
+        self.filter_columns = [col for col in filter_columns if col in df.columns]
+        self.sort_columns = [col for col in sort_columns if col in df.columns]
+
+        # Kolumna filtra -> (kody wierszy, wartości); brak wartości ma kod -1
+        self._codes = {}
+        for col in self.filter_columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                codes, values = df[col].cat.codes.to_numpy(), df[col].cat.categories
+            else:
+                codes, values = pd.factorize(df[col], sort=True)
+            self._codes[col] = (np.asarray(codes), pd.Index(values))
+
+        self._orders = {}
+        for col in self.sort_columns:
+            values = df[col].reset_index(drop=True)
+            self._orders[col] = {
+                ascending: values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+                for ascending in (True, False)
+            }
+
+    def options(self, column: str) -> List:
+        """Wartości do wyboru w filtrze kolumny, od najczęstszych"""
+        codes, values = self._codes[column]
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        present = np.flatnonzero(counts)
+        return [values[i] for i in present[np.argsort(-counts[present], kind='stable')]]
+
+    def _mask(self, filters: Dict[str, List]) -> np.ndarray:
+        mask = np.ones(len(self.df), dtype=bool)
+        for col, selected in filters.items():
+            if not selected:
+                continue
+            codes, values = self._codes[col]
+            selected_codes = values.get_indexer(selected)
+            # -1 z get_indexer (wartość spoza danych) nie może trafić w braki
+            mask &= np.isin(codes, selected_codes[selected_codes >= 0])
+        return mask
+
+    def query(self, filters: Dict[str, List] = None, sort_by: str = None, ascending: bool = True,
+              page: int = 1, page_size: int = 50, columns: List[str] = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Jedna strona tabeli
+
+        Args:
+            filters: kolumna -> wybrane wartości (pusta lista = bez filtra)
+            sort_by: kolumna z SORT_COLUMNS (None = kolejność danych)
+            page: numer strony od 1
+            columns: projekcja kolumn (None = wszystkie)
+
+        Returns:
+            Krotka (wiersze strony, liczba wierszy po filtrach)
+        """
+        mask = self._mask(filters or {})
+        order = self._orders[sort_by][ascending] if sort_by else np.arange(len(self.df))
+        rows = order[mask[order]]
+
+        start = (max(page, 1) - 1) * page_size
+        page_rows = rows[start:start + page_size]
+        page_df = self.df.iloc[page_rows]
+        if columns is not None:
+            page_df = page_df[columns]
+        return page_df, len(rows)
@@ -0,0 +1,372 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+TELEMETRY_QUEUE_SIZE = int(os.getenv("TELEMETRY_QUEUE_SIZE", "1000"))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "50"))
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "2"))
+# Pusty TELEMETRY_SPILL_PATH = paczki, których nie udało się wysłać, są porzucane
+TELEMETRY_SPILL_PATH = os.getenv("TELEMETRY_SPILL_PATH", "data_cache/telemetry_spill.jsonl")
+TELEMETRY_MAX_SPILL_BYTES = int(os.getenv("TELEMETRY_MAX_SPILL_BYTES", str(10 * 1024 * 1024)))
+
+
+class ExportStatusRecorder:
+    """
+    Wyniki eksportu spanów Langfuse (span_id -> True/False)
+
+    SDK Langfuse v3 wysyła dane w tle przez OpenTelemetry: błąd sieci czy HTTP
+    kończy się tylko wpisem w logu, a flush() nigdy nie zgłasza wyjątku.
+    Dlatego owijamy export() eksportera i zapamiętujemy jego wynik dla każdego
+    spanu (ograniczona liczba ostatnich wpisów - spany spoza telemetrii też tu trafiają).
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def wrap(self, exporter) -> None:
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        export = exporter.export
+
+        def recording_export(spans):
+            try:
+                result = export(spans)
+            except Exception:
+                self._record(spans, False)
+                raise
+            self._record(spans, result == SpanExportResult.SUCCESS)
+            return result
+
+        exporter.export = recording_export
+
+    def _record(self, spans, ok: bool) -> None:
+        with self._lock:
+            for span in spans:
+                self._results[format(span.context.span_id, "016x")] = ok
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def pop(self, span_id: str):
+        """Wynik eksportu spanu: True, False lub None (span jeszcze niewysłany / nieznany)"""
+        with self._lock:
+            return self._results.pop(span_id, None)
+
+
+def install_export_recorder():
+    """
+    Podpina ExportStatusRecorder pod eksporter procesora Langfuse w globalnym TracerProvider
+
+    Zwraca None, gdy procesora nie da się znaleźć (inna wersja SDK / OpenTelemetry).
+    """
+    try:
+        from opentelemetry import trace
+        from langfuse._client.span_processor import LangfuseSpanProcessor
+    except ImportError:
+        return None
+    provider = trace.get_tracer_provider()
+    processors = getattr(getattr(provider, '_active_span_processor', None), '_span_processors', ())
+    exporters = [p.span_exporter for p in processors if isinstance(p, LangfuseSpanProcessor)]
+    if not exporters:
+        return None
+    recorder = ExportStatusRecorder()
+    for exporter in exporters:
+        recorder.wrap(exporter)
+    return recorder
+
+
+class LangfuseSender:
+    """
+    Wysyła paczkę zdarzeń do Langfuse (jeden flush na paczkę)
+
+    Zwraca zdarzenia, których eksporter nie dostarczył - po flush() sprawdzany
+    jest wynik eksportu każdego spanu (ExportStatusRecorder), więc ponownie
+    wysyłane są tylko one, a nie cała paczka.
+    """
+
+    def __init__(self, get_client):
+        """
+        Args:
+            get_client: Funkcja zwracająca klienta Langfuse (wywoływana przy wysyłce,
+                        więc klient powstaje w wątku telemetrii, a nie na ścieżce zapytania)
+        """
+        self.get_client = get_client
+        self._recorder = None
+        self._recorder_ready = False
+
+    def __call__(self, events: list) -> list:
+        client = self.get_client()
+        if not self._recorder_ready:
+            # Przed utworzeniem pierwszego spanu - eksport w tle może ruszyć od razu
+            self._recorder = install_export_recorder()
+            self._recorder_ready = True
+            if self._recorder is None:
+                print("⚠️ Brak dostępu do eksportera Langfuse - błędy wysyłki telemetrii nie będą wykrywane")
+
+        span_ids = []
+        for event in events:
+            fields = {
+                'name': event['name'],
+                'input': event.get('input'),
+                'output': event.get('output'),
+                'metadata': {**event.get('metadata', {}), 'emitted_at': event['emitted_at']},
+                'level': event.get('level'),
+                'status_message': event.get('status_message'),
+            }
+            if event.get('type') == 'generation':
+                observation = client.start_generation(
+                    **fields, model=event.get('model'), usage_details=event.get('usage_details')
+                )
+                observation.end()
+            else:
+                observation = client.create_event(**fields)
+            # Spany odrzucone przez sampling nigdy nie są eksportowane - nie czekamy na nie
+            sampled = observation._otel_span.get_span_context().trace_flags.sampled
+            span_ids.append(observation.id if sampled else None)
+        client.flush()
+
+        if self._recorder is None:
+            return []
+        # Brak wyniku po flush (np. span porzucony przez pełną kolejkę OpenTelemetry) = niedostarczony
+        return [event for event, span_id in zip(events, span_ids)
+                if span_id is not None and self._recorder.pop(span_id) is not True]
+
+
+class FakeCollector:
+    """
+    Lokalny kolektor zamiast Langfuse (testy, benchmarki, praca offline)
+
+    Zapamiętuje otrzymane paczki; `latency_s` symuluje wolny backend,
+    `down=True` - niedostępny (każde wysłanie kończy się wyjątkiem),
+    a `reject` (funkcja zdarzenie -> bool) - częściowo nieudany eksport.
+    """
+
+    def __init__(self, latency_s: float = 0.0, down: bool = False, reject=None):
+        self.latency_s = latency_s
+        self.down = down
+        self.reject = reject
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, events: list) -> list:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if self.down:
+            raise ConnectionError("Kolektor telemetrii niedostępny")
+        rejected = [event for event in events if self.reject is not None and self.reject(event)]
+        with self._lock:
+            self.batches.append([event for event in events if event not in rejected])
+        return rejected
+
+    @property
+    def events(self) -> list:
+        with self._lock:
+            return [event for batch in self.batches for event in batch]
+
+
+class TelemetryQueue:
+    """
+    Nieblokująca telemetria: zdarzenia trafiają do ograniczonej kolejki w pamięci,
+    a wątek w tle wysyła je paczkami
+
+    emit() nigdy nie czeka na backend - przy pełnej kolejce zdarzenie jest
+    porzucane (licznik 'dropped'). Zdarzenia, których nie udało się dostarczyć, są
+    dopisywane do pliku `spill_path` (JSONL) i wysyłane ponownie po pierwszej
+    w pełni udanej wysyłce; 'spilled' liczy każde zdarzenie raz, także gdy
+    ponowna wysyłka się nie powiedzie. Przy zamknięciu procesu kolejka jest opróżniana (atexit).
+    """
+
+    def __init__(self, sender, max_queue: int = TELEMETRY_QUEUE_SIZE, batch_size: int = TELEMETRY_BATCH_SIZE,
+                 flush_interval: float = TELEMETRY_FLUSH_INTERVAL, spill_path=TELEMETRY_SPILL_PATH,
+                 max_spill_bytes: int = TELEMETRY_MAX_SPILL_BYTES):
+        """
+        Args:
+            sender: Funkcja wysyłająca listę zdarzeń (np. LangfuseSender, FakeCollector);
+                    zwraca zdarzenia niedostarczone (None = wszystkie dostarczone),
+                    a wyjątek oznacza niedostarczenie całej paczki
+            max_queue: Maksymalna liczba zdarzeń czekających w pamięci
+            batch_size: Maksymalna liczba zdarzeń w jednej paczce
+            flush_interval: Maksymalny czas (s) oczekiwania na dopełnienie paczki
+            spill_path: Plik na paczki niewysłane (None = porzucanie)
+            max_spill_bytes: Limit rozmiaru pliku spill
+        """
+        self.sender = sender
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.max_spill_bytes = max_spill_bytes
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flushing = threading.Event()
+        self.counters = {'queued': 0, 'sent': 0, 'dropped': 0, 'spilled': 0, 'replayed': 0, 'failed_batches': 0}
+
+        self._worker = threading.Thread(target=self._run, name="telemetry-worker", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def emit(self, event: dict) -> bool:
+        """Dodaje zdarzenie do kolejki; zwraca False, gdy zostało porzucone"""
+        event = {**event, 'emitted_at': event.get('emitted_at', time.time())}
+        if self._stopped.is_set():
+            self._count('dropped')
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        self._count('queued')
+        return True
+
+    def stats(self) -> dict:
+        """Liczniki zdarzeń oraz bieżąca długość kolejki"""
+        with self._lock:
+            counters = dict(self.counters)
+        counters['pending'] = self._queue.qsize()
+        return counters
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Czeka, aż wszystkie zdarzenia z kolejki zostaną obsłużone"""
+        # W trakcie flush wątek w tle nie czeka na dopełnienie paczek
+        self._flushing.set()
+        try:
+            deadline = time.monotonic() + timeout
+            while self._queue.unfinished_tasks and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return self._queue.unfinished_tasks == 0
+        finally:
+            self._flushing.clear()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Opróżnia kolejkę i zatrzymuje wątek w tle"""
+        if self._stopped.is_set():
+            return
+        self.flush(timeout)
+        self._stopped.set()
+        self._worker.join(timeout)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def _next_batch(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout <= 0 or self._flushing.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                failed = self._send(batch)
+                if failed:
+                    self._spill(failed)
+                else:
+                    self._replay_spilled()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send(self, batch: list) -> list:
+        """Wysyła paczkę; zwraca zdarzenia, których nie udało się dostarczyć"""
+        try:
+            failed = list(self.sender(batch) or [])
+            error = "eksporter odrzucił zdarzenia"
+        except Exception as e:
+            failed, error = batch, e
+        self._count('sent', len(batch) - len(failed))
+        if failed:
+            print(f"⚠️ Nie udało się wysłać telemetrii ({len(failed)} z {len(batch)} zdarzeń): {error}")
+            self._count('failed_batches')
+        return failed
+
+    def _spill(self, events: list, count: bool = True) -> None:
+        """Dopisuje zdarzenia do pliku spill; count=False przy zwrocie już policzonych zdarzeń"""
+        if not events:
+            return
+        if self.spill_path is None:
+            self._count('dropped', len(events))
+            return
+        try:
+            size = self.spill_path.stat().st_size if self.spill_path.exists() else 0
+            if size >= self.max_spill_bytes:
+                self._count('dropped', len(events))
+                return
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            if count:
+                self._count('spilled', len(events))
+        except OSError as e:
+            print(f"⚠️ Nie udało się zapisać telemetrii na dysk: {e}")
+            self._count('dropped', len(events))
+
+    def _replay_spilled(self) -> None:
+        """Ponowne wysłanie zdarzeń zapisanych na dysku, gdy backend znów działa"""
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        replay_path = self.spill_path.with_name(f"{self.spill_path.name}.{os.getpid()}.replay")
+        try:
+            os.replace(self.spill_path, replay_path)
+            with open(replay_path, 'r', encoding='utf-8') as f:
+                events = [json.loads(line) for line in f if line.strip()]
+            replay_path.unlink()
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Nie udało się odczytać zapisanej telemetrii: {e}")
+            return
+
+        for start in range(0, len(events), self.batch_size):
+            batch = events[start:start + self.batch_size]
+            failed = self._send(batch)
+            self._count('replayed', len(batch) - len(failed))
+            if failed:
+                # Niedostarczone i pozostałe wracają do pliku (już policzone jako 'spilled')
+                self._spill(failed + events[start + self.batch_size:], count=False)
+                return
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_telemetry_queue(sender_factory) -> TelemetryQueue:
+    """
+    Kolejka telemetrii współdzielona przez wszystkie sesje w procesie
+
+    Args:
+        sender_factory: Funkcja tworząca sender (wywoływana tylko przy pierwszym użyciu)
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = TelemetryQueue(sender_factory())
+    return _queue
+
+
+def telemetry_stats():
+    """Liczniki kolejki telemetrii (None, jeśli telemetria nie była jeszcze używana)"""
+    return _queue.stats() if _queue is not None else None